@@ -1,13 +1,17 @@
-import psycopg2
-from psycopg2 import sql
-from psycopg2.extras import RealDictCursor
+import argparse
 import os
 import sys
-import time
-import requests
 from dotenv import load_dotenv
 from datetime import datetime
-import locale
+from concurrent.futures import ThreadPoolExecutor # Concurrent TMDb fetches in batch mode
+
+from rateLimiter import TokenBucket
+from runLogger import LOG, add_logging_arguments, configure_from_args
+from tmdbCache import open_default_cache
+from tmdbClient import TMDbClient
+
+# psycopg2 (with psycopg2.extras) and requests are imported inside the functions that use them, like the
+# CLI's handler imports, so prompting and argument errors do not wait on them.
 
 # --- Configuration ---
 load_dotenv() # Load environment variables from .env file
@@ -25,49 +29,127 @@ TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 # Define the table name in your PostgreSQL database
 TABLE_NAME = "films" # As per your last script version
 
-# TMDb API base URL
-TMDB_API_URL = "https://api.themoviedb.org/3"
+# TMDb API base URL (TMDB_API_URL can point at mockTmdbServer.py for offline load tests)
+TMDB_API_URL = os.getenv("TMDB_API_URL", "https://api.themoviedb.org/3")
 API_CALL_DELAY = 0.5 # Delay between TMDb API calls
 TOP_N_ACTORS = 5     # Number of top actors to store
+TMDB_IMAGE_BASE_URL = "https://image.tmdb.org/t/p/"
+TMDB_PROFILE_SIZE = "w185" # Same profile image size as the enrichment script stores for credits
 
-# --- Helper Functions ---
+# Batch mode (--file): concurrent fetches, paced at TMDB_REQUESTS_PER_SECOND like the enrichment script
+# instead of API_CALL_DELAY, which is meant for one interactive lookup at a time.
+BATCH_WORKERS = int(os.getenv("MANUAL_ADD_WORKERS", "8"))
+BATCH_REQUESTS_PER_SECOND = float(os.getenv("TMDB_REQUESTS_PER_SECOND", "20"))
 
-def safe_print_str(s, default_encoding='utf-8'):
-    """Safely prepares a string for printing to the console."""
-    if not isinstance(s, str):
-        s = str(s)
-    effective_encoding = sys.stdout.encoding or locale.getencoding() or default_encoding
-    try:
-        return s.encode('utf-8', errors='replace').decode(effective_encoding, errors='replace')
-    except Exception:
-        return s.encode('ascii', errors='replace').decode('ascii', errors='replace')
+# Shared pooled/retrying TMDb transport, backed by the persistent response cache
+# used by the other ingestion scripts (TMDB_CACHE_DISABLED=1 to bypass the cache).
+TMDB_CACHE = open_default_cache()
+TMDB_CLIENT = TMDbClient(TMDB_API_KEY, base_url=TMDB_API_URL,
+                         rate_limiter=TokenBucket(1 / API_CALL_DELAY), cache=TMDB_CACHE)
+
+# --- Helper Functions ---
 
 def connect_db():
     """Establishes a connection to the PostgreSQL database."""
+    import psycopg2
     if not DB_PASSWORD:
-        print("Error: DB_PASSWORD not found. Ensure it's in your .env file.")
+        LOG.error("Error: DB_PASSWORD not found. Ensure it's in your .env file.")
         return None
     if not TMDB_API_KEY:
-        print("Error: TMDB_API_KEY not found. Ensure it's in your .env file.")
+        LOG.error("Error: TMDB_API_KEY not found. Ensure it's in your .env file.")
         return None
     if DB_NAME == "your_db_name_default" or DB_USER == "your_db_user_default":
-        print("Warning: Using default database name or user. Set DB_NAME/DB_USER in .env if not intended.")
+        LOG.warning("Warning: Using default database name or user. Set DB_NAME/DB_USER in .env if not intended.")
     
     try:
         conn = psycopg2.connect(
             dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT
         )
-        print(f"Successfully connected to PostgreSQL database '{safe_print_str(DB_NAME)}'.")
+        LOG.info(f"Successfully connected to PostgreSQL database '{DB_NAME}'.")
         return conn
     except psycopg2.OperationalError as e:
-        print(f"Error connecting to PostgreSQL: {e}")
+        LOG.error(f"Error connecting to PostgreSQL: {e}")
         return None
 
+# Columns written for a TMDb-first film, in the order build_film_row returns them.
+FILM_INSERT_COLUMNS = ("letterboxd_uri", "tmdb_id", "title", "year", "director", "actors",
+                       "poster_path", "backdrop_path", "overview", "runtime", "genres", "release_date")
+
+def film_insert_columns_sql():
+    from psycopg2 import sql
+    return sql.SQL(", ").join(map(sql.Identifier, FILM_INSERT_COLUMNS))
+
+def build_profile_url(profile_path):
+    """Turns a TMDb profile_path into a full image URL at TMDB_PROFILE_SIZE, or None if there is no image."""
+    return f"{TMDB_IMAGE_BASE_URL}{TMDB_PROFILE_SIZE}{profile_path}" if profile_path else None
+
+def build_film_row(new_tmdb_id, movie_details):
+    """Extracts the FILM_INSERT_COLUMNS values for one film from a /movie/{id}?append_to_response=credits payload."""
+    director_name = None
+    actors_list = []
+    if 'credits' in movie_details:
+        if 'crew' in movie_details['credits']:
+            for crew_member in movie_details['credits']['crew']:
+                if crew_member.get('job') == 'Director':
+                    director_name = crew_member.get('name')
+                    break
+        if 'cast' in movie_details['credits']:
+            for actor_data in movie_details['credits']['cast'][:TOP_N_ACTORS]:
+                if actor_data.get('name'):
+                    actors_list.append(actor_data.get('name'))
+    
+    poster_path = movie_details.get('poster_path')
+    backdrop_path = movie_details.get('backdrop_path')
+    overview = movie_details.get('overview')
+    runtime = movie_details.get('runtime')
+    genres_list = [genre['name'] for genre in movie_details.get('genres', []) if genre.get('name')]
+    
+    release_date_str = movie_details.get('release_date')
+    release_date_obj = None # For the database
+    tmdb_year = None      # For the 'year' column
+
+    if release_date_str:
+        try:
+            # Validate format and prepare for DB
+            datetime.strptime(release_date_str, '%Y-%m-%d') 
+            release_date_obj = release_date_str
+            if len(release_date_str) >= 4:
+                tmdb_year = int(release_date_str.split('-')[0])
+        except ValueError:
+            LOG.warning(f"  -> TMDb: Invalid release date format '{release_date_str}'. Year and Release Date will be stored as NULL.")
+    
+    # Generate a placeholder Letterboxd URI since this is a TMDb-first entry
+    # This is to satisfy the NOT NULL UNIQUE constraint on letterboxd_uri
+    # Ensure this placeholder is unique enough. Appending tmdb_id should make it unique.
+    placeholder_letterboxd_uri = f"tmdb_entry_placeholder_{new_tmdb_id}"
+
+    return (
+        placeholder_letterboxd_uri,
+        new_tmdb_id,
+        movie_details.get('title'),
+        tmdb_year,
+        director_name,
+        actors_list if actors_list else None,
+        poster_path,
+        backdrop_path,
+        overview,
+        runtime,
+        genres_list if genres_list else None,
+        release_date_obj
+    )
+
 def add_film_by_tmdb_id(conn, new_tmdb_id):
     """
     Fetches film data from TMDb using new_tmdb_id and inserts it as a new entry
     into the database table.
     """
+    import psycopg2
+    import requests # Only needed here, for its exception types; loading it lazily keeps startup fast
+    from psycopg2 import sql
+    from psycopg2.extras import RealDictCursor
+    from dashboardStats import refresh_dashboard_views
+    from filmCredits import credits_from_details, write_film_credits
+    from schemaMigrations import mark_enrichment_done
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
     try:
@@ -75,148 +157,248 @@ def add_film_by_tmdb_id(conn, new_tmdb_id):
         cursor.execute(sql.SQL("SELECT id, title, letterboxd_uri FROM {table} WHERE tmdb_id = %s").format(table=sql.Identifier(TABLE_NAME)), (new_tmdb_id,))
         existing_film = cursor.fetchone()
         if existing_film:
-            print(f"Error: A film with TMDb ID {new_tmdb_id} already exists in your database:")
-            print(f"  -> DB ID: {existing_film['id']}, Title: '{safe_print_str(existing_film['title'])}', Letterboxd URI: {safe_print_str(existing_film['letterboxd_uri'])}")
-            print("No new entry will be added.")
+            LOG.error(f"Error: A film with TMDb ID {new_tmdb_id} already exists in your database:")
+            LOG.info(f"  -> DB ID: {existing_film['id']}, Title: '{existing_film['title']}', Letterboxd URI: {existing_film['letterboxd_uri']}")
+            LOG.info("No new entry will be added.")
             return
 
         # 2. Fetch movie details from TMDb
-        print(f"Fetching details from TMDb for ID: {new_tmdb_id}...")
-        details_url = f"{TMDB_API_URL}/movie/{new_tmdb_id}"
+        LOG.info(f"Fetching details from TMDb for ID: {new_tmdb_id}...")
         details_params = {'api_key': TMDB_API_KEY, 'append_to_response': 'credits'}
-        
-        response = requests.get(details_url, params=details_params)
-        response.raise_for_status() # Raise an exception for HTTP errors (e.g., 404 Not Found)
-        movie_details = response.json()
-        time.sleep(API_CALL_DELAY) # Be respectful of API limits
+        movie_details = TMDB_CLIENT.get_json(f"/movie/{new_tmdb_id}", details_params)
 
         tmdb_title = movie_details.get('title')
         if not tmdb_title: # Basic check if we got a valid movie object
-            print(f"Error: Could not retrieve a valid title from TMDb for ID {new_tmdb_id}. Aborting.")
+            LOG.error(f"Error: Could not retrieve a valid title from TMDb for ID {new_tmdb_id}. Aborting.")
             return
 
-        print(f"  -> TMDb: Found '{safe_print_str(tmdb_title)}' ({movie_details.get('release_date')})")
+        LOG.info(f"  -> TMDb: Found '{tmdb_title}' ({movie_details.get('release_date')})")
 
         # 3. Extract data
-        director_name = None
-        actors_list = []
-        if 'credits' in movie_details:
-            if 'crew' in movie_details['credits']:
-                for crew_member in movie_details['credits']['crew']:
-                    if crew_member.get('job') == 'Director':
-                        director_name = crew_member.get('name')
-                        break
-            if 'cast' in movie_details['credits']:
-                for actor_data in movie_details['credits']['cast'][:TOP_N_ACTORS]:
-                    if actor_data.get('name'):
-                        actors_list.append(actor_data.get('name'))
-        
-        poster_path = movie_details.get('poster_path')
-        backdrop_path = movie_details.get('backdrop_path')
-        overview = movie_details.get('overview')
-        runtime = movie_details.get('runtime')
-        genres_list = [genre['name'] for genre in movie_details.get('genres', []) if genre.get('name')]
-        
-        release_date_str = movie_details.get('release_date')
-        release_date_obj = None # For the database
-        tmdb_year = None      # For the 'year' column
-
-        if release_date_str:
-            try:
-                # Validate format and prepare for DB
-                datetime.strptime(release_date_str, '%Y-%m-%d') 
-                release_date_obj = release_date_str
-                if len(release_date_str) >= 4:
-                    tmdb_year = int(release_date_str.split('-')[0])
-            except ValueError:
-                print(f"  -> TMDb: Invalid release date format '{safe_print_str(release_date_str)}'. Year and Release Date will be stored as NULL.")
-        
-        # Generate a placeholder Letterboxd URI since this is a TMDb-first entry
-        # This is to satisfy the NOT NULL UNIQUE constraint on letterboxd_uri
-        # Ensure this placeholder is unique enough. Appending tmdb_id should make it unique.
-        placeholder_letterboxd_uri = f"tmdb_entry_placeholder_{new_tmdb_id}"
+        film_row = build_film_row(new_tmdb_id, movie_details)
+        placeholder_letterboxd_uri = film_row[0]
 
         # 4. Insert the new film into the database
         insert_query = sql.SQL("""
-            INSERT INTO {table} (
-                letterboxd_uri, tmdb_id, title, year, director, actors,
-                poster_path, backdrop_path, overview, runtime, genres, release_date
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            INSERT INTO {table} ({columns})
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             RETURNING id; 
-        """).format(table=sql.Identifier(TABLE_NAME))
+        """).format(table=sql.Identifier(TABLE_NAME), columns=film_insert_columns_sql())
         
-        cursor.execute(insert_query, (
-            placeholder_letterboxd_uri,
-            new_tmdb_id,
-            tmdb_title,
-            tmdb_year,
-            director_name,
-            actors_list if actors_list else None,
-            poster_path,
-            backdrop_path,
-            overview,
-            runtime,
-            genres_list if genres_list else None,
-            release_date_obj
-        ))
+        cursor.execute(insert_query, film_row)
         new_db_id = cursor.fetchone()['id']
+        mark_enrichment_done(cursor, [new_db_id])
+        write_film_credits(cursor, [(placeholder_letterboxd_uri, credits_from_details(movie_details, TOP_N_ACTORS, build_profile_url))])
         conn.commit()
-        print(f"  -> DB: Successfully added new film '{safe_print_str(tmdb_title)}' with DB ID {new_db_id} and TMDb ID {new_tmdb_id}.")
-        print(f"     Letterboxd URI placeholder: {placeholder_letterboxd_uri}")
+        LOG.info(f"  -> DB: Successfully added new film '{tmdb_title}' with DB ID {new_db_id} and TMDb ID {new_tmdb_id}.")
+        LOG.info(f"     Letterboxd URI placeholder: {placeholder_letterboxd_uri}")
+        refresh_dashboard_views(conn, ("films", "film_credits"))
 
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 404:
-            print(f"  -> Error: TMDb ID {new_tmdb_id} not found on The Movie Database.")
+            LOG.error(f"  -> Error: TMDb ID {new_tmdb_id} not found on The Movie Database.")
         else:
-            print(f"  -> TMDb API HTTP Error: {e.status_code} - {safe_print_str(e.response.text if e.response and hasattr(e.response, 'text') else 'No response text')}")
+            LOG.error(f"  -> TMDb API HTTP Error: {e.status_code} - {e.response.text if e.response and hasattr(e.response, 'text') else 'No response text'}")
     except requests.exceptions.RequestException as e:
-        print(f"  -> TMDb API Request Error: {e}")
+        LOG.error(f"  -> TMDb API Request Error: {e}")
     except psycopg2.Error as e:
-        print(f"  -> Database Error: {e}")
+        LOG.error(f"  -> Database Error: {e}")
         if conn and not conn.closed: conn.rollback()
     except Exception as e:
-        print(f"  -> An unexpected error occurred: {type(e).__name__} - {e}")
+        LOG.error(f"  -> An unexpected error occurred: {type(e).__name__} - {e}")
     finally:
         if cursor and not cursor.closed: cursor.close()
 
-# --- Main Execution ---
-if __name__ == "__main__":
+# --- Batch Mode ---
+
+def read_tmdb_ids(lines):
+    """
+    Parses TMDb IDs from lines of text (one per line; blank lines and '#' comments are ignored).
+    Returns (tmdb_ids, invalid_lines): IDs deduplicated in first-seen order, and (line_number, text) pairs that were not IDs.
+    """
+    tmdb_ids, seen, invalid_lines = [], set(), []
+    for line_number, line in enumerate(lines, 1):
+        text = line.split('#', 1)[0].strip()
+        if not text:
+            continue
+        try:
+            tmdb_id = int(text)
+        except ValueError:
+            invalid_lines.append((line_number, line.strip()))
+            continue
+        if tmdb_id not in seen:
+            seen.add(tmdb_id)
+            tmdb_ids.append(tmdb_id)
+    return tmdb_ids, invalid_lines
+
+def find_existing_tmdb_ids(conn, tmdb_ids):
+    """Returns {tmdb_id: (db_id, title)} for the given IDs already in the table, in a single query."""
+    from psycopg2 import sql
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("SELECT tmdb_id, id, title FROM {table} WHERE tmdb_id = ANY(%s)").format(table=sql.Identifier(TABLE_NAME)),
+                       (list(tmdb_ids),))
+        return {tmdb_id: (db_id, title) for tmdb_id, db_id, title in cursor.fetchall()}
+
+def fetch_movie_details(tmdb_id):
+    """Fetches one film's details and credits. Returns (tmdb_id, details or None, error message or None)."""
+    import requests # Only needed here, for its exception types; loading it lazily keeps startup fast
+    try:
+        movie_details = TMDB_CLIENT.get_json(f"/movie/{tmdb_id}", {'api_key': TMDB_API_KEY, 'append_to_response': 'credits'})
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return tmdb_id, None, "not found on The Movie Database"
+        return tmdb_id, None, f"TMDb API HTTP Error: {e.response.status_code if e.response is not None else 'Unknown'}"
+    except requests.exceptions.RequestException as e:
+        return tmdb_id, None, f"TMDb API Request Error: {e}"
+    if not movie_details.get('title'): # Basic check if we got a valid movie object
+        return tmdb_id, None, "no valid title in the TMDb response"
+    return tmdb_id, movie_details, None
+
+def add_films_in_batch(conn, tmdb_ids, workers=BATCH_WORKERS):
+    """
+    Adds many films at once: IDs already in the table are filtered out with one query, the remaining
+    details are fetched concurrently (paced by the client's rate limiter), and every film is inserted
+    by a single multi-row INSERT ... RETURNING in one transaction, together with their credits.
+    Returns the number of films added.
+    """
+    import psycopg2
+    from psycopg2 import sql
+    from psycopg2.extras import execute_values
+    from dashboardStats import refresh_dashboard_views
+    from filmCredits import credits_from_details, write_film_credits
+    from schemaMigrations import mark_enrichment_done
+    existing = find_existing_tmdb_ids(conn, tmdb_ids)
+    conn.commit()
+    for tmdb_id, (db_id, title) in existing.items():
+        LOG.warning(f"Skipping TMDb ID {tmdb_id}: already in your database as DB ID {db_id} ('{title}').")
+    to_fetch = [tmdb_id for tmdb_id in tmdb_ids if tmdb_id not in existing]
+    if not to_fetch:
+        LOG.info("No new TMDb IDs to add.")
+        return 0
+
+    # The interactive API_CALL_DELAY pacing would serialize the workers; batch mode shares one faster bucket.
+    TMDB_CLIENT.rate_limiter = TokenBucket(BATCH_REQUESTS_PER_SECOND)
+    LOG.info(f"Fetching details for {len(to_fetch)} film(s) from TMDb with {workers} worker(s) "
+          f"at up to {TMDB_CLIENT.rate_limiter.rate:g} requests/second...")
+    film_rows, failures = [], []
+    credits_by_tmdb_id = {} # tmdb_id -> (placeholder letterboxd_uri, credits)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for tmdb_id, movie_details, error in executor.map(fetch_movie_details, to_fetch):
+            if error:
+                failures.append((tmdb_id, error))
+                LOG.error(f"  -> Error: TMDb ID {tmdb_id}: {error}")
+                continue
+            LOG.info(f"  -> TMDb: Found '{movie_details.get('title')}' ({movie_details.get('release_date')}), ID: {tmdb_id}")
+            film_rows.append(build_film_row(tmdb_id, movie_details))
+            credits_by_tmdb_id[tmdb_id] = (film_rows[-1][0], credits_from_details(movie_details, TOP_N_ACTORS, build_profile_url))
+    if not film_rows:
+        LOG.warning(f"No films to insert; {len(failures)} TMDb lookup(s) failed.")
+        return 0
+
+    # ON CONFLICT DO NOTHING: an ID added concurrently (or a leftover placeholder URI) skips that row instead of failing the batch.
+    insert_query = sql.SQL("""
+        INSERT INTO {table} ({columns})
+        VALUES %s
+        ON CONFLICT DO NOTHING
+        RETURNING id, tmdb_id, title;
+    """).format(table=sql.Identifier(TABLE_NAME), columns=film_insert_columns_sql())
+    try:
+        with conn.cursor() as cursor:
+            inserted = execute_values(cursor, insert_query.as_string(cursor), film_rows, page_size=len(film_rows), fetch=True)
+            mark_enrichment_done(cursor, [db_id for db_id, _, _ in inserted])
+            write_film_credits(cursor, [credits_by_tmdb_id[tmdb_id] for _, tmdb_id, _ in inserted])
+        conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        LOG.error(f"  -> Database Error: batch insert of {len(film_rows)} film(s) rolled back: {e}")
+        return 0
+
+    for db_id, tmdb_id, title in sorted(inserted):
+        LOG.info(f"  -> DB: Added '{title}' with DB ID {db_id} and TMDb ID {tmdb_id}.")
+    conflicted = len(film_rows) - len(inserted)
+    LOG.info(f"Batch complete. Added: {len(inserted)}, Already present: {len(existing) + conflicted}, Failed lookups: {len(failures)}.")
+    if inserted: refresh_dashboard_views(conn, ("films", "film_credits"))
+    return len(inserted)
+
+def add_films_from_file(conn, path, workers=BATCH_WORKERS):
+    """Runs add_films_in_batch over the IDs listed in `path` ('-' reads standard input)."""
+    if path == '-':
+        tmdb_ids, invalid_lines = read_tmdb_ids(sys.stdin)
+    else:
+        with open(path, encoding='utf-8') as id_file:
+            tmdb_ids, invalid_lines = read_tmdb_ids(id_file)
+    for line_number, text in invalid_lines:
+        LOG.warning(f"Ignoring line {line_number}: '{text}' is not a numeric TMDb ID.")
+    if not tmdb_ids:
+        LOG.info("No TMDb IDs to add.")
+        return 0
+    return add_films_in_batch(conn, tmdb_ids, workers)
+
+def configure_console():
+    """Switches the Windows console to UTF-8 so film titles print correctly."""
     if sys.platform == "win32":
         try:
             sys.stdout.reconfigure(encoding='utf-8', errors='replace')
             sys.stderr.reconfigure(encoding='utf-8', errors='replace')
-            print("Attempted to reconfigure stdout/stderr to UTF-8.")
+            LOG.info("Attempted to reconfigure stdout/stderr to UTF-8.")
         except Exception as e_reconfigure:
-            print(f"Note: Could not reconfigure stdout/stderr: {e_reconfigure}")
+            LOG.warning(f"Note: Could not reconfigure stdout/stderr: {e_reconfigure}")
             try:
                 os.system("chcp 65001 > nul") # Suppress chcp output
-                print("Attempted to set console to UTF-8 via chcp 65001.")
+                LOG.info("Attempted to set console to UTF-8 via chcp 65001.")
             except Exception as e_chcp:
-                print(f"Note: Could not set console via chcp: {e_chcp}")
+                LOG.warning(f"Note: Could not set console via chcp: {e_chcp}")
+
+def prompt_and_add_films(conn):
+    """Prompts for TMDb IDs and adds each film until the user enters 'q'."""
+    while True:
+        try:
+            tmdb_id_input = input("Enter the TMDb ID of the film to add (or 'q' to quit): ")
+            if tmdb_id_input.lower() == 'q':
+                break
+            tmdb_id_to_add = int(tmdb_id_input)
+            
+            add_film_by_tmdb_id(conn, tmdb_id_to_add)
+            LOG.info("-" * 30) # Separator for next entry
+
+        except ValueError:
+            LOG.info("Invalid input. Please enter a numeric TMDb ID or 'q'.")
+        except KeyboardInterrupt:
+            LOG.info("\nOperation cancelled by user.")
+            break
+
+def close_tmdb_client():
+    """Prints the TMDb transport/cache summaries and releases the client."""
+    LOG.info(TMDB_CLIENT.summary())
+    if TMDB_CACHE is not None: LOG.info(TMDB_CACHE.summary())
+    TMDB_CLIENT.close()
+
+# --- Main Execution ---
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Add films to the database by TMDb ID; prompts for IDs unless --file is given.")
+    arg_parser.add_argument("--file", metavar="PATH",
+                            help="Add every TMDb ID listed in PATH (one per line, '#' comments allowed; '-' reads standard input).")
+    arg_parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Concurrent TMDb fetches in batch mode (default %(default)s).")
+    add_logging_arguments(arg_parser)
+    cli_args = arg_parser.parse_args()
+    configure_from_args(cli_args)
+    configure_console()
 
     db_connection = connect_db()
 
     if db_connection:
+        from schemaMigrations import run_migrations
         try:
-            while True:
-                try:
-                    tmdb_id_input = input("Enter the TMDb ID of the film to add (or 'q' to quit): ")
-                    if tmdb_id_input.lower() == 'q':
-                        break
-                    tmdb_id_to_add = int(tmdb_id_input)
-                    
-                    add_film_by_tmdb_id(db_connection, tmdb_id_to_add)
-                    print("-" * 30) # Separator for next entry
-
-                except ValueError:
-                    print("Invalid input. Please enter a numeric TMDb ID or 'q'.")
-                except KeyboardInterrupt:
-                    print("\nOperation cancelled by user.")
-                    break
-            
+            run_migrations(db_connection)
+            if cli_args.file:
+                add_films_from_file(db_connection, cli_args.file, cli_args.workers)
+            else:
+                prompt_and_add_films(db_connection)
         finally:
             if db_connection and not db_connection.closed:
                 db_connection.close()
-                print("\nPostgreSQL connection closed.")
+                LOG.info("\nPostgreSQL connection closed.")
+            close_tmdb_client()
     else:
-        print("Could not establish database connection. Exiting tool.")
+        LOG.error("Could not establish database connection. Exiting tool.")
+    LOG.close()
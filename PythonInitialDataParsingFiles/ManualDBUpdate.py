@@ -1,13 +1,18 @@
-import psycopg2
-from psycopg2 import sql
-from psycopg2.extras import RealDictCursor
+import argparse
+import csv
 import os
 import sys
-import time
-import requests
 from dotenv import load_dotenv
 from datetime import datetime
-import locale
+from concurrent.futures import ThreadPoolExecutor # Concurrent TMDb fetches in batch mode
+
+from rateLimiter import TokenBucket
+from runLogger import LOG, add_logging_arguments, configure_from_args
+from tmdbCache import open_default_cache
+from tmdbClient import TMDbClient
+
+# psycopg2 (with psycopg2.extras) and requests are imported inside the functions that use them, like the
+# CLI's handler imports, so prompting and argument errors do not wait on them.
 
 # --- Configuration ---
 load_dotenv() # Load environment variables from .env file
@@ -25,49 +30,118 @@ TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 # Define the table name in your PostgreSQL database
 TABLE_NAME = "films" # As per your last script version
 
-# TMDb API base URL
-TMDB_API_URL = "https://api.themoviedb.org/3"
+# TMDb API base URL (TMDB_API_URL can point at mockTmdbServer.py for offline load tests)
+TMDB_API_URL = os.getenv("TMDB_API_URL", "https://api.themoviedb.org/3")
 API_CALL_DELAY = 0.5 # Delay between TMDb API calls
 TOP_N_ACTORS = 5     # Number of top actors to store
+TMDB_IMAGE_BASE_URL = "https://image.tmdb.org/t/p/"
+TMDB_PROFILE_SIZE = "w185" # Same profile image size as the enrichment script stores for credits
 
-# --- Helper Functions ---
+# Batch mode (--file): concurrent fetches, paced at TMDB_REQUESTS_PER_SECOND like the enrichment script
+# instead of API_CALL_DELAY, which is meant for one interactive lookup at a time.
+BATCH_WORKERS = int(os.getenv("MANUAL_UPDATE_WORKERS", "8"))
+BATCH_REQUESTS_PER_SECOND = float(os.getenv("TMDB_REQUESTS_PER_SECOND", "20"))
 
-def safe_print_str(s, default_encoding='utf-8'):
-    """Safely prepares a string for printing to the console."""
-    if not isinstance(s, str):
-        s = str(s)
-    effective_encoding = sys.stdout.encoding or locale.getencoding() or default_encoding
-    try:
-        return s.encode('utf-8', errors='replace').decode(effective_encoding, errors='replace')
-    except Exception:
-        return s.encode('ascii', errors='replace').decode('ascii', errors='replace')
+# Shared pooled/retrying TMDb transport, backed by the persistent response cache
+# used by the other ingestion scripts (TMDB_CACHE_DISABLED=1 to bypass the cache).
+TMDB_CACHE = open_default_cache()
+TMDB_CLIENT = TMDbClient(TMDB_API_KEY, base_url=TMDB_API_URL,
+                         rate_limiter=TokenBucket(1 / API_CALL_DELAY), cache=TMDB_CACHE)
+
+# --- Helper Functions ---
 
 def connect_db():
     """Establishes a connection to the PostgreSQL database."""
+    import psycopg2
     if not DB_PASSWORD:
-        print("Error: DB_PASSWORD not found. Ensure it's in your .env file.")
+        LOG.error("Error: DB_PASSWORD not found. Ensure it's in your .env file.")
         return None
     if not TMDB_API_KEY:
-        print("Error: TMDB_API_KEY not found. Ensure it's in your .env file.")
+        LOG.error("Error: TMDB_API_KEY not found. Ensure it's in your .env file.")
         return None
     if DB_NAME == "your_db_name_default" or DB_USER == "your_db_user_default":
-        print("Warning: Using default database name or user. Set DB_NAME/DB_USER in .env if not intended.")
+        LOG.warning("Warning: Using default database name or user. Set DB_NAME/DB_USER in .env if not intended.")
     
     try:
         conn = psycopg2.connect(
             dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT
         )
-        print(f"Successfully connected to PostgreSQL database '{safe_print_str(DB_NAME)}'.")
+        LOG.info(f"Successfully connected to PostgreSQL database '{DB_NAME}'.")
         return conn
     except psycopg2.OperationalError as e:
-        print(f"Error connecting to PostgreSQL: {e}")
+        LOG.error(f"Error connecting to PostgreSQL: {e}")
         return None
 
+def build_profile_url(profile_path):
+    """Turns a TMDb profile_path into a full image URL at TMDB_PROFILE_SIZE, or None if there is no image."""
+    return f"{TMDB_IMAGE_BASE_URL}{TMDB_PROFILE_SIZE}{profile_path}" if profile_path else None
+
+def build_film_update_row(tmdb_id, movie_details):
+    """
+    Extracts the values written for a film from a /movie/{id}?append_to_response=credits payload, in the order
+    tmdb_id, title, year, director, actors, poster_path, backdrop_path, overview, runtime, genres, release_date.
+    """
+    director_name = None
+    actors_list = []
+    if 'credits' in movie_details:
+        if 'crew' in movie_details['credits']:
+            for crew_member in movie_details['credits']['crew']:
+                if crew_member.get('job') == 'Director':
+                    director_name = crew_member.get('name')
+                    break
+        if 'cast' in movie_details['credits']:
+            for actor_data in movie_details['credits']['cast'][:TOP_N_ACTORS]:
+                if actor_data.get('name'):
+                    actors_list.append(actor_data.get('name'))
+    
+    poster_path = movie_details.get('poster_path')
+    backdrop_path = movie_details.get('backdrop_path')
+    overview = movie_details.get('overview')
+    runtime = movie_details.get('runtime')
+    genres_list = [genre['name'] for genre in movie_details.get('genres', []) if genre.get('name')]
+    release_date_str = movie_details.get('release_date')
+    release_date_obj = None # For the database
+    if release_date_str:
+        try:
+            datetime.strptime(release_date_str, '%Y-%m-%d') # Validate format
+            release_date_obj = release_date_str
+        except ValueError:
+            LOG.warning(f"  -> TMDb: Invalid release date format '{release_date_str}'. Will store as NULL.")
+
+    # Extract year from TMDb release_date for the 'year' column
+    tmdb_year = None
+    if release_date_str and len(release_date_str) >= 4:
+        try:
+            tmdb_year = int(release_date_str.split('-')[0])
+        except ValueError:
+            pass # tmdb_year remains None
+
+    return (
+        tmdb_id,
+        movie_details.get('title'), # Update title from TMDb
+        tmdb_year,                  # Update year from TMDb
+        director_name,
+        actors_list if actors_list else None,
+        poster_path,
+        backdrop_path,
+        overview,
+        runtime,
+        genres_list if genres_list else None,
+        release_date_obj
+    )
+
 def update_film_manually(conn, db_film_id, manual_tmdb_id):
     """
     Fetches data from TMDb using manual_tmdb_id and updates the film
     identified by db_film_id in the database.
     """
+    import psycopg2
+    import requests # Only needed here, for its exception types; loading it lazily keeps startup fast
+    from psycopg2 import sql
+    from psycopg2.extras import RealDictCursor
+    from dashboardStats import refresh_dashboard_views
+    from filmCredits import credits_from_details, write_film_credits
+    from schemaMigrations import mark_enrichment_done
     cursor = conn.cursor(cursor_factory=RealDictCursor)
 
     try:
@@ -75,61 +149,31 @@ def update_film_manually(conn, db_film_id, manual_tmdb_id):
         cursor.execute(sql.SQL("SELECT title, letterboxd_uri FROM {table} WHERE id = %s").format(table=sql.Identifier(TABLE_NAME)), (db_film_id,))
         film_to_update = cursor.fetchone()
         if not film_to_update:
-            print(f"Error: No film found in table '{TABLE_NAME}' with id = {db_film_id}.")
+            LOG.error(f"Error: No film found in table '{TABLE_NAME}' with id = {db_film_id}.")
             return
 
-        print(f"Found film in DB: '{safe_print_str(film_to_update['title'])}' (ID: {db_film_id}, URI: {safe_print_str(film_to_update['letterboxd_uri'])}).")
+        LOG.info(f"Found film in DB: '{film_to_update['title']}' (ID: {db_film_id}, URI: {film_to_update['letterboxd_uri']}).")
 
         # 2. Check for TMDb ID collision: if this TMDb ID is already used by a *different* film
         cursor.execute(sql.SQL("SELECT id, title FROM {table} WHERE tmdb_id = %s AND id != %s").format(table=sql.Identifier(TABLE_NAME)), (manual_tmdb_id, db_film_id))
         colliding_film = cursor.fetchone()
         if colliding_film:
-            print(f"WARNING: TMDb ID {manual_tmdb_id} is already assigned to a different film in your database:")
-            print(f"  -> Existing DB Film ID: {colliding_film['id']}, Title: '{safe_print_str(colliding_film['title'])}'")
-            confirm = input(f"Do you still want to assign TMDb ID {manual_tmdb_id} to film ID {db_film_id} ('{safe_print_str(film_to_update['title'])}')? (yes/no): ").lower()
+            LOG.warning(f"WARNING: TMDb ID {manual_tmdb_id} is already assigned to a different film in your database:")
+            LOG.warning(f"  -> Existing DB Film ID: {colliding_film['id']}, Title: '{colliding_film['title']}'")
+            confirm = input(f"Do you still want to assign TMDb ID {manual_tmdb_id} to film ID {db_film_id} ('{film_to_update['title']}')? (yes/no): ").lower()
             if confirm != 'yes':
-                print("Update cancelled by user due to TMDb ID collision.")
+                LOG.info("Update cancelled by user due to TMDb ID collision.")
                 return
         
         # 3. Fetch movie details from TMDb
-        print(f"Fetching details from TMDb for ID: {manual_tmdb_id}...")
-        details_url = f"{TMDB_API_URL}/movie/{manual_tmdb_id}"
+        LOG.info(f"Fetching details from TMDb for ID: {manual_tmdb_id}...")
         details_params = {'api_key': TMDB_API_KEY, 'append_to_response': 'credits'}
-        
-        response = requests.get(details_url, params=details_params)
-        response.raise_for_status() # Raise an exception for HTTP errors
-        movie_details = response.json()
-        time.sleep(API_CALL_DELAY) # Be respectful of API limits
+        movie_details = TMDB_CLIENT.get_json(f"/movie/{manual_tmdb_id}", details_params)
 
-        print(f"  -> TMDb: Found '{safe_print_str(movie_details.get('title'))}' ({movie_details.get('release_date')})")
+        LOG.info(f"  -> TMDb: Found '{movie_details.get('title')}' ({movie_details.get('release_date')})")
 
         # 4. Extract data
-        director_name = None
-        actors_list = []
-        if 'credits' in movie_details:
-            if 'crew' in movie_details['credits']:
-                for crew_member in movie_details['credits']['crew']:
-                    if crew_member.get('job') == 'Director':
-                        director_name = crew_member.get('name')
-                        break
-            if 'cast' in movie_details['credits']:
-                for actor_data in movie_details['credits']['cast'][:TOP_N_ACTORS]:
-                    if actor_data.get('name'):
-                        actors_list.append(actor_data.get('name'))
-        
-        poster_path = movie_details.get('poster_path')
-        backdrop_path = movie_details.get('backdrop_path')
-        overview = movie_details.get('overview')
-        runtime = movie_details.get('runtime')
-        genres_list = [genre['name'] for genre in movie_details.get('genres', []) if genre.get('name')]
-        release_date_str = movie_details.get('release_date')
-        release_date_obj = None # For the database
-        if release_date_str:
-            try:
-                datetime.strptime(release_date_str, '%Y-%m-%d') # Validate format
-                release_date_obj = release_date_str
-            except ValueError:
-                print(f"  -> TMDb: Invalid release date format '{safe_print_str(release_date_str)}'. Will store as NULL.")
+        film_row = build_film_update_row(manual_tmdb_id, movie_details)
 
         # 5. Update the database
         update_query = sql.SQL("""
@@ -149,89 +193,317 @@ def update_film_manually(conn, db_film_id, manual_tmdb_id):
             WHERE id = %s;
         """).format(table=sql.Identifier(TABLE_NAME))
         
-        # Extract year from TMDb release_date for the 'year' column
-        tmdb_year = None
-        if release_date_str and len(release_date_str) >= 4:
-            try:
-                tmdb_year = int(release_date_str.split('-')[0])
-            except ValueError:
-                pass # tmdb_year remains None
-
-        cursor.execute(update_query, (
-            manual_tmdb_id,
-            movie_details.get('title'), # Update title from TMDb
-            tmdb_year,                  # Update year from TMDb
-            director_name,
-            actors_list if actors_list else None,
-            poster_path,
-            backdrop_path,
-            overview,
-            runtime,
-            genres_list if genres_list else None,
-            release_date_obj,
-            db_film_id
-        ))
+        if colliding_film:
+            with conn.cursor() as release_cursor:
+                release_tmdb_ids(release_cursor, {db_film_id: manual_tmdb_id})
+        cursor.execute(update_query, film_row + (db_film_id,))
+        mark_enrichment_done(cursor, [db_film_id])
+        # Replaces the credits of the previous (wrong) match, which the dashboard's director/actor counts read.
+        write_film_credits(cursor, [(film_to_update['letterboxd_uri'], credits_from_details(movie_details, TOP_N_ACTORS, build_profile_url))])
         conn.commit()
-        print(f"  -> DB: Successfully updated film ID {db_film_id} ('{safe_print_str(movie_details.get('title'))}') with TMDb ID {manual_tmdb_id}.")
+        LOG.info(f"  -> DB: Successfully updated film ID {db_film_id} ('{movie_details.get('title')}') with TMDb ID {manual_tmdb_id}.")
+        refresh_dashboard_views(conn, ("films", "film_credits"))
 
     except requests.exceptions.HTTPError as e:
-        print(f"  -> TMDb API HTTP Error: {e.status_code} - {safe_print_str(e.response.text if e.response and hasattr(e.response, 'text') else 'No response text')}")
+        LOG.error(f"  -> TMDb API HTTP Error: {e.status_code} - {e.response.text if e.response and hasattr(e.response, 'text') else 'No response text'}")
     except requests.exceptions.RequestException as e:
-        print(f"  -> TMDb API Request Error: {e}")
+        LOG.error(f"  -> TMDb API Request Error: {e}")
     except psycopg2.Error as e:
-        print(f"  -> Database Error: {e}")
+        LOG.error(f"  -> Database Error: {e}")
         if conn and not conn.closed: conn.rollback()
     except Exception as e:
-        print(f"  -> An unexpected error occurred: {type(e).__name__} - {e}")
+        LOG.error(f"  -> An unexpected error occurred: {type(e).__name__} - {e}")
     finally:
         if cursor and not cursor.closed: cursor.close()
 
-# --- Main Execution ---
-if __name__ == "__main__":
+# --- Batch Mode ---
+
+# What a batch does with a pair whose TMDb ID another film already has (the interactive tool asks instead):
+# 'skip' leaves that film unchanged, 'abort' applies nothing, 'allow' assigns it anyway like answering 'yes',
+# taking the ID away from the other film (see release_tmdb_ids).
+COLLISION_POLICIES = ("skip", "abort", "allow")
+
+BATCH_UPDATE_QUERY = """
+    UPDATE {table} AS f SET
+        tmdb_id = v.tmdb_id, title = v.title, year = v.year, director = v.director, actors = v.actors,
+        poster_path = v.poster_path, backdrop_path = v.backdrop_path, overview = v.overview,
+        runtime = v.runtime, genres = v.genres, release_date = v.release_date, updated_at = NOW()
+    FROM (VALUES %s) AS v (tmdb_id, title, year, director, actors, poster_path, backdrop_path,
+                           overview, runtime, genres, release_date, id)
+    WHERE f.id = v.id
+    RETURNING f.id, f.letterboxd_uri;
+"""
+BATCH_UPDATE_TEMPLATE = "(%s::integer, %s, %s::integer, %s, %s::text[], %s, %s, %s, %s::integer, %s::text[], %s::date, %s::integer)"
+
+def read_update_pairs(lines):
+    """
+    Parses 'db_id,tmdb_id' pairs from CSV lines. An optional header row, blank lines and '#' comments are ignored.
+    Returns (pairs, invalid_lines): a {db_id: tmdb_id} dict in file order (the first pair for a db_id wins),
+    and (line_number, text, reason) for every line that was not used.
+    """
+    pairs, invalid_lines = {}, []
+    for line_number, row in enumerate(csv.reader(lines), 1):
+        text = ",".join(row).strip()
+        if not text or text.startswith('#'):
+            continue
+        try:
+            db_id, tmdb_id = (int(value) for value in row)
+        except ValueError: # Wrong number of fields, or a non-numeric value
+            if not pairs and not invalid_lines and [value.strip().lower() for value in row] == ["db_id", "tmdb_id"]:
+                continue # Header row
+            invalid_lines.append((line_number, text, "expected two numeric columns, db_id,tmdb_id"))
+            continue
+        if db_id in pairs:
+            invalid_lines.append((line_number, text, f"database ID {db_id} is already mapped to TMDb ID {pairs[db_id]} earlier in the file"))
+            continue
+        pairs[db_id] = tmdb_id
+    return pairs, invalid_lines
+
+def check_update_pairs(conn, pairs):
+    """
+    Validates every pair with one query: the database ID must exist, and the TMDb ID should not belong to another film.
+    Returns (missing_ids, collisions), where collisions is {db_id: [description of each film already using its TMDb ID]}.
+    A TMDb ID given to several films in the same file collides with the pairs before it, as it would in the table.
+    """
+    from psycopg2 import sql
+    check_query = sql.SQL("""
+        SELECT p.db_id, f.id IS NOT NULL AS found, other.id, other.title
+        FROM unnest(%s::integer[], %s::integer[]) AS p (db_id, tmdb_id)
+        LEFT JOIN {table} AS f ON f.id = p.db_id
+        LEFT JOIN {table} AS other ON other.tmdb_id = p.tmdb_id AND other.id <> p.db_id
+        ORDER BY p.db_id, other.id;
+    """).format(table=sql.Identifier(TABLE_NAME))
+    with conn.cursor() as cursor:
+        cursor.execute(check_query, (list(pairs), list(pairs.values())))
+        results = cursor.fetchall()
+
+    missing_ids, collisions = set(), {}
+    for db_id, found, other_id, other_title in results:
+        if not found:
+            missing_ids.add(db_id)
+        elif other_id is not None:
+            collisions.setdefault(db_id, []).append(f"DB ID {other_id} ('{other_title}')")
+
+    claimed_by = {}
+    for db_id, tmdb_id in pairs.items():
+        if db_id in missing_ids:
+            continue
+        if tmdb_id in claimed_by:
+            collisions.setdefault(db_id, []).append(f"DB ID {claimed_by[tmdb_id]} (earlier in this file)")
+        else:
+            claimed_by[tmdb_id] = db_id
+    return missing_ids, collisions
+
+def release_tmdb_ids(cursor, pairs):
+    """
+    Takes each TMDb ID in a {db_id: tmdb_id} dict away from any other film that has it, as films.tmdb_id is UNIQUE.
+    Those films lose their credits and go back to the enrichment backlog, so the next enrichment run matches
+    them again. Call before assigning the IDs, in the same transaction; does not commit. Returns the released films' ids.
+    """
+    from psycopg2 import sql
+    from schemaMigrations import mark_enrichment_pending
+    cursor.execute(sql.SQL("""
+        UPDATE {table} AS f SET tmdb_id = NULL, updated_at = NOW()
+        FROM unnest(%s::integer[], %s::integer[]) AS p (db_id, tmdb_id)
+        WHERE f.tmdb_id = p.tmdb_id AND f.id <> p.db_id
+        RETURNING f.id;
+    """).format(table=sql.Identifier(TABLE_NAME)), (list(pairs), list(pairs.values())))
+    released_ids = sorted(film_id for (film_id,) in cursor.fetchall())
+    if released_ids:
+        cursor.execute("DELETE FROM film_credits WHERE film_id = ANY(%s);", (released_ids,))
+        mark_enrichment_pending(cursor, released_ids)
+        LOG.warning(f"  -> DB: Cleared the TMDb ID of database ID(s) {', '.join(map(str, released_ids))}; "
+                    "the next enrichment run will match them again.")
+    return released_ids
+
+def fetch_movie_details(db_id, tmdb_id):
+    """Fetches one film's details and credits. Returns (db_id, tmdb_id, details or None, error message or None)."""
+    import requests # Only needed here, for its exception types; loading it lazily keeps startup fast
+    try:
+        movie_details = TMDB_CLIENT.get_json(f"/movie/{tmdb_id}", {'api_key': TMDB_API_KEY, 'append_to_response': 'credits'})
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return db_id, tmdb_id, None, "not found on The Movie Database"
+        return db_id, tmdb_id, None, f"TMDb API HTTP Error: {e.response.status_code if e.response is not None else 'Unknown'}"
+    except requests.exceptions.RequestException as e:
+        return db_id, tmdb_id, None, f"TMDb API Request Error: {e}"
+    if not movie_details.get('title'):
+        return db_id, tmdb_id, None, "no valid title in the TMDb response"
+    return db_id, tmdb_id, movie_details, None
+
+def update_films_in_batch(conn, pairs, on_collision="skip", workers=BATCH_WORKERS):
+    """
+    Reassigns many films at once from a {db_id: tmdb_id} dict: all pairs are validated with one query,
+    collisions are resolved by the on_collision policy (see COLLISION_POLICIES) instead of a prompt,
+    details are fetched concurrently, and every update is applied by one UPDATE ... FROM (VALUES ...)
+    in a single transaction, together with the films' credits. A database error rolls the whole batch back.
+    Returns the number of films updated.
+    """
+    import psycopg2
+    from psycopg2 import sql
+    from psycopg2.extras import execute_values
+    from dashboardStats import refresh_dashboard_views
+    from filmCredits import credits_from_details, write_film_credits
+    from schemaMigrations import mark_enrichment_done
+    missing_ids, collisions = check_update_pairs(conn, pairs)
+    conn.commit()
+    for db_id in sorted(missing_ids):
+        LOG.warning(f"Skipping database ID {db_id}: no film with that ID in table '{TABLE_NAME}'.")
+    for db_id, colliding_films in collisions.items():
+        LOG.warning(f"{'Assigning anyway' if on_collision == 'allow' else 'Collision'}: TMDb ID {pairs[db_id]} for database ID {db_id} "
+              f"is already used by {', '.join(colliding_films)}.")
+    if collisions and on_collision == "abort":
+        LOG.warning(f"Aborting: {len(collisions)} collision(s) found and the collision policy is 'abort'. Nothing was updated.")
+        return 0
+
+    skipped_ids = missing_ids | (set(collisions) if on_collision == "skip" else set())
+    duplicate_ids = set()
+    if on_collision == "allow":
+        # One TMDb ID can only be assigned once: of several pairs in this file sharing it, the first is applied.
+        claimed_tmdb_ids = set()
+        for db_id, tmdb_id in pairs.items():
+            if db_id in missing_ids:
+                continue
+            if tmdb_id in claimed_tmdb_ids:
+                LOG.warning(f"Skipping database ID {db_id}: TMDb ID {tmdb_id} is assigned to another film earlier in this file.")
+                duplicate_ids.add(db_id)
+            claimed_tmdb_ids.add(tmdb_id)
+        skipped_ids |= duplicate_ids
+    to_fetch = [(db_id, tmdb_id) for db_id, tmdb_id in pairs.items() if db_id not in skipped_ids]
+    if not to_fetch:
+        LOG.info("No films to update.")
+        return 0
+
+    # The interactive API_CALL_DELAY pacing would serialize the workers; batch mode shares one faster bucket.
+    TMDB_CLIENT.rate_limiter = TokenBucket(BATCH_REQUESTS_PER_SECOND)
+    LOG.info(f"Fetching details for {len(to_fetch)} film(s) from TMDb with {workers} worker(s) "
+          f"at up to {TMDB_CLIENT.rate_limiter.rate:g} requests/second...")
+    update_rows, failures = [], []
+    credits_by_db_id = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for db_id, tmdb_id, movie_details, error in executor.map(fetch_movie_details, *zip(*to_fetch)):
+            if error:
+                failures.append((db_id, error))
+                LOG.error(f"  -> Error: TMDb ID {tmdb_id} for database ID {db_id}: {error}")
+                continue
+            LOG.info(f"  -> TMDb: Found '{movie_details.get('title')}' ({movie_details.get('release_date')}) for database ID {db_id}")
+            update_rows.append(build_film_update_row(tmdb_id, movie_details) + (db_id,))
+            credits_by_db_id[db_id] = credits_from_details(movie_details, TOP_N_ACTORS, build_profile_url)
+    if not update_rows:
+        LOG.warning(f"No films to update; {len(failures)} TMDb lookup(s) failed.")
+        return 0
+
+    try:
+        with conn.cursor() as cursor:
+            if collisions and on_collision == "allow":
+                release_tmdb_ids(cursor, {update_row[-1]: update_row[0] for update_row in update_rows})
+            updated = execute_values(cursor, sql.SQL(BATCH_UPDATE_QUERY).format(table=sql.Identifier(TABLE_NAME)).as_string(cursor),
+                                     update_rows, template=BATCH_UPDATE_TEMPLATE, page_size=len(update_rows), fetch=True)
+            mark_enrichment_done(cursor, [db_id for db_id, _ in updated])
+            write_film_credits(cursor, [(letterboxd_uri, credits_by_db_id[db_id]) for db_id, letterboxd_uri in updated])
+        conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        LOG.error(f"  -> Database Error: batch update of {len(update_rows)} film(s) rolled back: {e}")
+        return 0
+
+    LOG.info(f"  -> DB: Updated {len(updated)} film(s) in one transaction.")
+    LOG.info(f"Batch complete. Updated: {len(updated)}, Missing IDs: {len(missing_ids)}, "
+          f"Collisions {'assigned' if on_collision == 'allow' else 'skipped'}: {len(collisions) - len(duplicate_ids)}, "
+          f"{f'Duplicate TMDb IDs skipped: {len(duplicate_ids)}, ' if duplicate_ids else ''}Failed lookups: {len(failures)}.")
+    if updated: refresh_dashboard_views(conn, ("films", "film_credits"))
+    return len(updated)
+
+def update_films_from_file(conn, path, on_collision="skip", workers=BATCH_WORKERS):
+    """Runs update_films_in_batch over the db_id,tmdb_id pairs in the CSV at `path` ('-' reads standard input)."""
+    if path == '-':
+        pairs, invalid_lines = read_update_pairs(sys.stdin)
+    else:
+        with open(path, encoding='utf-8-sig', newline='') as pairs_file:
+            pairs, invalid_lines = read_update_pairs(pairs_file)
+    for line_number, text, reason in invalid_lines:
+        LOG.warning(f"Ignoring line {line_number} ('{text}'): {reason}.")
+    if not pairs:
+        LOG.info("No db_id,tmdb_id pairs to apply.")
+        return 0
+    return update_films_in_batch(conn, pairs, on_collision, workers)
+
+def configure_console():
+    """Switches the Windows console to UTF-8 so film titles print correctly."""
     if sys.platform == "win32":
         try:
             sys.stdout.reconfigure(encoding='utf-8', errors='replace')
             sys.stderr.reconfigure(encoding='utf-8', errors='replace')
-            print("Attempted to reconfigure stdout/stderr to UTF-8.")
+            LOG.info("Attempted to reconfigure stdout/stderr to UTF-8.")
         except Exception as e_reconfigure:
-            print(f"Note: Could not reconfigure stdout/stderr: {e_reconfigure}")
+            LOG.warning(f"Note: Could not reconfigure stdout/stderr: {e_reconfigure}")
             try:
                 os.system("chcp 65001 > nul")
-                print("Attempted to set console to UTF-8 via chcp 65001.")
+                LOG.info("Attempted to set console to UTF-8 via chcp 65001.")
             except Exception as e_chcp:
-                print(f"Note: Could not set console via chcp: {e_chcp}")
+                LOG.warning(f"Note: Could not set console via chcp: {e_chcp}")
+
+def prompt_and_update_film(conn):
+    """Prompts for a database ID and a TMDb ID, then updates that film. 'q' at either prompt quits."""
+    while True:
+        try:
+            db_id_input = input("Enter the database ID of the film to update (or 'q' to quit): ")
+            if db_id_input.lower() == 'q':
+                break
+            db_id = int(db_id_input)
+            break
+        except ValueError:
+            LOG.info("Invalid input. Please enter a numeric ID or 'q'.")
+    
+    if db_id_input.lower() != 'q':
+        while True:
+            try:
+                tmdb_id_input = input(f"Enter the TMDb ID for film with database ID {db_id} (or 'q' to quit): ")
+                if tmdb_id_input.lower() == 'q':
+                    break
+                manual_tmdb_id_val = int(tmdb_id_input)
+                break
+            except ValueError:
+                LOG.info("Invalid input. Please enter a numeric TMDb ID or 'q'.")
+
+        if tmdb_id_input.lower() != 'q':
+            update_film_manually(conn, db_id, manual_tmdb_id_val)
+
+def close_tmdb_client():
+    """Prints the TMDb transport/cache summaries and releases the client."""
+    LOG.info(TMDB_CLIENT.summary())
+    if TMDB_CACHE is not None: LOG.info(TMDB_CACHE.summary())
+    TMDB_CLIENT.close()
+
+# --- Main Execution ---
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Reassign films' TMDb IDs and refresh their data; prompts for one film unless --file is given.")
+    arg_parser.add_argument("--file", metavar="PATH",
+                            help="Apply every db_id,tmdb_id pair in the CSV at PATH ('-' reads standard input).")
+    arg_parser.add_argument("--on-collision", choices=COLLISION_POLICIES, default="skip",
+                            help="Batch mode: what to do when a TMDb ID already belongs to another film (default %(default)s); "
+                                 "'allow' clears it from that film, which the next enrichment run matches again.")
+    arg_parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Concurrent TMDb fetches in batch mode (default %(default)s).")
+    add_logging_arguments(arg_parser)
+    cli_args = arg_parser.parse_args()
+    configure_from_args(cli_args)
+    configure_console()
 
     db_connection = connect_db()
 
     if db_connection:
+        from schemaMigrations import run_migrations
         try:
-            while True:
-                try:
-                    db_id_input = input("Enter the database ID of the film to update (or 'q' to quit): ")
-                    if db_id_input.lower() == 'q':
-                        break
-                    db_id = int(db_id_input)
-                    break
-                except ValueError:
-                    print("Invalid input. Please enter a numeric ID or 'q'.")
-            
-            if db_id_input.lower() != 'q':
-                while True:
-                    try:
-                        tmdb_id_input = input(f"Enter the TMDb ID for film with database ID {db_id} (or 'q' to quit): ")
-                        if tmdb_id_input.lower() == 'q':
-                            break
-                        manual_tmdb_id_val = int(tmdb_id_input)
-                        break
-                    except ValueError:
-                        print("Invalid input. Please enter a numeric TMDb ID or 'q'.")
-
-                if tmdb_id_input.lower() != 'q':
-                    update_film_manually(db_connection, db_id, manual_tmdb_id_val)
-
+            run_migrations(db_connection)
+            if cli_args.file:
+                update_films_from_file(db_connection, cli_args.file, cli_args.on_collision, cli_args.workers)
+            else:
+                prompt_and_update_film(db_connection)
         finally:
             if db_connection and not db_connection.closed:
                 db_connection.close()
-                print("\nPostgreSQL connection closed.")
+                LOG.info("\nPostgreSQL connection closed.")
+            close_tmdb_client()
     else:
-        print("Could not establish database connection. Exiting.")
+        LOG.error("Could not establish database connection. Exiting.")
+    LOG.close()
@@ -0,0 +1,265 @@
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+# Benchmarks must never touch the real response cache or the network.
+os.environ.setdefault("TMDB_CACHE_DISABLED", "1")
+
+import parsingInitialDiaryData as diary_loader
+import parsingInitialFilmData as film_loader
+import parsingInitialRatingData as ratings_loader
+from dumpFixtures import DEFAULT_DUMP_PATH, load_dump_tables, parse_text_array
+from runLogger import LOG
+
+# Results of `run` land here as <commit>.json unless --output is given.
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".benchmarks")
+
+# Number of diary/ratings rows (and films, for the per-film benchmarks) in the scaled-up fixtures.
+DEFAULT_ROWS = 5000
+DEFAULT_REPEAT = 7
+# A benchmark whose best time per operation grows by more than this fraction is reported as a regression.
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+# Shape of a /search/movie page and of a credits payload as returned by TMDb.
+SEARCH_RESULTS_PER_FILM = 20
+CAST_PER_FILM = 40
+CREW_PER_FILM = 60
+CREW_JOBS = ("Producer", "Screenplay", "Editor", "Original Music Composer", "Director of Photography",
+             "Casting", "Production Design", "Costume Design", "Executive Producer", "Sound Designer")
+
+DIARY_HEADER = ["Date", "Name", "Year", "Letterboxd URI", "Rating", "Rewatch", "Tags", "Watched Date"]
+RATINGS_HEADER = ["Date", "Name", "Year", "Letterboxd URI", "Rating"]
+WATCHED_HEADER = ["Date", "Name", "Year", "Letterboxd URI"]
+
+
+def _csv_text(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _cycle(rows, count):
+    """Yields (copy_number, row) cycling over rows until count rows have been produced."""
+    for index in range(count):
+        yield index // len(rows), rows[index % len(rows)]
+
+
+class Fixtures:
+    """
+    Benchmark inputs derived from the DatabaseDump backup, scaled to `rows` items by cycling the
+    dump's rows (with unique URIs per copy). Generated deterministically so runs are comparable.
+    """
+
+    def __init__(self, dump_path=DEFAULT_DUMP_PATH, rows=DEFAULT_ROWS, seed=20250506):
+        rng = random.Random(seed)
+        films, diary_entries, ratings_entries = load_dump_tables(dump_path)
+        films = [film for film in films if film["title"] and film["year"]]
+        films_by_id = {film["id"]: film for film in films}
+
+        self.film_id_map = {(film["title"], int(film["year"])): int(film["id"]) for film in films}
+        self.texts = [text for film in films for text in (film["title"], film["overview"]) if text]
+
+        diary_rows = []
+        for copy_number, entry in _cycle([e for e in diary_entries if e["film_id"] in films_by_id], rows):
+            film = films_by_id[entry["film_id"]]
+            diary_rows.append([entry["watched_date"], film["title"], film["year"], f"{entry['letterboxd_diary_uri']}-{copy_number}",
+                               entry["rating"] or "", "Yes" if entry["rewatch"] == "t" else "", "", entry["watched_date"]])
+        self.diary_csv = _csv_text(DIARY_HEADER, diary_rows)
+        self.diary_rows = len(diary_rows)
+
+        rating_rows = []
+        for copy_number, entry in _cycle([e for e in ratings_entries if e["film_id"] in films_by_id], rows):
+            film = films_by_id[entry["film_id"]]
+            rating_rows.append([entry["rating_date"], film["title"], film["year"], f"{entry['letterboxd_rating_uri']}-{copy_number}",
+                                entry["rating"] or ""])
+        self.ratings_csv = _csv_text(RATINGS_HEADER, rating_rows)
+        self.rating_rows = len(rating_rows)
+
+        watched_rows = [[film["created_at"][:10] if film.get("created_at") else "", film["title"], film["year"],
+                         f"{film['letterboxd_uri']}-{copy_number}"] for copy_number, film in _cycle(films, rows)]
+        self.watched_csv = _csv_text(WATCHED_HEADER, watched_rows)
+        self.watched_rows = len(watched_rows)
+
+        # (title, year, search results) per film: the film itself, a same-title remake a year off,
+        # and unrelated titles, all shaped like /search/movie results.
+        self.searches = []
+        for _, film in _cycle(films, rows):
+            year = int(film["year"])
+            results = [
+                {"id": int(film["tmdb_id"] or 0), "title": film["title"], "release_date": film["release_date"] or f"{year}-01-01",
+                 "popularity": rng.uniform(1, 200)},
+                {"id": rng.randrange(1, 10 ** 6), "title": film["title"], "release_date": f"{year + 1}-06-01",
+                 "popularity": rng.uniform(1, 20)},
+            ]
+            for other in rng.sample(films, SEARCH_RESULTS_PER_FILM - len(results)):
+                results.append({"id": int(other["tmdb_id"] or 0), "title": other["title"],
+                                "release_date": other["release_date"] or "", "popularity": rng.uniform(1, 200)})
+            rng.shuffle(results)
+            self.searches.append((film["title"], year, results))
+        self.similarity_pairs = [(title, result["title"]) for title, _, results in self.searches[:max(1, rows // SEARCH_RESULTS_PER_FILM)]
+                                 for result in results]
+
+        # /movie/{id}?append_to_response=credits payloads built from the dump's director/actors columns,
+        # padded to a typical credits size. Every crew entry carries profile_path, so no /person calls are made.
+        self.movie_details = []
+        for _, film in _cycle(films, rows):
+            actors = parse_text_array(film["actors"]) or []
+            cast = [{"id": rng.randrange(1, 10 ** 7), "name": name, "character": f"Character {order}", "order": order,
+                     "profile_path": f"/{rng.randrange(16 ** 12):012x}.jpg" if rng.random() < 0.9 else None}
+                    for order, name in enumerate(actors + [f"Cast Member {n}" for n in range(CAST_PER_FILM - len(actors))])]
+            crew = [{"id": rng.randrange(1, 10 ** 7), "name": f"Crew Member {n}", "job": rng.choice(CREW_JOBS),
+                     "profile_path": None} for n in range(CREW_PER_FILM)]
+            if film["director"]:
+                crew.insert(rng.randrange(len(crew)), {"id": rng.randrange(1, 10 ** 7), "name": film["director"], "job": "Director",
+                                                       "profile_path": f"/{rng.randrange(16 ** 12):012x}.jpg"})
+            self.movie_details.append({"id": int(film["tmdb_id"] or 0), "credits": {"cast": cast, "crew": crew}})
+
+
+def build_benchmarks(fixtures, devnull):
+    """Returns {name: (callable, operations per call)} for every hot path under test; log output goes to devnull."""
+
+    def quietly(function, *args):
+        # The CSV readers log row problems; keep them out of the timing and the report.
+        console = LOG.stream
+        LOG.configure(stream=devnull)
+        try:
+            return function(*args)
+        finally:
+            LOG.configure(stream=console)
+
+    def run_similarity():
+        for title, candidate in fixtures.similarity_pairs:
+            film_loader.calculate_normalized_similarity(title, candidate)
+
+    def run_year_match():
+        for title, year, results in fixtures.searches:
+            film_loader.get_closest_year_match(results, year, title)
+
+    def run_safe_print():
+        for text in fixtures.texts:
+            film_loader.safe_print_str(text)
+
+    def run_credits():
+        discard = lambda line: None
+        for movie_details in fixtures.movie_details:
+            film_loader.extract_credits(movie_details, discard)
+
+    return {
+        "calculate_normalized_similarity": (run_similarity, len(fixtures.similarity_pairs)),
+        "get_closest_year_match": (run_year_match, len(fixtures.searches)),
+        "safe_print_str": (run_safe_print, len(fixtures.texts)),
+        "watched_csv_validation": (lambda: quietly(film_loader.read_watched_rows, io.StringIO(fixtures.watched_csv)),
+                                   fixtures.watched_rows),
+        "diary_csv_validation": (lambda: quietly(diary_loader.read_diary_entries, io.StringIO(fixtures.diary_csv),
+                                                  fixtures.film_id_map), fixtures.diary_rows),
+        "ratings_csv_validation": (lambda: quietly(ratings_loader.read_rating_entries, io.StringIO(fixtures.ratings_csv),
+                                                    fixtures.film_id_map, "ratings.csv"), fixtures.rating_rows),
+        "extract_credits": (run_credits, len(fixtures.movie_details)),
+    }
+
+
+def current_commit():
+    """Short hash of HEAD, suffixed with '-dirty' when the working tree has changes; 'unknown' outside git."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=here, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def run_benchmarks(rows=DEFAULT_ROWS, repeat=DEFAULT_REPEAT, only=None, dump_path=DEFAULT_DUMP_PATH):
+    """Times every benchmark (best and median of `repeat` runs, after one warm-up) and returns the results document."""
+    fixtures = Fixtures(dump_path, rows)
+    results = {}
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        for name, (function, operations) in build_benchmarks(fixtures, devnull).items():
+            if only and name not in only:
+                continue
+            function() # Warm-up: imports, caches and first-call allocations stay out of the measurement
+            timings = timeit.repeat(function, number=1, repeat=repeat)
+            best, median = min(timings), statistics.median(timings)
+            results[name] = {"operations": operations, "best_seconds": best, "median_seconds": median,
+                             "best_ns_per_op": best / operations * 1e9, "median_ns_per_op": median / operations * 1e9}
+            print(f"{name:<34} {operations:>7} ops  best {best * 1000:9.2f} ms  median {median * 1000:9.2f} ms  "
+                  f"{best / operations * 1e9:10.0f} ns/op")
+    return {"commit": current_commit(), "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "platform": platform.platform(), "rows": rows, "repeat": repeat, "benchmarks": results}
+
+
+def compare_results(baseline, current, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """Prints a per-benchmark comparison of best ns/op and returns the names that regressed beyond threshold."""
+    print(f"Baseline {baseline['commit']} ({baseline['created_at']}) vs current {current['commit']} ({current['created_at']})")
+    regressions = []
+    for name in sorted(set(baseline["benchmarks"]) | set(current["benchmarks"])):
+        before, after = baseline["benchmarks"].get(name), current["benchmarks"].get(name)
+        if before is None or after is None:
+            print(f"  {name:<34} {'only in baseline' if after is None else 'new benchmark'}")
+            continue
+        change = after["best_ns_per_op"] / before["best_ns_per_op"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"  {name:<34} {before['best_ns_per_op']:10.0f} -> {after['best_ns_per_op']:10.0f} ns/op  {change * 100:+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the ingestion hot paths, with fixtures derived from DatabaseDump/.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    run_parser = subcommands.add_parser("run", help="Run the benchmarks and save the results as JSON.")
+    run_parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Rows/films per fixture (default %(default)s).")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per benchmark (default %(default)s).")
+    run_parser.add_argument("--only", nargs="+", metavar="NAME", help="Run only these benchmarks.")
+    run_parser.add_argument("--dump", default=DEFAULT_DUMP_PATH, help="pg_dump file the fixtures are derived from.")
+    run_parser.add_argument("--output", help=f"Results file (default {DEFAULT_RESULTS_DIR}/<commit>.json).")
+    run_parser.add_argument("--baseline", help="Results file to compare against after running; exits 1 on a regression.")
+    compare_parser = subcommands.add_parser("compare", help="Compare two results files; exits 1 on a regression.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    for subparser in (run_parser, compare_parser):
+        subparser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                               help="Slowdown fraction reported as a regression (default %(default)s).")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run_benchmarks(args.rows, args.repeat, args.only, args.dump)
+        output_path = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{results['commit']}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+        print(f"Results written to '{output_path}'.")
+        if not args.baseline:
+            return
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        current = results
+    else:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        with open(args.current, encoding="utf-8") as current_file:
+            current = json.load(current_file)
+
+    regressions = compare_results(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
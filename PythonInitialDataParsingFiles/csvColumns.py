@@ -0,0 +1,124 @@
+import csv
+import io
+import os
+from collections import Counter
+from datetime import datetime
+from operator import itemgetter
+
+from runLogger import LOG, WARNING
+
+try:
+    import pyarrow
+    from pyarrow import csv as pyarrow_csv
+except ImportError: # Optional: the pure-Python backend below parses the same columns
+    pyarrow = None
+
+# "auto" uses pyarrow when it is installed, "python" forces the csv-module backend.
+CSV_BACKEND = os.getenv("CSV_BACKEND", "auto")
+
+# Marks a value that failed conversion in a converted column (None already means "empty").
+INVALID = object()
+
+
+def _python_columns(file):
+    """csv-module backend: tokenizes all rows in C, then transposes them into per-column lists."""
+    reader = csv.reader(file)
+    fieldnames = next(reader, None)
+    if not fieldnames:
+        return None, {}
+    rows = [row for row in reader if row] # csv.DictReader skips blank lines too
+    width = len(fieldnames)
+    if all(len(row) == width for row in rows):
+        transposed = [list(map(itemgetter(index), rows)) for index in range(width)]
+    else: # Ragged rows: short rows read as None and extra values are dropped, like DictReader's restval
+        transposed = [[row[index] if index < len(row) else None for row in rows] for index in range(width)]
+    # Duplicate header names resolve to the last column, as in DictReader.
+    return fieldnames, {name: transposed[index] for index, name in enumerate(fieldnames)}
+
+
+def _pyarrow_columns(file):
+    """pyarrow backend: multi-threaded tokenizing with every column kept as text; ragged input falls back to the csv module."""
+    text = file.read()
+    header_line = text.split("\n", 1)[0]
+    fieldnames = next(csv.reader(io.StringIO(header_line)), None)
+    if not fieldnames:
+        return None, {}
+    if len(set(fieldnames)) != len(fieldnames):
+        return _python_columns(io.StringIO(text, newline=""))
+    try:
+        table = pyarrow_csv.read_csv(
+            io.BytesIO(text.encode("utf-8")),
+            parse_options=pyarrow_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pyarrow_csv.ConvertOptions(column_types={name: pyarrow.string() for name in fieldnames},
+                                                        strings_can_be_null=False))
+    except pyarrow.ArrowInvalid: # e.g. rows with a different number of fields; let the csv module handle them
+        return _python_columns(io.StringIO(text, newline=""))
+    return fieldnames, {name: table.column(name).to_pylist() for name in fieldnames}
+
+
+def read_csv_columns(file, backend=None):
+    """
+    Reads an open CSV file object (header row first) into whole columns.
+    Returns (fieldnames, {column name: sequence of str}); fieldnames is None if there is no header row.
+    Row i of every column is the i-th non-blank data row, so enumerate(..., 1) gives DictReader's row numbers.
+    """
+    backend = backend or CSV_BACKEND
+    if backend == "pyarrow" or (backend == "auto" and pyarrow is not None):
+        return _pyarrow_columns(file)
+    return _python_columns(file)
+
+
+def convert_column(values, convert):
+    """
+    Converts a whole column, calling convert once per distinct value and mapping the results back.
+    Empty values become None; values convert rejects (ValueError/TypeError) become INVALID.
+    Export columns like dates, years and ratings repeat heavily, so this parses a few thousand
+    distinct strings instead of every row.
+    """
+    converted = {}
+    for value in set(values):
+        if not value:
+            converted[value] = None
+            continue
+        try:
+            converted[value] = convert(value)
+        except (ValueError, TypeError):
+            converted[value] = INVALID
+    return list(map(converted.__getitem__, values))
+
+
+def parse_iso_date(value):
+    """Letterboxd CSV dates are YYYY-MM-DD."""
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def parse_rating(value):
+    """Ratings are stars as decimals; blank after stripping counts as no rating."""
+    value = value.strip()
+    return float(value) if value else None
+
+
+class RowProblems:
+    """Collects per-row validation problems while a CSV is parsed, for one batched report at the end."""
+
+    def __init__(self, source_name):
+        self.source_name = source_name
+        self.messages = []
+        self.kinds = Counter()
+
+    def add(self, kind, message):
+        self.kinds[kind] += 1
+        self.messages.append(message)
+
+    def report(self, max_listed=20):
+        """Logs a single warning with counts per problem kind and the first max_listed messages."""
+        if not self.messages:
+            return
+        detail = [f"  {message}" for message in self.messages[:max_listed]]
+        if len(self.messages) > max_listed:
+            detail.append(f"  ... and {len(self.messages) - max_listed} more.")
+        kinds = ", ".join(f"{kind}: {count}" for kind, count in self.kinds.most_common())
+        LOG.log(WARNING, f"{len(self.messages)} row problem(s) in '{self.source_name}' ({kinds}):", detail=detail,
+                problem_counts=dict(self.kinds))
+        if len(self.messages) > max_listed:
+            LOG.debug(f"All row problems in '{self.source_name}':", detail=self.messages)
@@ -0,0 +1,121 @@
+import psycopg2
+from psycopg2 import sql
+
+from runLogger import LOG
+from runMetrics import RUN_METRICS, STAGE_DASHBOARD_REFRESH
+
+# Materialized views behind the dashboard's aggregate charts (see db_queries.go). Each one holds the
+# un-limited, un-ordered result of the query the Go handler used to run on every page load, so the
+# read path is an index scan however large the library grows. Every view needs a unique index for
+# REFRESH MATERIALIZED VIEW CONCURRENTLY, which rebuilds it without blocking dashboard reads.
+# The director/actor views aggregate the normalized credits (filmCredits.py) through the
+# film_credits (role, person_id) index, grouped by TMDb person so namesakes are counted apart.
+# Films without credits for the role (enriched before film_credits existed and not backfilled yet)
+# still count through their films arrays, under the credited person of the same name if there is
+# exactly one, or else under the name itself; with no credits at all this is the old array aggregation.
+_TOP_PEOPLE_QUERY = """
+    WITH credited AS (
+        SELECT c.film_id, p.tmdb_person_id::text AS person_key, p.name, p.profile_path AS path
+        FROM film_credits c
+        JOIN people p ON p.tmdb_person_id = c.person_id
+        WHERE c.role = '{role}'
+    ), uncredited AS (
+        SELECT f.id AS film_id, u.name, u.path
+        FROM films f, LATERAL UNNEST(f.{names}, f.{paths}) AS u(name, path)
+        WHERE u.name IS NOT NULL AND u.name <> ''
+            AND NOT EXISTS (SELECT 1 FROM film_credits c WHERE c.film_id = f.id AND c.role = '{role}')
+    ), credited_names AS (
+        SELECT name, MIN(person_key) AS person_key
+        FROM credited
+        GROUP BY name
+        HAVING COUNT(DISTINCT person_key) = 1
+    )
+    SELECT
+        a.person_key,
+        MIN(a.name) AS {name_column},
+        (ARRAY_AGG(a.path) FILTER (WHERE a.path IS NOT NULL AND a.path <> ''))[1] AS {path_column},
+        COUNT(DISTINCT a.film_id) AS {count_column}
+    FROM (
+        SELECT film_id, person_key, name, path FROM credited
+        UNION ALL
+        SELECT u.film_id, COALESCE(n.person_key, 'name:' || u.name), u.name, u.path
+        FROM uncredited u
+        LEFT JOIN credited_names n ON n.name = u.name
+    ) AS a
+    GROUP BY a.person_key
+"""
+# name -> (source table, defining query, unique index columns, extra index columns for the ORDER BY)
+DASHBOARD_VIEWS = {
+    "dashboard_top_directors": ("film_credits", _TOP_PEOPLE_QUERY.format(
+        role="director", names="directors", paths="directors_profile_paths",
+        name_column="director_name", path_column="director_profile_path", count_column="film_count"),
+        ("person_key",), ("film_count DESC",)),
+    "dashboard_top_actors": ("film_credits", _TOP_PEOPLE_QUERY.format(
+        role="actor", names="actors", paths="actor_profile_paths",
+        name_column="actor_name", path_column="actor_profile_path", count_column="movie_count"),
+        ("person_key",), ("movie_count DESC",)),
+    "dashboard_genre_counts": ("films", """
+        SELECT g.genre_name, COUNT(*) AS movie_count
+        FROM films, UNNEST(genres) AS g(genre_name)
+        WHERE g.genre_name IS NOT NULL AND g.genre_name <> ''
+        GROUP BY g.genre_name
+    """, ("genre_name",), ("movie_count DESC",)),
+    "dashboard_watch_month_counts": ("diary_entries", """
+        SELECT
+            EXTRACT(YEAR FROM watched_date)::integer AS watch_year,
+            EXTRACT(MONTH FROM watched_date)::integer AS watch_month,
+            TRIM(TO_CHAR(MIN(watched_date), 'Month')) AS month_name,
+            COUNT(*) AS movies_watched_count
+        FROM diary_entries
+        WHERE watched_date IS NOT NULL
+        GROUP BY watch_year, watch_month
+    """, ("watch_year", "watch_month"), None),
+}
+
+
+def _create_view(cursor, name, query, unique_columns, order_columns):
+    cursor.execute(sql.SQL("CREATE MATERIALIZED VIEW {view} AS {query}").format(view=sql.Identifier(name), query=sql.SQL(query)))
+    cursor.execute(sql.SQL("CREATE UNIQUE INDEX {index} ON {view} ({columns})").format(
+        index=sql.Identifier(f"{name}_key"), view=sql.Identifier(name),
+        columns=sql.SQL(", ").join(map(sql.Identifier, unique_columns))))
+    if order_columns:
+        cursor.execute(sql.SQL("CREATE INDEX {index} ON {view} ({columns})").format(
+            index=sql.Identifier(f"{name}_order_idx"), view=sql.Identifier(name), columns=sql.SQL(", ".join(order_columns))))
+
+
+def refresh_dashboard_views(conn, source_tables=None):
+    """
+    Brings the dashboard views up to date after a load or enrichment run: views that do not exist yet
+    are created (which populates them), existing ones are refreshed concurrently. Only views reading
+    from source_tables are touched (all of them by default); views whose source table does not exist
+    yet are skipped. Each view commits on its own, and a failure is logged and rolled back without
+    affecting the others or the load itself. Returns the number of views created or refreshed.
+    """
+    done = 0
+    for name, (source_table, query, unique_columns, order_columns) in DASHBOARD_VIEWS.items():
+        if source_tables is not None and source_table not in source_tables:
+            continue
+        try:
+            with RUN_METRICS.time_stage(STAGE_DASHBOARD_REFRESH):
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT to_regclass(%s) IS NOT NULL, to_regclass(%s) IS NOT NULL", (source_table, name))
+                    source_exists, view_exists = cursor.fetchone()
+                    if not source_exists:
+                        LOG.debug(f"Dashboard view '{name}' skipped: table '{source_table}' does not exist yet.")
+                        conn.rollback()
+                        continue
+                    if view_exists:
+                        cursor.execute(sql.SQL("REFRESH MATERIALIZED VIEW CONCURRENTLY {view}").format(view=sql.Identifier(name)))
+                    else:
+                        _create_view(cursor, name, query, unique_columns, order_columns)
+                conn.commit()
+            RUN_METRICS.increment("db_statements_total", operation="refresh_view" if view_exists else "create_view")
+            RUN_METRICS.increment("db_commits_total")
+            LOG.debug(f"Dashboard view '{name}' {'refreshed' if view_exists else 'created'}.")
+            done += 1
+        except psycopg2.Error as e:
+            conn.rollback()
+            LOG.warning(f"Could not update dashboard view '{name}': {e}")
+    if done:
+        LOG.info(f"Refreshed {done} dashboard view(s).")
+    return done
@@ -0,0 +1,36 @@
+import os
+
+from dotenv import load_dotenv
+
+from runLogger import LOG
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Database connection parameters shared by the loaders and letterboxdCli.py
+DB_NAME = os.getenv("DB_NAME")
+DB_USER = os.getenv("DB_USER")
+DB_PASSWORD = os.getenv("DB_PASSWORD")
+DB_HOST = os.getenv("DB_HOST")
+DB_PORT = os.getenv("DB_PORT")
+
+
+def connect_db():
+    """
+    Connects with the DB_* settings from .env, or logs why it could not and returns None.
+    psycopg2 is imported here rather than at module load, so commands that stop before
+    touching the database (bad arguments, --help) start without it.
+    """
+    if not all([DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT]):
+        LOG.error("Error: Database credentials are not fully set in the .env file.")
+        LOG.error("Please ensure DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, and DB_PORT are defined.")
+        return None
+
+    import psycopg2
+    try:
+        conn = psycopg2.connect(dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD, host=DB_HOST, port=DB_PORT)
+    except psycopg2.Error as e:
+        LOG.error(f"Database connection error: {e}")
+        return None
+    LOG.info("Successfully connected to PostgreSQL database.")
+    return conn
@@ -0,0 +1,54 @@
+import os
+import re
+
+# pg_dump plain-format backup shipped with the repo; its data is the shape our imports see in practice.
+DEFAULT_DUMP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DatabaseDump", "LetterboxdDatabaseDump5-6-25.sql")
+
+_COPY_HEADER = re.compile(r"^COPY (?:\w+\.)?(\w+) \(([^)]*)\) FROM stdin;$")
+_COPY_ESCAPES = {"\\\\": "\\", "\\t": "\t", "\\n": "\n", "\\r": "\r", "\\b": "\b", "\\f": "\f", "\\v": "\v"}
+_COPY_ESCAPE = re.compile(r"\\[\\tnrbfv]")
+_ARRAY_ELEMENT = re.compile(r'"((?:[^"\\]|\\.)*)"|([^,]+)')
+
+
+def decode_copy_value(value):
+    """Decodes one field of PostgreSQL's COPY text format (the inverse of pgBulk.copy_text_value)."""
+    if value == "\\N":
+        return None
+    return _COPY_ESCAPE.sub(lambda match: _COPY_ESCAPES[match.group(0)], value)
+
+
+def parse_text_array(value):
+    """Parses a one-dimensional text[] literal such as '{Drama,"Science Fiction"}' into a list (None stays None)."""
+    if value is None:
+        return None
+    body = value[1:-1]
+    elements = []
+    for quoted, bare in _ARRAY_ELEMENT.findall(body):
+        if bare:
+            elements.append(None if bare == "NULL" else bare)
+        else:
+            elements.append(re.sub(r"\\(.)", r"\1", quoted))
+    return elements
+
+
+def iter_copy_rows(dump_path, table):
+    """Yields each row of `table`'s COPY block in a plain-format pg_dump file as a {column: text-or-None} dict."""
+    with open(dump_path, encoding="utf-8") as dump_file:
+        columns = None
+        for line in dump_file:
+            line = line.rstrip("\n")
+            if columns is None:
+                header = _COPY_HEADER.match(line)
+                if header and header.group(1) == table:
+                    columns = [column.strip() for column in header.group(2).split(",")]
+                continue
+            if line == "\\.":
+                return
+            yield dict(zip(columns, (decode_copy_value(field) for field in line.split("\t"))))
+
+
+def load_dump_tables(dump_path=DEFAULT_DUMP_PATH):
+    """Returns (films, diary_entries, ratings_entries) from the dump as lists of row dicts."""
+    return (list(iter_copy_rows(dump_path, "films")),
+            list(iter_copy_rows(dump_path, "diary_entries")),
+            list(iter_copy_rows(dump_path, "ratings_entries")))
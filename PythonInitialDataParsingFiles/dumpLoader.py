@@ -0,0 +1,422 @@
+import argparse
+import mmap
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+import dbConnection
+from dashboardStats import refresh_dashboard_views
+from runLogger import LOG, add_logging_arguments, configure_from_args
+from runMetrics import RUN_METRICS, STAGE_DB_WRITE
+from schemaMigrations import run_migrations
+
+# Connections loading data (and building deferred indexes) at the same time.
+DUMP_LOAD_JOBS = int(os.getenv("DUMP_LOAD_JOBS", "4"))
+
+# COPY blocks are cut into line-aligned chunks of about this many bytes, each streamed on its own connection
+# and committed on its own, so one large table is loaded in parallel too.
+DUMP_LOAD_CHUNK_BYTES = int(os.getenv("DUMP_LOAD_CHUNK_BYTES", str(64 * 1024 * 1024)))
+
+# Bytes handed to the server per read while a chunk streams; memory use is about jobs x this, whatever the dump size.
+COPY_READ_SIZE = 1024 * 1024
+
+_COPY_HEADER = re.compile(r"^COPY (\S+) \(([^)]*)\) FROM stdin;$")
+_DOLLAR_TAG = re.compile(r"\$(?:[A-Za-z_][A-Za-z_0-9]*)?\$")
+# Statements that only need to exist once the data is in: building them afterwards is one pass per index
+# instead of per-row maintenance, and constraint/trigger checks are not paid row by row during COPY.
+_DEFERRED = re.compile(r"^(ALTER TABLE (ONLY )?\S+ ADD CONSTRAINT |CREATE (UNIQUE )?INDEX |CREATE (CONSTRAINT )?TRIGGER |"
+                       r"ALTER TABLE (ONLY )?\S+ (ENABLE|DISABLE) |ALTER TABLE (ONLY )?\S+ CLUSTER ON |CREATE RULE |"
+                       r"REFRESH MATERIALIZED VIEW )", re.IGNORECASE)
+_DEFERRED_TABLE = re.compile(r"^(?:ALTER TABLE (?:ONLY )?(\S+)|CREATE (?:UNIQUE )?INDEX .*? ON (?:ONLY )?(\S+))", re.IGNORECASE)
+_FOREIGN_KEY = re.compile(r" FOREIGN KEY ", re.IGNORECASE)
+_CREATE_TABLE = re.compile(r"^CREATE (?:UNLOGGED )?TABLE (\S+)", re.IGNORECASE)
+
+
+class CopyChunk:
+    """A line-aligned byte range [start, end) of one table's COPY data in the dump file."""
+    __slots__ = ("table", "copy_statement", "start", "end")
+
+    def __init__(self, table, copy_statement, start, end):
+        self.table = table
+        self.copy_statement = copy_statement
+        self.start = start
+        self.end = end
+
+
+class DumpPlan:
+    """
+    A plain-format pg_dump split into restore phases. Statements are kept as text (a dump's DDL is small);
+    COPY data is only located by byte offsets, never read into memory.
+    """
+
+    def __init__(self):
+        self.session_statements = []   # SET / set_config: replayed on every connection
+        self.schema_statements = []    # Tables, sequences, functions, defaults: run before the data
+        self.copy_chunks = []          # CopyChunk list, in dump order
+        self.deferred_statements = []  # Constraints, indexes, triggers: run after the data
+        self.sequence_statements = []  # setval calls
+        self.owner_statements = []     # ALTER ... OWNER TO, skipped unless keep_owners
+        self.tables = []               # Tables with COPY data, in dump order
+
+    def statement_count(self):
+        return (len(self.session_statements) + len(self.schema_statements) + len(self.deferred_statements)
+                + len(self.sequence_statements) + len(self.owner_statements))
+
+
+def _ends_statement(text):
+    """True if text ends with a ';' outside string literals, quoted identifiers, dollar-quoted bodies and comments."""
+    complete = False
+    i, n = 0, len(text)
+    while i < n:
+        char = text[i]
+        if char in "'\"":
+            escapes = char == "'" and i > 0 and text[i - 1] in "Ee" # E'...' strings use backslash escapes
+            i += 1
+            while True:
+                if i >= n:
+                    return False
+                if escapes and text[i] == "\\":
+                    i += 2
+                    continue
+                if text[i] == char:
+                    if i + 1 < n and text[i + 1] == char: # Doubled quote
+                        i += 2
+                        continue
+                    break
+                i += 1
+            complete = False
+        elif char == "-" and text.startswith("--", i):
+            newline = text.find("\n", i)
+            if newline < 0:
+                break
+            i = newline
+        elif char == "$" and _DOLLAR_TAG.match(text, i):
+            tag = _DOLLAR_TAG.match(text, i).group(0)
+            close = text.find(tag, i + len(tag))
+            if close < 0:
+                return False
+            i = close + len(tag) - 1
+            complete = False
+        elif char == ";":
+            complete = True
+        elif not char.isspace():
+            complete = False
+        i += 1
+    return complete
+
+
+def _strip_comments(statement):
+    """Drops the leading '--' comment lines pg_dump puts before each statement."""
+    lines = statement.split("\n")
+    while lines and (not lines[0].strip() or lines[0].lstrip().startswith("--")):
+        lines.pop(0)
+    return "\n".join(lines).strip()
+
+
+def _chunk_ranges(dump_map, start, end, chunk_bytes):
+    """Cuts [start, end) into ranges of about chunk_bytes that each end just after a newline (one COPY row per line)."""
+    ranges = []
+    while start < end:
+        cut = min(start + chunk_bytes, end)
+        if cut < end:
+            newline = dump_map.find(b"\n", cut - 1, end)
+            cut = end if newline < 0 else newline + 1
+        ranges.append((start, cut))
+        start = cut
+    return ranges
+
+
+def plan_dump(dump_path, tables=None, chunk_bytes=None):
+    """
+    Scans a plain-format pg_dump once and returns its DumpPlan. The file is memory-mapped: statements are read
+    line by line, while each COPY block's data is skipped with a single search for its '\\.' terminator, so
+    scanning costs little more than reading the DDL however large the data is. `tables` limits the data to
+    those table names (schema-qualified or not); schema and deferred statements are kept for all tables.
+    """
+    chunk_bytes = chunk_bytes or DUMP_LOAD_CHUNK_BYTES
+    wanted = None if tables is None else {name.split(".")[-1] for name in tables}
+    plan = DumpPlan()
+    with open(dump_path, "rb") as dump_file, mmap.mmap(dump_file.fileno(), 0, access=mmap.ACCESS_READ) as dump_map:
+        pending_lines = []
+        while True:
+            line = dump_map.readline()
+            if not line:
+                break
+            pending_lines.append(line.decode("utf-8"))
+            statement = "".join(pending_lines)
+            if not _ends_statement(statement):
+                continue
+            pending_lines = []
+            statement = _strip_comments(statement)
+            if not statement:
+                continue
+            normalized = " ".join(statement.split())
+
+            copy_header = _COPY_HEADER.match(statement)
+            if copy_header:
+                data_start = dump_map.tell()
+                # The data ends with the same line endings as its header line: CRLF in a dump saved on Windows.
+                end_marker = b"\\.\r\n" if line.endswith(b"\r\n") else b"\\.\n"
+                terminator = dump_map.find(b"\n" + end_marker, data_start - 1)
+                if terminator < 0:
+                    raise ValueError(f"COPY data for {copy_header.group(1)} in '{dump_path}' has no '\\.' terminator.")
+                data_end = terminator + 1
+                dump_map.seek(data_end + len(end_marker))
+                table = copy_header.group(1)
+                if wanted is None or table.split(".")[-1] in wanted:
+                    plan.tables.append(table)
+                    copy_statement = statement[:-len("stdin;")] + "STDIN"
+                    plan.copy_chunks.extend(CopyChunk(table, copy_statement, start, end)
+                                            for start, end in _chunk_ranges(dump_map, data_start, data_end, chunk_bytes))
+            elif normalized.startswith(("SET ", "SELECT pg_catalog.set_config(")):
+                plan.session_statements.append(statement)
+            elif normalized.startswith("SELECT pg_catalog.setval("):
+                plan.sequence_statements.append(statement)
+            elif " OWNER TO " in normalized and normalized.startswith("ALTER "):
+                plan.owner_statements.append(statement)
+            elif _DEFERRED.match(normalized):
+                plan.deferred_statements.append(statement)
+            else:
+                plan.schema_statements.append(statement)
+    return plan
+
+
+class DumpRangeReader:
+    """File-like object over bytes [start, end) of the dump; copy_expert pulls it COPY_READ_SIZE at a time."""
+
+    def __init__(self, dump_path, start, end):
+        self.dump_file = open(dump_path, "rb")
+        self.dump_file.seek(start)
+        self.remaining = end - start
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        data = self.dump_file.read(self.remaining if size is None or size < 0 else min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+    readline = read
+
+    def close(self):
+        self.dump_file.close()
+
+
+def _connection_factory(dsn):
+    """Returns a function opening a new connection to the target: the DSN if given, else the .env settings."""
+    if dsn:
+        return lambda: psycopg2.connect(dsn)
+    return lambda: psycopg2.connect(dbname=dbConnection.DB_NAME, user=dbConnection.DB_USER, password=dbConnection.DB_PASSWORD,
+                                    host=dbConnection.DB_HOST, port=dbConnection.DB_PORT)
+
+
+def _open_session(connect, plan):
+    conn = connect()
+    with conn.cursor() as cursor:
+        for statement in plan.session_statements:
+            cursor.execute(statement)
+        # A fixture database is rebuilt from the dump if the server crashes mid-load; don't wait for WAL flushes.
+        cursor.execute("SET synchronous_commit = off")
+    conn.commit()
+    return conn
+
+
+def _run_in_parallel(connect, plan, jobs, tasks, work):
+    """
+    Runs work(conn, task) for every task on `jobs` worker threads, each with its own session-configured
+    connection (opened lazily and reused across tasks). Returns the results; the first failure is re-raised.
+    """
+    connections = []
+
+    def run(task):
+        conn = getattr(thread_state, "conn", None)
+        if conn is None:
+            conn = thread_state.conn = _open_session(connect, plan)
+            connections.append(conn)
+        try:
+            return work(conn, task)
+        except psycopg2.Error:
+            conn.rollback()
+            raise
+
+    thread_state = threading.local()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            return list(executor.map(run, tasks))
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+def _copy_chunk(dump_path, conn, chunk):
+    """Streams one CopyChunk with COPY FROM STDIN and commits it. Returns (table, rows loaded)."""
+    reader = DumpRangeReader(dump_path, chunk.start, chunk.end)
+    try:
+        with RUN_METRICS.time_stage(STAGE_DB_WRITE):
+            with conn.cursor() as cursor:
+                RUN_METRICS.increment("db_statements_total", operation="copy")
+                cursor.copy_expert(chunk.copy_statement, reader, size=COPY_READ_SIZE)
+                rows = max(cursor.rowcount, 0)
+            conn.commit()
+        RUN_METRICS.increment("db_commits_total")
+    finally:
+        reader.close()
+    RUN_METRICS.increment("dump_rows_loaded_total", rows, table=chunk.table)
+    return chunk.table, rows
+
+
+def _run_statements(conn, statements):
+    with conn.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+            RUN_METRICS.increment("db_statements_total", operation="restore_ddl")
+    conn.commit()
+
+
+def _fix_sequences(conn, tables):
+    """Moves every sequence owned by a column of `tables` past the largest value loaded into that column."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT d.objid::regclass::text, quote_ident(a.attname), d.refobjid::regclass::text
+            FROM unnest(%s::text[]) AS t(name)
+            JOIN pg_depend AS d ON d.refobjid = to_regclass(t.name) AND d.classid = 'pg_class'::regclass AND d.deptype IN ('a', 'i')
+            JOIN pg_class AS c ON c.oid = d.objid AND c.relkind = 'S'
+            JOIN pg_attribute AS a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid;
+        """, (list(tables),))
+        owned_sequences = cursor.fetchall()
+        for sequence, column, table in owned_sequences:
+            cursor.execute(f"SELECT setval(%s, COALESCE(MAX({column}), 1), MAX({column}) IS NOT NULL) FROM {table}", (sequence,))
+    conn.commit()
+    return len(owned_sequences)
+
+
+def restore_dump(dump_path, dsn=None, tables=None, jobs=None, chunk_bytes=None, clean=False, keep_owners=False):
+    """
+    Restores a plain-format pg_dump much faster than a serial `psql -f` replay:
+
+    1. schema (tables, sequences, functions) on one connection, in one transaction;
+    2. COPY data streamed straight from the file in line-aligned chunks over `jobs` parallel connections,
+       before any index, constraint or trigger exists;
+    3. deferred indexes, constraints and triggers, grouped per table and built in parallel; foreign keys last;
+    4. the dump's setval calls, then every owned sequence moved past the loaded data; ANALYZE.
+
+    clean=True first drops the dump's tables (CASCADE, so dependent views and foreign keys go too) and
+    replaces its functions. Ownership statements are skipped unless keep_owners (like pg_restore --no-owner).
+    The schema migrations and dashboard views are brought up to date afterwards. Returns True on success.
+    """
+    jobs = jobs or DUMP_LOAD_JOBS
+    started = time.perf_counter()
+    try:
+        plan = plan_dump(dump_path, tables, chunk_bytes)
+    except FileNotFoundError:
+        LOG.error(f"Error: Dump file '{dump_path}' not found.")
+        return False
+    except (ValueError, UnicodeDecodeError) as e:
+        LOG.error(f"Error: Could not parse '{dump_path}': {e}")
+        return False
+    LOG.info(f"Planned restore of '{dump_path}' in {time.perf_counter() - started:.2f}s: {plan.statement_count()} statement(s), "
+             f"{len(plan.copy_chunks)} COPY chunk(s) for {', '.join(plan.tables) or 'no tables'}.")
+
+    connect = _connection_factory(dsn)
+    schema_statements = list(plan.schema_statements)
+    if keep_owners:
+        schema_statements += plan.owner_statements
+    conn = None
+    try:
+        conn = _open_session(connect, plan)
+        if clean:
+            created_tables = [match.group(1) for match in map(_CREATE_TABLE.match, schema_statements) if match]
+            schema_statements = [re.sub(r"^CREATE FUNCTION ", "CREATE OR REPLACE FUNCTION ", statement, flags=re.IGNORECASE)
+                                 for statement in schema_statements]
+            with conn.cursor() as cursor:
+                for table in created_tables:
+                    cursor.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
+                # Index versions recorded for the dropped tables no longer hold; the runner re-checks them all.
+                cursor.execute("SELECT to_regclass('public.schema_migrations') IS NOT NULL")
+                if cursor.fetchone()[0]:
+                    cursor.execute("DELETE FROM public.schema_migrations")
+            conn.commit()
+            LOG.info(f"Dropped {len(created_tables)} existing table(s) before restoring.")
+
+        phase_started = time.perf_counter()
+        _run_statements(conn, schema_statements)
+        LOG.info(f"Schema: {len(schema_statements)} statement(s) in {time.perf_counter() - phase_started:.2f}s.")
+
+        phase_started = time.perf_counter()
+        loaded_rows = {table: 0 for table in plan.tables}
+        for table, rows in _run_in_parallel(connect, plan, jobs, plan.copy_chunks,
+                                            lambda chunk_conn, chunk: _copy_chunk(dump_path, chunk_conn, chunk)):
+            loaded_rows[table] += rows
+        LOG.info(f"Data: {sum(loaded_rows.values())} row(s) over {jobs} connection(s) in {time.perf_counter() - phase_started:.2f}s "
+                 f"({', '.join(f'{table}: {rows}' for table, rows in loaded_rows.items())}).")
+
+        phase_started = time.perf_counter()
+        per_table, last = {}, []
+        for statement in plan.deferred_statements:
+            normalized = " ".join(statement.split())
+            target = _DEFERRED_TABLE.match(normalized)
+            if target and not _FOREIGN_KEY.search(normalized):
+                per_table.setdefault(target.group(1) or target.group(2), []).append(statement)
+            else: # Foreign keys need the referenced keys first; triggers and anything unrecognized keep dump order
+                last.append(statement)
+        _run_in_parallel(connect, plan, jobs, list(per_table.values()), _run_statements)
+        _run_statements(conn, last)
+        LOG.info(f"Indexes, constraints and triggers: {len(plan.deferred_statements)} statement(s) in {time.perf_counter() - phase_started:.2f}s.")
+
+        _run_statements(conn, plan.sequence_statements)
+        fixed = _fix_sequences(conn, plan.tables)
+        # pg_dump empties search_path for the restore; the migrations and views use unqualified names.
+        _run_statements(conn, [f"ANALYZE {table}" for table in plan.tables] + ["RESET search_path"])
+        LOG.info(f"Sequences: {len(plan.sequence_statements)} setval(s) from the dump, {fixed} checked against the loaded data.")
+    except psycopg2.Error as e:
+        if conn is not None and not conn.closed:
+            conn.rollback()
+        LOG.error(f"Error restoring '{dump_path}': {e}")
+        if conn is not None and not conn.closed:
+            conn.close()
+        return False
+
+    try:
+        run_migrations(conn)
+        refresh_dashboard_views(conn)
+    finally:
+        conn.close()
+    LOG.info(f"Restored '{dump_path}' in {time.perf_counter() - started:.2f}s.")
+    return True
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Restore a plain-format pg_dump from DatabaseDump/ with parallel COPY streams.")
+    arg_parser.add_argument("dump_path", metavar="dump.sql")
+    arg_parser.add_argument("--dsn", help="Target database connection string (default: the DB_* settings from .env).")
+    arg_parser.add_argument("--tables", help="Comma-separated tables whose data to load (default: every table in the dump).")
+    arg_parser.add_argument("--jobs", type=int, default=DUMP_LOAD_JOBS, help="Parallel connections (default %(default)s).")
+    arg_parser.add_argument("--clean", action="store_true",
+                            help="Drop the dump's tables first (CASCADE: dependent views and foreign keys are dropped too).")
+    arg_parser.add_argument("--keep-owners", action="store_true", help="Also run the dump's ALTER ... OWNER TO statements.")
+    arg_parser.add_argument("--metrics-json", metavar="PATH", help="Write run counters and per-stage latency histograms to this JSON file.")
+    arg_parser.add_argument("--metrics-prometheus", metavar="PATH", help="Also write the run metrics in Prometheus text format.")
+    add_logging_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    configure_from_args(args)
+    if not args.dsn and not all([dbConnection.DB_NAME, dbConnection.DB_USER, dbConnection.DB_PASSWORD,
+                                 dbConnection.DB_HOST, dbConnection.DB_PORT]):
+        LOG.error("Error: pass --dsn or set DB_NAME, DB_USER, DB_PASSWORD, DB_HOST and DB_PORT in the .env file.")
+        LOG.close()
+        return 1
+    try:
+        restored = restore_dump(args.dump_path, dsn=args.dsn, tables=args.tables.split(",") if args.tables else None,
+                                jobs=args.jobs, clean=args.clean, keep_owners=args.keep_owners)
+    finally:
+        LOG.info(RUN_METRICS.summary())
+        RUN_METRICS.write_reports(args.metrics_json, args.metrics_prometheus)
+        LOG.close()
+    return 0 if restored else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+# Default on-disk location of the enrichment run journal.
+DEFAULT_JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".enrichment_journal.sqlite3")
+
+# Per-film outcomes recorded in the journal.
+OUTCOME_MATCHED = "matched"
+OUTCOME_DELETED = "deleted"
+OUTCOME_COLLISION = "collision"
+OUTCOME_FAILED = "failed"
+
+# Failure kinds: transient failures (timeouts, 429/5xx, failed DB batches) are retried on resume,
+# permanent ones (other 4xx responses) are not.
+FAILURE_TRANSIENT = "transient"
+FAILURE_PERMANENT = "permanent"
+
+
+class EnrichmentJournal:
+    """
+    SQLite-backed journal of enrichment runs.
+    Each run has a run id; every film processed in it gets one row recording its outcome,
+    whether its DB write has committed, and, for matched/deleted films, the prepared write itself.
+    A resumed run skips finished films and replays prepared-but-uncommitted writes without
+    repeating their TMDb calls. Meant to be used from a single thread.
+    record() does not commit, so the journal costs one SQLite commit per write batch rather than per film:
+    call commit() before committing the matching database batch. Records lost to a crash before that only
+    cost the affected films a repeat of their TMDb calls, since their database rows are still pending too.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self.run_id = None
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                backlog_size INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS film_progress (
+                run_id TEXT NOT NULL REFERENCES runs(run_id),
+                letterboxd_uri TEXT NOT NULL,
+                outcome TEXT NOT NULL,
+                failure_kind TEXT,
+                detail TEXT,
+                write_payload TEXT,
+                written INTEGER NOT NULL DEFAULT 0,
+                recorded_at REAL NOT NULL,
+                PRIMARY KEY (run_id, letterboxd_uri)
+            );
+        """)
+        self._db.commit()
+
+    def start_run(self, backlog_size):
+        """Starts a new run and returns its id."""
+        self.run_id = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        self._db.execute("INSERT INTO runs (run_id, started_at, backlog_size) VALUES (?, ?, ?)",
+                         (self.run_id, time.time(), backlog_size))
+        self._db.commit()
+        return self.run_id
+
+    def latest_unfinished_run(self):
+        """Returns the id of the most recently started run that never finished, or None."""
+        row = self._db.execute(
+            "SELECT run_id FROM runs WHERE finished_at IS NULL ORDER BY started_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def resume_run(self, run_id):
+        """Makes run_id the current run so further progress is recorded against it."""
+        if self._db.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone() is None:
+            raise ValueError(f"Unknown enrichment run id '{run_id}'.")
+        self.run_id = run_id
+
+    def record(self, letterboxd_uri, outcome, write_payload=None, failure_kind=None, detail=None):
+        """Records (or overwrites) the outcome of one film in the current run. Durable once commit() is called."""
+        self._db.execute("""
+            INSERT OR REPLACE INTO film_progress
+                (run_id, letterboxd_uri, outcome, failure_kind, detail, write_payload, written, recorded_at)
+            VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+        """, (self.run_id, letterboxd_uri, outcome, failure_kind, detail,
+              json.dumps(write_payload) if write_payload is not None else None, time.time()))
+
+    def commit(self):
+        """Makes every record() since the last commit durable."""
+        self._db.commit()
+
+    def mark_written(self, letterboxd_uris):
+        """Marks the prepared writes of these films as committed to the database."""
+        self._db.executemany("UPDATE film_progress SET written = 1 WHERE run_id = ? AND letterboxd_uri = ?",
+                             [(self.run_id, uri) for uri in letterboxd_uris])
+        self._db.commit()
+
+    def mark_failed(self, letterboxd_uris, failure_kind, detail=None):
+        """Turns these films' outcome into a failure (e.g. their DB batch was rolled back)."""
+        self._db.executemany("""
+            UPDATE film_progress SET outcome = ?, failure_kind = ?, detail = ?, written = 0
+            WHERE run_id = ? AND letterboxd_uri = ?
+        """, [(OUTCOME_FAILED, failure_kind, detail, self.run_id, uri) for uri in letterboxd_uris])
+        self._db.commit()
+
+    def finished_uris(self):
+        """Films needing no further work in the current run: committed writes, collisions and permanent failures."""
+        rows = self._db.execute("""
+            SELECT letterboxd_uri FROM film_progress
+            WHERE run_id = ? AND (
+                written = 1 OR outcome = ? OR (outcome = ? AND failure_kind = ?)
+            )
+        """, (self.run_id, OUTCOME_COLLISION, OUTCOME_FAILED, FAILURE_PERMANENT))
+        return {row[0] for row in rows}
+
+    def pending_writes(self):
+        """Returns (letterboxd_uri, outcome, write_payload) for matched/deleted films whose write never committed."""
+        rows = self._db.execute("""
+            SELECT letterboxd_uri, outcome, write_payload FROM film_progress
+            WHERE run_id = ? AND written = 0 AND outcome IN (?, ?)
+        """, (self.run_id, OUTCOME_MATCHED, OUTCOME_DELETED))
+        return [(uri, outcome, json.loads(payload) if payload is not None else None) for uri, outcome, payload in rows]
+
+    def outcome_counts(self):
+        """Returns {outcome: count} for the current run."""
+        rows = self._db.execute("SELECT outcome, COUNT(*) FROM film_progress WHERE run_id = ? GROUP BY outcome", (self.run_id,))
+        return dict(rows.fetchall())
+
+    def finish_run(self):
+        """Marks the current run as complete; it will no longer be offered for --resume."""
+        self._db.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), self.run_id))
+        self._db.commit()
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
@@ -0,0 +1,106 @@
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+from runMetrics import RUN_METRICS
+
+# Credit roles stored in film_credits.role.
+ROLE_DIRECTOR = "director"
+ROLE_ACTOR = "actor"
+
+# Normalized credits: one people row per TMDb person (name and profile image stored once), and one
+# film_credits row per (film, role, billing position). The (role, person_id) index turns "top directors/actors"
+# into an index-backed GROUP BY; (person_id) serves per-person lookups and the people foreign key.
+CREDIT_TABLES_DDL = sql.SQL("""
+    CREATE TABLE IF NOT EXISTS people (
+        tmdb_person_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        profile_path TEXT, -- Full profile image URL, as in the films.*_profile_paths arrays
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS film_credits (
+        film_id INTEGER NOT NULL REFERENCES films(id) ON DELETE CASCADE,
+        person_id INTEGER NOT NULL REFERENCES people(tmdb_person_id),
+        role TEXT NOT NULL CHECK (role IN ('director', 'actor')),
+        billing_order SMALLINT NOT NULL, -- 0-based position in the TMDb crew/cast list as stored
+        PRIMARY KEY (film_id, role, billing_order)
+    );
+    CREATE INDEX IF NOT EXISTS film_credits_role_person_idx ON film_credits (role, person_id);
+    CREATE INDEX IF NOT EXISTS film_credits_person_idx ON film_credits (person_id);
+""")
+
+# Credits are passed around as (role, billing_order, tmdb_person_id, name, profile_url) tuples
+# (lists once they have been through the enrichment journal's JSON).
+
+
+def create_credit_tables(cursor):
+    """Creates people/film_credits and their indexes if missing. Needs the films table; does not commit."""
+    cursor.execute(CREDIT_TABLES_DDL)
+
+
+def credits_from_details(movie_details, top_n_actors, build_profile_url):
+    """
+    Credits of a /movie/{id}?append_to_response=credits payload for tools that take profile images from the
+    payload only: every director and the first top_n_actors cast members, numbered like the enrichment script
+    numbers them. People without a TMDb id are left out; build_profile_url turns a profile_path into the stored URL.
+    """
+    credits = []
+    director_count = 0
+    for crew_member in movie_details.get('credits', {}).get('crew', []):
+        if crew_member.get('job') == 'Director' and crew_member.get('name'):
+            if crew_member.get('id'):
+                credits.append((ROLE_DIRECTOR, director_count, crew_member['id'], crew_member['name'],
+                                build_profile_url(crew_member.get('profile_path'))))
+            director_count += 1
+    for billing_order, actor_data in enumerate(movie_details.get('credits', {}).get('cast', [])[:top_n_actors]):
+        if actor_data.get('name') and actor_data.get('id'):
+            credits.append((ROLE_ACTOR, billing_order, actor_data['id'], actor_data['name'],
+                            build_profile_url(actor_data.get('profile_path'))))
+    return credits
+
+
+def write_film_credits(cursor, credits_by_uri):
+    """
+    Replaces the credits of the given films with three statements: one people upsert, one delete and
+    one multi-row insert. credits_by_uri is a list of (letterboxd_uri, credits) pairs; films without a
+    matching letterboxd_uri are ignored. Does not commit, so callers write credits in the same transaction
+    as the film rows they belong to. Returns the number of film_credits rows inserted.
+    """
+    if not credits_by_uri:
+        return 0
+    people = {}
+    credit_rows = []
+    for letterboxd_uri, credits in credits_by_uri:
+        for role, billing_order, person_id, name, profile_url in credits:
+            person = people.get(person_id)
+            # A person may appear several times in a batch; keep a known profile image over a missing one.
+            if person is None or (profile_url and not person[2]):
+                people[person_id] = (person_id, name, profile_url)
+            credit_rows.append((letterboxd_uri, person_id, role, billing_order))
+
+    if people:
+        RUN_METRICS.increment("db_statements_total", operation="upsert_people")
+        execute_values(cursor, """
+            INSERT INTO people (tmdb_person_id, name, profile_path) VALUES %s
+            ON CONFLICT (tmdb_person_id) DO UPDATE SET
+                name = EXCLUDED.name,
+                profile_path = COALESCE(EXCLUDED.profile_path, people.profile_path),
+                updated_at = NOW()
+            WHERE (people.name, people.profile_path) IS DISTINCT FROM (EXCLUDED.name, COALESCE(EXCLUDED.profile_path, people.profile_path));
+        """, list(people.values()), page_size=len(people))
+
+    RUN_METRICS.increment("db_statements_total", operation="delete_credits")
+    cursor.execute("""
+        DELETE FROM film_credits AS c USING films AS f
+        WHERE c.film_id = f.id AND f.letterboxd_uri = ANY(%s);
+    """, ([letterboxd_uri for letterboxd_uri, _ in credits_by_uri],))
+    if not credit_rows:
+        return 0
+    RUN_METRICS.increment("db_statements_total", operation="insert_credits")
+    inserted = execute_values(cursor, """
+        INSERT INTO film_credits (film_id, person_id, role, billing_order)
+        SELECT f.id, v.person_id, v.role, v.billing_order
+        FROM (VALUES %s) AS v (letterboxd_uri, person_id, role, billing_order)
+        JOIN films AS f ON f.letterboxd_uri = v.letterboxd_uri
+        RETURNING 1;
+    """, credit_rows, template="(%s, %s::integer, %s, %s::smallint)", page_size=len(credit_rows), fetch=True)
+    return len(inserted)
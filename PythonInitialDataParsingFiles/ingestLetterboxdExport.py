@@ -0,0 +1,137 @@
+import argparse
+import io
+import zipfile
+
+import psycopg2
+
+import parsingInitialDiaryData as diary_loader
+import parsingInitialFilmData as film_loader
+import parsingInitialRatingData as ratings_loader
+from dashboardStats import refresh_dashboard_views
+from dbConnection import connect_db
+from pgBulk import load_film_id_map, report_unresolved_films
+from runLogger import LOG, add_logging_arguments, configure_from_args
+from runMetrics import RUN_METRICS
+
+# Files read from the Letterboxd export ZIP, in dependency order (films first).
+EXPORT_MEMBERS = ("watched.csv", "diary.csv", "ratings.csv")
+
+
+def find_export_member(archive, file_name):
+    """
+    Returns the ZIP member name for one of the export CSVs. Letterboxd places them at the
+    archive root; exports that were re-zipped inside a folder are accepted too (shallowest match wins).
+    Returns None if the file is not in the archive.
+    """
+    candidates = [name for name in archive.namelist()
+                  if name == file_name or name.endswith("/" + file_name)]
+    return min(candidates, key=lambda name: name.count("/")) if candidates else None
+
+
+def open_export_csv(archive, member_name):
+    """Opens a ZIP member as a streaming text file object; nothing is extracted to disk."""
+    return io.TextIOWrapper(archive.open(member_name), encoding="utf-8-sig", newline="")
+
+
+def ingest_export_zip(conn, zip_path):
+    """
+    Loads watched.csv, diary.csv and ratings.csv straight out of a Letterboxd export ZIP.
+    Tables are created up front; all three data loads then run in a single transaction
+    (films -> diary_entries -> ratings_entries) that is rolled back entirely on any database error.
+    Returns True on success.
+    """
+    try:
+        archive = zipfile.ZipFile(zip_path)
+    except FileNotFoundError:
+        LOG.error(f"Error: Export ZIP not found at '{zip_path}'.")
+        return False
+    except zipfile.BadZipFile:
+        LOG.error(f"Error: '{zip_path}' is not a valid ZIP file.")
+        return False
+
+    with archive:
+        members = {file_name: find_export_member(archive, file_name) for file_name in EXPORT_MEMBERS}
+        if members["watched.csv"] is None:
+            LOG.error(f"Error: watched.csv not found in '{zip_path}'. Is this a Letterboxd export?")
+            return False
+        for file_name, member_name in members.items():
+            LOG.info(f"  {file_name}: {member_name if member_name else 'not present, skipping'}")
+
+        LOG.info("\n--- Ensuring Table Schema ---")
+        film_loader.create_table_if_not_exists(conn)
+        diary_loader.create_tables(conn)
+        ratings_loader.create_tables(conn)
+
+        try:
+            LOG.info("\n--- Loading films (watched.csv) ---")
+            with open_export_csv(archive, members["watched.csv"]) as csv_file:
+                parsed_watched = film_loader.read_watched_rows(csv_file, members["watched.csv"])
+            if parsed_watched is None:
+                conn.rollback()
+                return False
+            watched_rows, skipped_watched = parsed_watched
+            inserted, updated, unchanged = film_loader.upsert_watched_rows(conn, watched_rows) if watched_rows else (0, 0, 0)
+            LOG.info(f"Films: Inserted: {inserted}, Updated: {updated}, Unchanged: {unchanged}, Skipped: {skipped_watched}")
+
+            # Sees the films upserted above, since it runs inside the same transaction.
+            film_id_map = load_film_id_map(conn)
+
+            if members["diary.csv"]:
+                LOG.info("\n--- Loading diary entries (diary.csv) ---")
+                with open_export_csv(archive, members["diary.csv"]) as csv_file:
+                    parsed_diary = diary_loader.read_diary_entries(csv_file, film_id_map, members["diary.csv"])
+                if parsed_diary is not None:
+                    diary_entries, unresolved_diary = parsed_diary
+                    inserted_diary = diary_loader.insert_diary_entries(conn, diary_entries) if diary_entries else 0
+                    LOG.info(f"Diary entries: {len(diary_entries)} valid, {inserted_diary} new.")
+                    report_unresolved_films(unresolved_diary, "diary entries")
+
+            if members["ratings.csv"]:
+                LOG.info("\n--- Loading rating entries (ratings.csv) ---")
+                with open_export_csv(archive, members["ratings.csv"]) as csv_file:
+                    parsed_ratings = ratings_loader.read_rating_entries(csv_file, film_id_map, members["ratings.csv"])
+                if parsed_ratings is not None:
+                    rating_entries, unresolved_ratings, skipped_ratings = parsed_ratings
+                    inserted_ratings = ratings_loader.insert_rating_entries(conn, rating_entries) if rating_entries else 0
+                    LOG.info(f"Rating entries: {len(rating_entries)} valid, {inserted_ratings} new, {skipped_ratings} skipped for missing data.")
+                    report_unresolved_films(unresolved_ratings, "rating entries")
+
+            conn.commit()
+            RUN_METRICS.increment("db_commits_total")
+            LOG.info("\nExport ingested and committed.")
+            refresh_dashboard_views(conn)
+            return True
+        except (psycopg2.Error, UnicodeDecodeError, zipfile.BadZipFile) as e:
+            LOG.error(f"Error during export ingestion, rolling back all tables: {e}")
+            conn.rollback()
+            return False
+
+
+def main():
+    """Connects once and ingests the export ZIP given on the command line."""
+    arg_parser = argparse.ArgumentParser(description="Load watched.csv, diary.csv and ratings.csv straight from a Letterboxd export ZIP.")
+    arg_parser.add_argument("zip_path", metavar="letterboxd-export.zip")
+    arg_parser.add_argument("--metrics-json", metavar="PATH", help="Write run counters and per-stage latency histograms to this JSON file.")
+    arg_parser.add_argument("--metrics-prometheus", metavar="PATH", help="Also write the run metrics in Prometheus text format.")
+    add_logging_arguments(arg_parser)
+    args = arg_parser.parse_args()
+    configure_from_args(args)
+    conn = None
+    try:
+        conn = connect_db()
+        if conn is None:
+            return
+        ingest_export_zip(conn, args.zip_path)
+    except psycopg2.Error as e:
+        LOG.error(f"Database connection error: {e}")
+    finally:
+        if conn:
+            conn.close()
+            LOG.info("Database connection closed.")
+        LOG.info(RUN_METRICS.summary())
+        RUN_METRICS.write_reports(args.metrics_json, args.metrics_prometheus)
+        LOG.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import argparse
+import os
+import sys
+
+# Every command imports the script module it drives inside its handler, so `--help`, argument errors and the
+# quick manual commands never pay for the heavy imports (requests, Levenshtein) of the commands not being run.
+
+
+def configure_console():
+    """Switches the Windows console to UTF-8 so film titles print correctly."""
+    if sys.platform == "win32":
+        from runLogger import LOG
+        try:
+            sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+            sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+        except Exception as e:
+            LOG.warning(f"Note: Could not reconfigure stdout/stderr: {e}")
+        try:
+            os.system("chcp 65001 > nul")
+        except Exception as e:
+            LOG.warning(f"Note: chcp 65001 failed: {e}")
+
+
+def tmdb_api_key_is_set():
+    if not os.getenv("TMDB_API_KEY"):
+        from runLogger import LOG
+        LOG.error("Error: TMDB_API_KEY not found in environment variables. Please add it to your .env file.")
+        return False
+    return True
+
+
+def run_with_connection(args, work):
+    """
+    Connects with the shared .env settings, runs work(conn), and always closes the connection and
+    reports the run metrics afterwards, as the standalone loader scripts do.
+    """
+    from dbConnection import connect_db
+    from runLogger import LOG, configure_from_args
+    from runMetrics import RUN_METRICS
+
+    configure_from_args(args)
+    conn = None
+    try:
+        conn = connect_db()
+        if conn is None:
+            return 1
+        return work(conn)
+    finally:
+        if conn is not None and not conn.closed:
+            conn.close()
+            LOG.info("Database connection closed.")
+        LOG.info(RUN_METRICS.summary())
+        RUN_METRICS.write_reports(args.metrics_json, args.metrics_prometheus)
+        LOG.close()
+
+
+def command_load_watched(args):
+    import parsingInitialFilmData as film_loader
+    from dashboardStats import refresh_dashboard_views
+
+    def work(conn):
+        film_loader.create_table_if_not_exists(conn)
+        film_loader.bulk_load_watched_csv(conn, args.csv_path or film_loader.CSV_FILE_PATH)
+        refresh_dashboard_views(conn, ("films",))
+    return run_with_connection(args, work)
+
+
+def command_load_diary(args):
+    import parsingInitialDiaryData as diary_loader
+    from dashboardStats import refresh_dashboard_views
+
+    def work(conn):
+        diary_loader.create_tables(conn)
+        diary_loader.parse_and_insert_diary(conn, args.csv_path or diary_loader.CSV_FILE_PATH)
+        refresh_dashboard_views(conn, ("diary_entries",))
+    return run_with_connection(args, work)
+
+
+def command_load_ratings(args):
+    import parsingInitialRatingData as ratings_loader
+
+    def work(conn):
+        ratings_loader.create_tables(conn)
+        ratings_loader.parse_and_insert_ratings(conn, args.csv_path or ratings_loader.RATINGS_CSV_FILE_PATH)
+    return run_with_connection(args, work)
+
+
+def command_enrich(args):
+    if not tmdb_api_key_is_set():
+        return 1
+    import parsingInitialFilmData as film_loader
+    from dashboardStats import refresh_dashboard_views
+    from enrichmentJournal import DEFAULT_JOURNAL_PATH, EnrichmentJournal
+    from runLogger import LOG
+
+    journal = None
+
+    def work(conn):
+        nonlocal journal
+        film_loader.create_table_if_not_exists(conn)
+        journal = EnrichmentJournal(os.getenv("ENRICHMENT_JOURNAL_PATH") or DEFAULT_JOURNAL_PATH)
+        film_loader.enrich_films_with_tmdb_data(conn, max_workers=args.workers, journal=journal, resume=args.resume)
+        refresh_dashboard_views(conn, ("films", "film_credits"))
+
+    try:
+        return run_with_connection(args, work)
+    finally:
+        LOG.info(film_loader.TMDB_CLIENT.summary())
+        if film_loader.TMDB_CACHE is not None: LOG.info(film_loader.TMDB_CACHE.summary())
+        film_loader.TMDB_CLIENT.close()
+        if film_loader.TMDB_CATALOG is not None: film_loader.TMDB_CATALOG.close()
+        if journal is not None: journal.close()
+
+
+def command_backfill_credits(args):
+    if not tmdb_api_key_is_set():
+        return 1
+    import parsingInitialFilmData as film_loader
+    from dashboardStats import refresh_dashboard_views
+    from runLogger import LOG
+
+    def work(conn):
+        film_loader.create_table_if_not_exists(conn)
+        film_loader.backfill_film_credits(conn, max_workers=args.workers)
+        refresh_dashboard_views(conn, ("films", "film_credits"))
+
+    try:
+        return run_with_connection(args, work)
+    finally:
+        LOG.info(film_loader.TMDB_CLIENT.summary())
+        if film_loader.TMDB_CACHE is not None: LOG.info(film_loader.TMDB_CACHE.summary())
+        film_loader.TMDB_CLIENT.close()
+        if film_loader.TMDB_CATALOG is not None: film_loader.TMDB_CATALOG.close()
+
+
+def command_restore_dump(args):
+    import dumpLoader
+    from runLogger import LOG, configure_from_args
+    from runMetrics import RUN_METRICS
+
+    configure_from_args(args)
+    try:
+        restored = dumpLoader.restore_dump(args.dump_path, dsn=args.dsn, tables=args.tables.split(",") if args.tables else None,
+                                           jobs=args.jobs, clean=args.clean, keep_owners=args.keep_owners)
+    finally:
+        LOG.info(RUN_METRICS.summary())
+        RUN_METRICS.write_reports(args.metrics_json, args.metrics_prometheus)
+        LOG.close()
+    return 0 if restored else 1
+
+
+def run_manual_tool(args, tool, work):
+    """
+    Shared connect/close/summary wrapper for the interactive ManualDBAdd/ManualDBUpdate tools. Connects through
+    the tool's own connect_db, so the CLI keeps the standalone scripts' connection defaults (e.g. localhost:5432).
+    """
+    from runLogger import LOG, configure_from_args
+
+    configure_from_args(args)
+    try:
+        if not tmdb_api_key_is_set():
+            return 1
+        from schemaMigrations import run_migrations
+
+        conn = tool.connect_db()
+        if conn is None:
+            return 1
+        try:
+            run_migrations(conn)
+            return work(conn)
+        finally:
+            if not conn.closed:
+                conn.close()
+                LOG.info("\nPostgreSQL connection closed.")
+            tool.close_tmdb_client()
+    finally:
+        LOG.close()
+
+
+def command_add(args):
+    if args.file and args.tmdb_ids:
+        from runLogger import LOG
+        LOG.error("Error: pass TMDb IDs either on the command line or with --file, not both.")
+        return 2
+    import ManualDBAdd as tool
+
+    def work(conn):
+        if args.file:
+            tool.add_films_from_file(conn, args.file, args.workers or tool.BATCH_WORKERS)
+        elif args.tmdb_ids:
+            tool.add_films_in_batch(conn, list(dict.fromkeys(args.tmdb_ids)), args.workers or tool.BATCH_WORKERS)
+        else:
+            tool.prompt_and_add_films(conn)
+    return run_manual_tool(args, tool, work)
+
+
+def command_update(args):
+    if (args.db_id is None) != (args.tmdb_id is None):
+        from runLogger import LOG
+        LOG.error("Error: pass both a database ID and a TMDb ID, or neither to be prompted.")
+        return 2
+    if args.file and args.db_id is not None:
+        from runLogger import LOG
+        LOG.error("Error: pass a database ID and TMDb ID either on the command line or with --file, not both.")
+        return 2
+    import ManualDBUpdate as tool
+
+    def work(conn):
+        if args.file:
+            tool.update_films_from_file(conn, args.file, args.on_collision, args.workers or tool.BATCH_WORKERS)
+        elif args.db_id is None:
+            tool.prompt_and_update_film(conn)
+        else:
+            tool.update_film_manually(conn, args.db_id, args.tmdb_id)
+    return run_manual_tool(args, tool, work)
+
+
+def build_parser():
+    # Logging options shared by every command, plus metrics options for the batch commands; kept as
+    # parent parsers so each subcommand lists them in its own --help.
+    from runLogger import add_logging_arguments
+
+    logging_options = argparse.ArgumentParser(add_help=False)
+    add_logging_arguments(logging_options)
+    batch_options = argparse.ArgumentParser(add_help=False, parents=[logging_options])
+    batch_options.add_argument("--metrics-json", metavar="PATH", help="Write run counters and per-stage latency histograms to this JSON file.")
+    batch_options.add_argument("--metrics-prometheus", metavar="PATH", help="Also write the run metrics in Prometheus text format.")
+
+    parser = argparse.ArgumentParser(prog="letterboxdCli.py",
+                                     description="Letterboxd export ingestion and TMDb enrichment. Database settings come from .env.")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    for name, handler, summary, default_path in (
+            ("load-watched", command_load_watched, "Bulk load watched.csv into films.", "the film loader's CSV_FILE_PATH"),
+            ("load-diary", command_load_diary, "Load diary.csv into diary_entries.", "the diary loader's CSV_FILE_PATH"),
+            ("load-ratings", command_load_ratings, "Load ratings.csv into ratings_entries.", "the ratings loader's RATINGS_CSV_FILE_PATH")):
+        command = commands.add_parser(name, parents=[batch_options], help=summary, description=summary)
+        command.add_argument("csv_path", nargs="?", help=f"CSV file to load (default: {default_path}).")
+        command.set_defaults(handler=handler)
+
+    enrich = commands.add_parser("enrich", parents=[batch_options], help="Enrich films with TMDb data.",
+                                 description="Enrich films lacking TMDb data, journaling progress so an interrupted run can resume.")
+    enrich.add_argument("--resume", action="store_true", help="Continue the last unfinished enrichment run, skipping films it already finished.")
+    enrich.add_argument("--workers", type=int, help="Search and details workers per stage (default: ENRICH_WORKERS).")
+    enrich.set_defaults(handler=command_enrich)
+
+    backfill = commands.add_parser("backfill-credits", parents=[batch_options], help="Fill people/film_credits for already enriched films.",
+                                   description="One-time migration: fill the people and film_credits tables for films enriched before they "
+                                               "existed, re-reading credits from TMDb (served from the response cache where possible).")
+    backfill.add_argument("--workers", type=int, help="Concurrent details fetches (default: ENRICH_WORKERS).")
+    backfill.set_defaults(handler=command_backfill_credits)
+
+    restore = commands.add_parser("restore-dump", parents=[batch_options], help="Restore a pg_dump from DatabaseDump/ with parallel COPY.",
+                                  description="Restore a plain-format pg_dump: schema first, table data streamed over parallel "
+                                              "connections, then indexes, constraints, triggers and sequences.")
+    restore.add_argument("dump_path", metavar="dump.sql")
+    restore.add_argument("--dsn", help="Target database connection string (default: the DB_* settings from .env).")
+    restore.add_argument("--tables", help="Comma-separated tables whose data to load (default: every table in the dump).")
+    restore.add_argument("--jobs", type=int, help="Parallel connections (default: DUMP_LOAD_JOBS).")
+    restore.add_argument("--clean", action="store_true",
+                         help="Drop the dump's tables first (CASCADE: dependent views and foreign keys are dropped too).")
+    restore.add_argument("--keep-owners", action="store_true", help="Also run the dump's ALTER ... OWNER TO statements.")
+    restore.set_defaults(handler=command_restore_dump)
+
+    add = commands.add_parser("add", parents=[logging_options], help="Add films by TMDb ID.",
+                              description="Add films by TMDb ID; prompts for IDs when none are given. Several IDs are added as one batch.")
+    add.add_argument("tmdb_ids", nargs="*", type=int, metavar="tmdb_id")
+    add.add_argument("--file", metavar="PATH",
+                     help="Add every TMDb ID listed in PATH (one per line, '#' comments allowed; '-' reads standard input).")
+    add.add_argument("--workers", type=int, help="Concurrent TMDb fetches when adding several films (default: MANUAL_ADD_WORKERS).")
+    add.set_defaults(handler=command_add)
+
+    update = commands.add_parser("update", parents=[logging_options], help="Reassign a film's TMDb ID and refresh its data.",
+                                 description="Point films at different TMDb IDs and refresh their data; prompts when no IDs are given.")
+    update.add_argument("db_id", nargs="?", type=int, help="films.id of the film to update.")
+    update.add_argument("tmdb_id", nargs="?", type=int, help="TMDb ID to assign to it.")
+    update.add_argument("--file", metavar="PATH",
+                        help="Apply every db_id,tmdb_id pair in the CSV at PATH in one transaction ('-' reads standard input).")
+    update.add_argument("--on-collision", choices=("skip", "abort", "allow"), default="skip",
+                        help="With --file: what to do when a TMDb ID already belongs to another film (default: %(default)s); "
+                             "'allow' clears it from that film, which the next enrichment run matches again.")
+    update.add_argument("--workers", type=int, help="Concurrent TMDb fetches with --file (default: MANUAL_UPDATE_WORKERS).")
+    update.set_defaults(handler=command_update)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    configure_console()
+    return args.handler(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+import psycopg2
+
+from mockTmdbServer import MockTMDbServer
+from runLogger import LOG
+from syntheticLetterboxd import (DEFAULT_DIARY_ROWS, DEFAULT_FILMS, DEFAULT_RATINGS_ROWS, DEFAULT_UNMATCHED_RATE,
+                                 SyntheticExport)
+
+# Tables emptied by --reset before a run, children first.
+HARNESS_TABLES = ("ratings_entries", "diary_entries", "film_credits", "films", "people")
+
+
+def configure_environment(tmdb_api_url, work_dir, workers, requests_per_second):
+    """
+    Points the ingestion scripts at the mock server. Must run before they are imported, since they read
+    their configuration at import time. The response cache and offline catalog are disabled so every
+    lookup reaches the (mock) API and the run measures the real request path.
+    """
+    os.environ.update({
+        "TMDB_API_URL": tmdb_api_url,
+        "TMDB_API_KEY": "mock-tmdb-key",
+        "TMDB_CACHE_DISABLED": "1",
+        "ENRICHMENT_JOURNAL_PATH": os.path.join(work_dir, "enrichment_journal.sqlite3"),
+    })
+    os.environ.pop("TMDB_CATALOG_PATH", None)
+    if workers:
+        os.environ["ENRICH_WORKERS"] = str(workers)
+    if requests_per_second:
+        os.environ["TMDB_REQUESTS_PER_SECOND"] = str(requests_per_second)
+
+
+def reset_tables(conn):
+    with conn.cursor() as cursor:
+        for table in HARNESS_TABLES:
+            cursor.execute("SELECT to_regclass(%s)", (f"public.{table}",))
+            if cursor.fetchone()[0]:
+                cursor.execute(f"TRUNCATE {table} RESTART IDENTITY CASCADE")
+    conn.commit()
+
+
+def count_rows(conn, query):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('public.films')")
+        if cursor.fetchone()[0] is None:
+            return 0
+        cursor.execute(query)
+        return cursor.fetchone()[0]
+
+
+def run_harness(args):
+    """Generates the export, runs ingestion and enrichment against the mock server and returns the report dict."""
+    export = SyntheticExport(args.films, args.diary, args.ratings, args.catalog_size, args.unmatched_rate, args.seed)
+    report = {"config": {"films": export.films, "diary_rows": export.diary_rows, "ratings_rows": export.ratings_rows,
+                         "catalog_size": export.catalog_size, "unmatched_rate": export.unmatched_rate,
+                         "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "error_rate": args.error_rate,
+                         "server_rate_limit": args.server_rate_limit, "missing_profile_rate": args.missing_profile_rate},
+              "stages": {}}
+    if not args.verbose:
+        LOG.configure(mode="quiet") # The scripts' warnings and errors still show
+
+    with tempfile.TemporaryDirectory(prefix="letterboxd-load-") as work_dir:
+        started = time.perf_counter()
+        server = MockTMDbServer(export.catalog_size, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                error_rate=args.error_rate, rate_limit=args.server_rate_limit,
+                                retry_after=args.retry_after, missing_profile_rate=args.missing_profile_rate)
+        tmdb_api_url = server.start()
+        report["stages"]["mock_server_startup"] = {"seconds": time.perf_counter() - started}
+        print(f"Mock TMDb API with {export.catalog_size} movies at {tmdb_api_url}.")
+
+        configure_environment(tmdb_api_url, work_dir, args.workers, args.requests_per_second)
+        ingest = importlib.import_module("ingestLetterboxdExport")
+        film_loader = importlib.import_module("parsingInitialFilmData")
+        enrichment_journal = importlib.import_module("enrichmentJournal")
+
+        zip_path = os.path.join(work_dir, "letterboxd-export.zip")
+        started = time.perf_counter()
+        export.write_zip(zip_path)
+        seconds = time.perf_counter() - started
+        report["stages"]["generate_export"] = {"seconds": seconds, "bytes": os.path.getsize(zip_path)}
+        print(f"Generated export ({os.path.getsize(zip_path) / 1e6:.1f} MB) in {seconds:.2f}s.")
+
+        conn = psycopg2.connect(args.dsn)
+        journal = None
+        try:
+            if args.reset:
+                reset_tables(conn)
+            elif count_rows(conn, "SELECT COUNT(*) FROM films"):
+                print("Error: the target database already has films. Use a scratch database and pass --reset to empty it.")
+                return None
+
+            total_rows = export.films + export.diary_rows + export.ratings_rows
+            started = time.perf_counter()
+            ingested = ingest.ingest_export_zip(conn, zip_path)
+            seconds = time.perf_counter() - started
+            report["stages"]["ingest"] = {"seconds": seconds, "rows": total_rows, "rows_per_second": total_rows / seconds,
+                                          "succeeded": bool(ingested)}
+            print(f"Ingested {total_rows} CSV rows in {seconds:.2f}s ({total_rows / seconds:,.0f} rows/s).")
+            if not ingested:
+                return report
+
+            backlog = count_rows(conn, "SELECT COUNT(*) FROM films WHERE tmdb_id IS NULL")
+            journal = enrichment_journal.EnrichmentJournal(os.environ["ENRICHMENT_JOURNAL_PATH"])
+            requests_before = film_loader.TMDB_CLIENT.stats["requests"]
+            started = time.perf_counter()
+            film_loader.enrich_films_with_tmdb_data(conn, journal=journal)
+            seconds = time.perf_counter() - started
+            http_requests = film_loader.TMDB_CLIENT.stats["requests"] - requests_before
+            enriched = count_rows(conn, "SELECT COUNT(*) FROM films WHERE tmdb_id IS NOT NULL")
+            report["stages"]["enrich"] = {"seconds": seconds, "films": backlog, "films_per_second": backlog / seconds,
+                                          "enriched": enriched, "http_requests": http_requests,
+                                          "http_requests_per_second": http_requests / seconds,
+                                          "outcomes": journal.outcome_counts()}
+            print(f"Enriched {backlog} films in {seconds:.2f}s ({backlog / seconds:,.1f} films/s, "
+                  f"{http_requests / seconds:,.1f} HTTP requests/s); {enriched} films now have TMDb data.")
+            print(film_loader.TMDB_CLIENT.summary())
+        finally:
+            if journal is not None:
+                journal.close()
+            conn.close()
+            server.stop()
+
+        report["mock_server"] = server.summary()
+        report["wall_seconds"] = sum(stage["seconds"] for stage in report["stages"].values())
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="End-to-end load test: synthetic Letterboxd export -> ZIP ingestion -> TMDb enrichment against a local mock API.")
+    parser.add_argument("--dsn", required=True,
+                        help="libpq connection string of a scratch database, e.g. 'dbname=letterboxd_load user=postgres'.")
+    parser.add_argument("--reset", action="store_true", help=f"Empty {', '.join(HARNESS_TABLES)} before the run.")
+    parser.add_argument("--films", type=int, default=DEFAULT_FILMS)
+    parser.add_argument("--diary", type=int, default=DEFAULT_DIARY_ROWS)
+    parser.add_argument("--ratings", type=int, default=DEFAULT_RATINGS_ROWS)
+    parser.add_argument("--catalog-size", type=int, help="Synthetic TMDb catalog size (default 1.25 x --films).")
+    parser.add_argument("--unmatched-rate", type=float, default=DEFAULT_UNMATCHED_RATE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Mock API mean latency (default %(default)s).")
+    parser.add_argument("--jitter-ms", type=float, default=15.0, help="Mock API latency standard deviation (default %(default)s).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of mock API requests failing with 500/503.")
+    parser.add_argument("--server-rate-limit", type=float, help="Mock API requests/second before it answers 429.")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--missing-profile-rate", type=float, default=0.05,
+                        help="Share of directors lacking profile_path, forcing /person lookups (default %(default)s).")
+    parser.add_argument("--workers", type=int, help="ENRICH_WORKERS for the run.")
+    parser.add_argument("--requests-per-second", type=float, help="TMDB_REQUESTS_PER_SECOND for the run.")
+    parser.add_argument("--report", help="Write the JSON report to this file.")
+    parser.add_argument("--verbose", action="store_true", help="Show the scripts' per-row and per-film output.")
+    args = parser.parse_args()
+
+    report = run_harness(args)
+    if report is None:
+        sys.exit(1)
+    print(f"\nTotal wall time: {report.get('wall_seconds', 0):.2f}s")
+    print(json.dumps(report.get("mock_server", {}), indent=2))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"Report written to '{args.report}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from rateLimiter import TokenBucket
+from syntheticLetterboxd import (DEFAULT_FILMS, default_catalog_size, synthetic_movie_details, synthetic_person,
+                                 synthetic_search_result, synthetic_title_year)
+
+# TMDb serves /search/movie in pages of 20.
+SEARCH_PAGE_SIZE = 20
+
+_MOVIE_PATH = re.compile(r"^/movie/(\d+)$")
+_PERSON_PATH = re.compile(r"^/person/(\d+)$")
+
+
+def normalize_query(title):
+    return " ".join(title.casefold().split())
+
+
+class MockTMDbServer:
+    """
+    Local stand-in for the TMDb API serving /search/movie, /movie/{id} and /person/{id} from the
+    synthetic catalog in syntheticLetterboxd.py, so enrichment can be load-tested with no network.
+    Every response is delayed by latency_ms (+/- jitter_ms, normally distributed); error_rate is the share
+    of requests answered with a 500/503; requests beyond rate_limit per second get a 429 with Retry-After,
+    as TMDb does. Per-endpoint request and status counts are kept in `stats`.
+    """
+
+    def __init__(self, catalog_size, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 rate_limit=None, retry_after=1, missing_profile_rate=0.0, seed=0):
+        self.catalog_size = catalog_size
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+        self.retry_after = retry_after
+        self.missing_profile_rate = missing_profile_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.stats = defaultdict(lambda: defaultdict(int))
+        self._stats_lock = threading.Lock()
+
+        # Exact (case- and whitespace-insensitive) title index over the whole catalog.
+        self._ids_by_title = defaultdict(list)
+        for tmdb_id in range(1, catalog_size + 1):
+            self._ids_by_title[normalize_query(synthetic_title_year(tmdb_id)[0])].append(tmdb_id)
+
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive, so the client's connection pool is exercised
+            # Headers and body go out as two writes; with Nagle on, the body waits for the client's delayed ACK
+            # (~40 ms per response), which would swamp latency_ms and every loadHarness measurement.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                mock._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/3"
+
+    def _count(self, endpoint, status):
+        with self._stats_lock:
+            self.stats[endpoint]["requests"] += 1
+            self.stats[endpoint][str(status)] += 1
+
+    def _route(self, path, params):
+        """Returns (endpoint, status, body) for a request path relative to /3."""
+        if path == "/search/movie":
+            query = normalize_query(params.get("query", ""))
+            year = params.get("year") or params.get("primary_release_year")
+            tmdb_ids = self._ids_by_title.get(query, [])
+            results = [synthetic_search_result(tmdb_id) for tmdb_id in tmdb_ids]
+            if year:
+                results = [result for result in results if result["release_date"].startswith(f"{year}-")]
+            page = results[:SEARCH_PAGE_SIZE]
+            return "search", 200, {"page": 1, "results": page, "total_results": len(results),
+                                   "total_pages": max(1, -(-len(results) // SEARCH_PAGE_SIZE))}
+        movie = _MOVIE_PATH.match(path)
+        if movie:
+            tmdb_id = int(movie.group(1))
+            if not 1 <= tmdb_id <= self.catalog_size:
+                return "movie", 404, {"success": False, "status_code": 34, "status_message": "The resource you requested could not be found."}
+            details = synthetic_movie_details(tmdb_id, self.missing_profile_rate)
+            if "credits" not in params.get("append_to_response", "").split(","):
+                del details["credits"]
+            return "movie", 200, details
+        person = _PERSON_PATH.match(path)
+        if person:
+            return "person", 200, synthetic_person(int(person.group(1)))
+        return "other", 404, {"success": False, "status_code": 34, "status_message": "The resource you requested could not be found."}
+
+    def _handle(self, request):
+        url = urlsplit(request.path)
+        path = url.path[2:] if url.path.startswith("/3/") else url.path
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        headers = {}
+
+        with self._random_lock:
+            delay = max(0.0, self._random.gauss(self.latency_ms, self.jitter_ms)) / 1000 if self.latency_ms or self.jitter_ms else 0.0
+            inject_error = self.error_rate and self._random.random() < self.error_rate
+            error_status = self._random.choice((500, 503))
+        if delay:
+            time.sleep(delay)
+
+        if not params.get("api_key"):
+            endpoint, status, body = "unauthorized", 401, {"success": False, "status_code": 7, "status_message": "Invalid API key: You must be granted a valid key."}
+        elif self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+            endpoint, status = "rate_limited", 429
+            body = {"success": False, "status_code": 25, "status_message": "Your request count is over the allowed limit."}
+            headers["Retry-After"] = str(self.retry_after)
+        elif inject_error:
+            endpoint, status, body = "injected_error", error_status, {"success": False, "status_code": 11, "status_message": "Internal error."}
+        else:
+            endpoint, status, body = self._route(path, params)
+        self._count(endpoint, status)
+
+        payload = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json;charset=utf-8")
+        request.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(payload)
+
+    def start(self):
+        """Serves requests on a background daemon thread; returns the base URL to use as TMDB_API_URL."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def summary(self):
+        """Returns {endpoint: {"requests": n, "<status>": n, ...}} as plain dicts."""
+        with self._stats_lock:
+            return {endpoint: dict(counts) for endpoint, counts in sorted(self.stats.items())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock TMDb API backed by the synthetic catalog of syntheticLetterboxd.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--catalog-size", type=int, default=default_catalog_size(DEFAULT_FILMS),
+                        help="Number of synthetic movies; must match the generated export (default %(default)s).")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean added latency per request.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Standard deviation of the added latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500/503.")
+    parser.add_argument("--rate-limit", type=float, help="Requests per second allowed before answering 429.")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429 responses.")
+    parser.add_argument("--missing-profile-rate", type=float, default=0.0,
+                        help="Share of directors without profile_path in credits (forces /person lookups).")
+    args = parser.parse_args()
+
+    server = MockTMDbServer(args.catalog_size, args.host, args.port, args.latency_ms, args.jitter_ms, args.error_rate,
+                            args.rate_limit, args.retry_after, args.missing_profile_rate)
+    print(f"Mock TMDb API serving {args.catalog_size} movies at {server.base_url} (Ctrl+C to stop).")
+    print(f"Point the scripts at it with TMDB_API_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(json.dumps(server.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,23 @@
-import csv
-import os
 import psycopg2
 from psycopg2 import sql
 from psycopg2.extras import execute_values
-from dotenv import load_dotenv
-from datetime import datetime
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Database connection parameters
-DB_NAME = os.getenv("DB_NAME")
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT")
+from csvColumns import INVALID, RowProblems, convert_column, parse_iso_date, parse_rating, read_csv_columns
+from dashboardStats import refresh_dashboard_views
+from dbConnection import connect_db
+from pgBulk import load_film_id_map, report_unresolved_films
+from runLogger import LOG
+from runMetrics import RUN_METRICS, STAGE_DB_WRITE
+from schemaMigrations import run_migrations
 
 # CSV file path (assuming it's in the same directory as the script)
 CSV_FILE_PATH = 'LetterBoxdData/diary.csv' 
 
+# Rows per multi-row INSERT statement sent by execute_values (its default page size).
+INSERT_PAGE_SIZE = 100
+
 def create_tables(conn):
-    """Creates the films and diary_entries tables if they don't exist."""
+    """Creates the films and diary_entries tables if they don't exist, then applies any pending schema migrations."""
     with conn.cursor() as cur:
         # Create films table (IF NOT EXISTS is safe)
         # Stores unique films to avoid redundancy
@@ -32,7 +29,7 @@ def create_tables(conn):
                 CONSTRAINT unique_film UNIQUE (title, year) 
             );
         """)
-        print("Table 'films' checked/created successfully (if not exists).")
+        LOG.info("Table 'films' checked/created successfully (if not exists).")
 
         # Create diary_entries table
         # Stores individual watch diary entries
@@ -46,165 +43,154 @@ def create_tables(conn):
                 letterboxd_diary_uri TEXT UNIQUE NOT NULL
             );
         """)
-        print("Table 'diary_entries' checked/created successfully.")
+        LOG.info("Table 'diary_entries' checked/created successfully.")
         conn.commit()
+    run_migrations(conn)
 
-def get_film_id(conn, title, year):
+def read_diary_entries(file, film_id_map, source_name="diary.csv"):
     """
-    Gets the ID of an existing film from the 'films' table.
-    Returns the film's ID if found, otherwise None.
+    Parses an open diary.csv file object, resolving film ids through film_id_map.
+    The file is read column-wise and the Year, Watched Date and Rating columns are each converted in
+    one pass; problem rows are reported together at the end. source_name is only used in messages.
+    Returns (entries_to_insert, unresolved_films), or None if the header row is unusable.
     """
-    with conn.cursor() as cur:
-        # Try to find the film
-        cur.execute(
-            "SELECT id FROM films WHERE title = %s AND year = %s;",
-            (title, year)
+    entries_to_insert = []
+    processed_uris = set()
+    unresolved_films = []
+    problems = RowProblems(source_name)
+
+    fieldnames, columns = read_csv_columns(file)
+
+    required_columns = ['Name', 'Year', 'Letterboxd URI', 'Watched Date']
+    if not fieldnames: # Handle empty CSV or header issue
+        LOG.error("Error: CSV file is empty or has no header row.")
+        return None
+    if not all(col in fieldnames for col in required_columns):
+        missing = [col for col in required_columns if col not in fieldnames]
+        LOG.error(f"Error: CSV file is missing required columns: {', '.join(missing)}")
+        LOG.error(f"Available columns: {', '.join(fieldnames)}")
+        return None
+
+    film_titles, film_year_strs = columns['Name'], columns['Year']
+    letterboxd_uris, watched_date_strs = columns['Letterboxd URI'], columns['Watched Date']
+    row_count = len(letterboxd_uris)
+    rating_strs = columns.get('Rating', [None] * row_count)
+    film_years = convert_column(film_year_strs, int)
+    watched_dates = convert_column(watched_date_strs, parse_iso_date)
+    rewatches = convert_column(columns.get('Rewatch', [None] * row_count), lambda value: value.strip().lower() == 'yes')
+    ratings = convert_column(rating_strs, parse_rating)
+
+    for row_num, (film_title, film_year_str, letterboxd_uri, film_year) in enumerate(
+            zip(film_titles, film_year_strs, letterboxd_uris, film_years), 1):
+        if not film_title:
+            problems.add("missing_name", f"Skipping row {row_num}: 'Name' is missing.")
+            continue
+        if not letterboxd_uri:
+            problems.add("missing_uri", f"Skipping row {row_num} for film '{film_title}': 'Letterboxd URI' is missing.")
+            continue
+
+        if letterboxd_uri in processed_uris:
+            problems.add("duplicate_uri", f"Skipping duplicate Letterboxd URI in CSV: {letterboxd_uri}")
+            continue
+        processed_uris.add(letterboxd_uri)
+
+        if film_year is INVALID:
+            problems.add("invalid_year", f"Warning: Invalid year '{film_year_str}' for film '{film_title}' at row {row_num}. Film will be searched with year as NULL.")
+            film_year = None
+
+        # Resolve film_id from the preloaded films map
+        film_id = film_id_map.get((film_title, film_year))
+
+        if film_id is None:
+            # Film not found in the 'films' table, so skip this diary entry (reported in one batch below)
+            unresolved_films.append((film_title, film_year_str))
+            continue
+
+        watched_date = watched_dates[row_num - 1]
+        if watched_date is None:
+            problems.add("missing_date", f"Skipping entry for '{film_title}' ({letterboxd_uri}): 'Watched Date' is missing.")
+            continue
+        if watched_date is INVALID:
+            problems.add("invalid_date", f"Skipping entry for '{film_title}' ({letterboxd_uri}): Invalid 'Watched Date' format '{watched_date_strs[row_num - 1]}'. Expected YYYY-MM-DD.")
+            continue
+
+        rating = ratings[row_num - 1]
+        if rating is INVALID:
+            problems.add("invalid_rating", f"Warning: Invalid rating value '{rating_strs[row_num - 1].strip()}' for '{film_title}' ({letterboxd_uri}). Setting rating to NULL.")
+            rating = None
+        elif rating is not None and not (0.5 <= rating <= 5.0 or rating == 0):
+            problems.add("rating_out_of_range", f"Warning: Rating {rating} for '{film_title}' ({letterboxd_uri}) is outside typical Letterboxd range (0.5-5.0).")
+
+        entries_to_insert.append(
+            (film_id, watched_date, bool(rewatches[row_num - 1]), rating, letterboxd_uri)
         )
-        film_record = cur.fetchone()
 
-        if film_record:
-            return film_record[0]
-        else:
-            # Film not found in the database
-            return None
+    problems.report()
+    return entries_to_insert, unresolved_films
+
+def insert_diary_entries(conn, entries_to_insert):
+    """Inserts diary entry tuples, skipping URIs that already exist. Does not commit. Returns the number of new rows."""
+    with conn.cursor() as cur:
+        insert_query = """
+            INSERT INTO diary_entries (film_id, watched_date, rewatch, rating, letterboxd_diary_uri)
+            VALUES %s
+            ON CONFLICT (letterboxd_diary_uri) DO NOTHING
+            RETURNING 1;
+        """
+        with RUN_METRICS.time_stage(STAGE_DB_WRITE):
+            inserted_rows = execute_values(cur, insert_query, entries_to_insert, page_size=INSERT_PAGE_SIZE, fetch=True)
+        RUN_METRICS.increment("db_statements_total", -(-len(entries_to_insert) // INSERT_PAGE_SIZE), operation="insert")
+        return len(inserted_rows)
 
 def parse_and_insert_diary(conn, csv_file_path):
     """Parses the CSV file and inserts data into the diary_entries table."""
-    entries_to_insert = []
-    processed_uris = set()
-    skipped_film_not_found_count = 0
-
     try:
+        film_id_map = load_film_id_map(conn) # One query instead of a lookup per CSV row
+
         with open(csv_file_path, mode='r', encoding='utf-8-sig') as file: # utf-8-sig to handle potential BOM
-            csv_reader = csv.DictReader(file)
-            
-            required_columns = ['Name', 'Year', 'Letterboxd URI', 'Watched Date']
-            if not csv_reader.fieldnames: # Handle empty CSV or header issue
-                print("Error: CSV file is empty or has no header row.")
-                return
-            if not all(col in csv_reader.fieldnames for col in required_columns):
-                missing = [col for col in required_columns if col not in csv_reader.fieldnames]
-                print(f"Error: CSV file is missing required columns: {', '.join(missing)}")
-                print(f"Available columns: {', '.join(csv_reader.fieldnames)}")
-                return
-
-            for row_num, row in enumerate(csv_reader, 1):
-                try:
-                    film_title = row.get('Name')
-                    film_year_str = row.get('Year')
-                    letterboxd_uri = row.get('Letterboxd URI')
-                    
-                    if not film_title:
-                        print(f"Skipping row {row_num}: 'Name' is missing.")
-                        continue
-                    if not letterboxd_uri:
-                        print(f"Skipping row {row_num} for film '{film_title}': 'Letterboxd URI' is missing.")
-                        continue
-                    
-                    if letterboxd_uri in processed_uris:
-                        print(f"Skipping duplicate Letterboxd URI in CSV: {letterboxd_uri}")
-                        continue
-                    processed_uris.add(letterboxd_uri)
-
-                    film_year = None
-                    if film_year_str:
-                        try:
-                            film_year = int(film_year_str)
-                        except ValueError:
-                            print(f"Warning: Invalid year '{film_year_str}' for film '{film_title}' at row {row_num}. Film will be searched with year as NULL.")
-                    
-                    # Get film_id from existing films table
-                    film_id = get_film_id(conn, film_title, film_year)
-
-                    if film_id is None:
-                        # Film not found in the 'films' table, so skip this diary entry
-                        print(f"Skipping diary entry for '{film_title}' (Year: {film_year_str if film_year_str else 'N/A'}): Film not found in 'films' table.")
-                        skipped_film_not_found_count += 1
-                        continue
-
-                    watched_date_str = row.get('Watched Date')
-                    if not watched_date_str:
-                        print(f"Skipping entry for '{film_title}' ({letterboxd_uri}): 'Watched Date' is missing.")
-                        continue
-                    
-                    try:
-                        watched_date = datetime.strptime(watched_date_str, '%Y-%m-%d').date()
-                    except ValueError:
-                        print(f"Skipping entry for '{film_title}' ({letterboxd_uri}): Invalid 'Watched Date' format '{watched_date_str}'. Expected YYYY-MM-DD.")
-                        continue
-
-                    rewatch = row.get('Rewatch', '').strip().lower() == 'yes'
-                    rating_str = row.get('Rating', '').strip()
-                    rating = None
-                    if rating_str:
-                        try:
-                            rating = float(rating_str)
-                            if not (0.5 <= rating <= 5.0 or rating == 0):
-                                print(f"Warning: Rating {rating} for '{film_title}' ({letterboxd_uri}) is outside typical Letterboxd range (0.5-5.0).")
-                        except ValueError:
-                            print(f"Warning: Invalid rating value '{rating_str}' for '{film_title}' ({letterboxd_uri}). Setting rating to NULL.")
-                    
-                    entries_to_insert.append(
-                        (film_id, watched_date, rewatch, rating, letterboxd_uri)
-                    )
-
-                except Exception as e:
-                    print(f"Error processing row {row_num}: {row}. Error: {e}")
-                    continue 
+            parsed = read_diary_entries(file, film_id_map, csv_file_path)
+        if parsed is None:
+            return
+        entries_to_insert, unresolved_films = parsed
 
         if not entries_to_insert:
-            print("No valid diary entries found to insert.")
-            if skipped_film_not_found_count > 0:
-                 print(f"{skipped_film_not_found_count} entries were skipped because their films were not found in the 'films' table.")
+            LOG.info("No valid diary entries found to insert.")
+            report_unresolved_films(unresolved_films, "diary entries")
             return
 
-        with conn.cursor() as cur:
-            insert_query = """
-                INSERT INTO diary_entries (film_id, watched_date, rewatch, rating, letterboxd_diary_uri)
-                VALUES %s
-                ON CONFLICT (letterboxd_diary_uri) DO NOTHING; 
-            """
-            execute_values(cur, insert_query, entries_to_insert)
-            conn.commit()
-            print(f"Successfully processed and attempted to insert {len(entries_to_insert)} diary entries.")
-            print(f"{cur.rowcount} new diary entries were actually inserted (duplicates based on URI were skipped).")
-            if skipped_film_not_found_count > 0:
-                 print(f"{skipped_film_not_found_count} entries were skipped because their films were not found in the 'films' table.")
-
+        inserted_count = insert_diary_entries(conn, entries_to_insert)
+        conn.commit()
+        RUN_METRICS.increment("db_commits_total")
+        LOG.info(f"Successfully processed and attempted to insert {len(entries_to_insert)} diary entries.")
+        LOG.info(f"{inserted_count} new diary entries were actually inserted (duplicates based on URI were skipped).")
+        report_unresolved_films(unresolved_films, "diary entries")
 
     except FileNotFoundError:
-        print(f"Error: The file {csv_file_path} was not found.")
+        LOG.error(f"Error: The file {csv_file_path} was not found.")
     except Exception as e:
-        print(f"An unexpected error occurred during CSV processing: {e}")
+        LOG.error(f"An unexpected error occurred during CSV processing: {e}")
 
 
 def main():
     """Main function to connect to DB, create tables, and process CSV."""
     conn = None
     try:
-        if not all([DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT]):
-            print("Error: Database credentials are not fully set in the .env file.")
-            print("Please ensure DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, and DB_PORT are defined.")
+        conn = connect_db()
+        if conn is None:
             return
 
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            host=DB_HOST,
-            port=DB_PORT
-        )
-        print("Successfully connected to PostgreSQL database.")
-
         create_tables(conn) # Ensures diary_entries table exists, checks films table
         parse_and_insert_diary(conn, CSV_FILE_PATH)
+        refresh_dashboard_views(conn, ("diary_entries",))
 
     except psycopg2.Error as e:
-        print(f"Database connection error: {e}")
+        LOG.error(f"Database connection error: {e}")
     finally:
         if conn:
             conn.close()
-            print("Database connection closed.")
+            LOG.info("Database connection closed.")
+        LOG.info(RUN_METRICS.summary())
+        LOG.close()
 
 if __name__ == "__main__":
     main()
@@ -1,22 +1,42 @@
 # --- START OF FILE parsingInitialFilmData.py ---
 
+import argparse
 import csv
+import functools # Caches the console encoding lookup
 import psycopg2
 from psycopg2 import sql
-from psycopg2.extras import RealDictCursor # To fetch rows as dictionaries
+from psycopg2.extras import RealDictCursor, execute_values # Dict rows; multi-row batched writes
 import os
 import sys # Added for stdout encoding detection
-import time # For rate limiting
+import queue # Bounded queues between the enrichment pipeline stages
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor # Concurrent details fetches for the credits backfill
 import requests # For TMDb API calls
 from dotenv import load_dotenv
 from datetime import datetime # For parsing release dates to get year
 import locale # Added for locale-specific encoding detection
 
+from csvColumns import INVALID, RowProblems, convert_column, read_csv_columns
+from dashboardStats import refresh_dashboard_views
+from filmCredits import ROLE_ACTOR, ROLE_DIRECTOR, create_credit_tables, write_film_credits
+from pgBulk import copy_rows_to_staging
+from rateLimiter import TokenBucket
+from runLogger import INFO, LOG, add_logging_arguments, configure_from_args
+from runMetrics import RUN_METRICS, STAGE_DB_WRITE, STAGE_DETAILS, STAGE_MATCH, STAGE_PERSON, STAGE_SEARCH
+from schemaMigrations import ensure_enrichment_status, run_migrations
+from enrichmentJournal import (DEFAULT_JOURNAL_PATH, EnrichmentJournal, FAILURE_PERMANENT, FAILURE_TRANSIENT, OUTCOME_COLLISION,
+                               OUTCOME_DELETED, OUTCOME_FAILED, OUTCOME_MATCHED)
+from tmdbCache import open_default_cache
+from tmdbCatalog import TMDbCatalog
+from tmdbClient import TMDbClient
+
 try:
     import Levenshtein
 except ImportError:
-    print("Error: The 'python-Levenshtein' library is not installed.")
-    print("Please install it by running: pip install python-Levenshtein")
+    LOG.error("Error: The 'python-Levenshtein' library is not installed.")
+    LOG.error("Please install it by running: pip install python-Levenshtein")
     sys.exit(1)
 
 load_dotenv()
@@ -39,14 +59,44 @@ TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 # Define the table name in your PostgreSQL database
 TABLE_NAME = "films"
 
-# TMDb API base URL
-TMDB_API_URL = "https://api.themoviedb.org/3"
+# TMDb API base URL (TMDB_API_URL can point at mockTmdbServer.py for offline load tests)
+TMDB_API_URL = os.getenv("TMDB_API_URL", "https://api.themoviedb.org/3")
 TMDB_IMAGE_BASE_URL = "https://image.tmdb.org/t/p/"
 TMDB_PROFILE_SIZE = "w185" # Example profile image size for actors and directors
 
-# Delay between TMDb API calls (in seconds) to respect rate limits
-# Consider increasing this if you have many directors per film.
-API_CALL_DELAY = 0.6 # Adjusted slightly for more calls
+# Global TMDb request rate shared by all enrichment workers (token bucket).
+# TMDb currently allows roughly 40 requests/second; stay comfortably below that.
+TMDB_REQUESTS_PER_SECOND = float(os.getenv("TMDB_REQUESTS_PER_SECOND", "20"))
+TMDB_RATE_LIMITER = TokenBucket(TMDB_REQUESTS_PER_SECOND)
+
+# Optional offline title catalog built with `python tmdbCatalog.py build <export.json.gz> <catalog.bin>`.
+# When set, titles are matched locally and TMDb is only called for details; set
+# TMDB_CATALOG_SEARCH_FALLBACK=0 to also skip /search/movie for titles the catalog cannot match.
+TMDB_CATALOG_PATH = os.getenv("TMDB_CATALOG_PATH")
+TMDB_CATALOG = TMDbCatalog(TMDB_CATALOG_PATH) if TMDB_CATALOG_PATH else None
+TMDB_CATALOG_SEARCH_FALLBACK = os.getenv("TMDB_CATALOG_SEARCH_FALLBACK", "1").lower() not in ("0", "false", "no")
+
+# Number of enrichment worker threads per TMDb stage (search/match and details). Set to 1 for one film per stage at a time.
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "8"))
+
+# Number of enrichment results buffered before they are written back with one statement and one commit.
+ENRICH_WRITE_BATCH_SIZE = int(os.getenv("ENRICH_WRITE_BATCH_SIZE", "50"))
+
+# Capacity of each bounded queue between enrichment pipeline stages (select -> search -> details -> write).
+ENRICH_QUEUE_SIZE = int(os.getenv("ENRICH_QUEUE_SIZE", "100"))
+
+# Rows fetched per round trip by the server-side cursor that streams the enrichment backlog.
+ENRICH_SELECT_FETCH_SIZE = int(os.getenv("ENRICH_SELECT_FETCH_SIZE", "500"))
+
+# Seconds after which a partially filled write batch is flushed anyway.
+ENRICH_FLUSH_INTERVAL = float(os.getenv("ENRICH_FLUSH_INTERVAL", "2"))
+
+# Pooled, retrying TMDb transport shared by all workers. Serves repeated requests from the
+# persistent response cache shared with ManualDBAdd.py / ManualDBUpdate.py (TMDB_CACHE_DISABLED=1 to bypass).
+TMDB_CACHE = open_default_cache()
+TMDB_CLIENT = TMDbClient(TMDB_API_KEY, base_url=TMDB_API_URL, rate_limiter=TMDB_RATE_LIMITER,
+                         cache=TMDB_CACHE, pool_size=max(2 * ENRICH_WORKERS, 4), metrics=RUN_METRICS)
+
 
 # Number of top actors to store
 TOP_N_ACTORS = 5
@@ -61,16 +111,10 @@ YEAR_DIFF_THRESHOLD_FOR_MATCHING = 2
 
 # --- Helper Functions ---
 
-def safe_print_str(s, default_encoding='utf-8'):
-    """
-    Safely prepares a string for printing to the console by handling potential encoding issues.
-    It attempts to encode to UTF-8 and then decode to the console's effective encoding,
-    replacing any characters that cannot be represented.
-    """
-    if not isinstance(s, str):
-        s = str(s) # Ensure it's a string
-    
-    effective_encoding = sys.stdout.encoding
+@functools.lru_cache(maxsize=None)
+def _effective_console_encoding(stream_encoding, default_encoding):
+    """Resolves the console encoding once per (stdout encoding, default) pair instead of on every print."""
+    effective_encoding = stream_encoding
     
     if not effective_encoding: # If None (e.g., redirected output, some IDEs)
         try:
@@ -80,6 +124,21 @@ def safe_print_str(s, default_encoding='utf-8'):
     
     if not effective_encoding: # If still None after locale check
         effective_encoding = default_encoding
+    return effective_encoding
+
+
+def safe_print_str(s, default_encoding='utf-8'):
+    """
+    Safely prepares a string for printing to the console by handling potential encoding issues.
+    It attempts to encode to UTF-8 and then decode to the console's effective encoding,
+    replacing any characters that cannot be represented.
+    """
+    if not isinstance(s, str):
+        s = str(s) # Ensure it's a string
+    if s.isascii():
+        return s # Unchanged by the round trip below in any ASCII-compatible console encoding
+
+    effective_encoding = _effective_console_encoding(sys.stdout.encoding, default_encoding)
 
     try:
         return s.encode('utf-8', errors='replace').decode(effective_encoding, errors='replace')
@@ -90,10 +149,10 @@ def safe_print_str(s, default_encoding='utf-8'):
 def connect_db():
     """Establishes a connection to the PostgreSQL database."""
     if not DB_PASSWORD:
-        print("Error: DB_PASSWORD not found in environment variables.")
+        LOG.error("Error: DB_PASSWORD not found in environment variables.")
         exit()
     if not TMDB_API_KEY:
-        print("Error: TMDB_API_KEY not found in environment variables. Please add it to your .env file.")
+        LOG.error("Error: TMDB_API_KEY not found in environment variables. Please add it to your .env file.")
         exit()
     try:
         conn = psycopg2.connect(
@@ -103,16 +162,27 @@ def connect_db():
             host=DB_HOST,
             port=DB_PORT
         )
-        print(f"Successfully connected to PostgreSQL database '{safe_print_str(DB_NAME)}' as user '{safe_print_str(DB_USER)}'.")
+        LOG.info(f"Successfully connected to PostgreSQL database '{safe_print_str(DB_NAME)}' as user '{safe_print_str(DB_USER)}'.")
         return conn
     except psycopg2.OperationalError as e:
-        print(f"Error connecting to PostgreSQL: {e}")
+        LOG.error(f"Error connecting to PostgreSQL: {e}")
         exit()
 
+def open_read_connection(conn):
+    """
+    Opens a second, read-only connection to the database conn is connected to, for the enrichment select
+    stage. conn.dsn has the password masked, so it is supplied from DB_PASSWORD.
+    """
+    read_conn = psycopg2.connect(conn.dsn, password=DB_PASSWORD)
+    read_conn.set_session(readonly=True)
+    return read_conn
+
 def create_table_if_not_exists(conn):
     """
     Creates the table in the database with the TMDb-focused schema,
-    including multiple directors with profile paths and actor profile paths.
+    including multiple directors with profile paths and actor profile paths,
+    plus the enrichment status columns the backlog is selected by,
+    then applies any pending schema migrations (indexes).
     """
     cursor = conn.cursor()
     trigger_name_str = f"update_{TABLE_NAME}_modtime"
@@ -161,18 +231,23 @@ def create_table_if_not_exists(conn):
 
     try:
         cursor.execute(create_table_query)
-        print(f"Table '{safe_print_str(TABLE_NAME)}' checked/created successfully (schema includes: directors_profile_paths TEXT[]).")
+        LOG.info(f"Table '{safe_print_str(TABLE_NAME)}' checked/created successfully (schema includes: directors_profile_paths TEXT[]).")
         cursor.execute(create_trigger_function_query)
-        print("Function 'update_modified_column' checked/created successfully.")
+        LOG.info("Function 'update_modified_column' checked/created successfully.")
         cursor.execute(create_trigger_query)
-        print(f"Trigger '{safe_print_str(trigger_name_str)}' on table '{safe_print_str(TABLE_NAME)}' checked/created successfully.")
+        LOG.info(f"Trigger '{safe_print_str(trigger_name_str)}' on table '{safe_print_str(TABLE_NAME)}' checked/created successfully.")
+        create_credit_tables(cursor)
+        LOG.info("Tables 'people' and 'film_credits' checked/created successfully.")
+        if ensure_enrichment_status(cursor):
+            LOG.info(f"Added enrichment status columns to '{safe_print_str(TABLE_NAME)}'.")
         conn.commit()
     except psycopg2.Error as e:
-        print(f"Error during table or trigger creation: {e}")
+        LOG.error(f"Error during table or trigger creation: {e}")
         conn.rollback()
         exit()
     finally:
         if cursor and not cursor.closed: cursor.close()
+    run_migrations(conn)
 
 
 def process_csv_and_insert_data(conn, csv_file_path):
@@ -184,7 +259,7 @@ def process_csv_and_insert_data(conn, csv_file_path):
     skipped_count = 0
 
     if not csv_file_path or csv_file_path == "path/to/your/letterboxd_data.csv":
-        print(f"Error: CSV_FILE_PATH is not properly configured: '{safe_print_str(csv_file_path)}'")
+        LOG.error(f"Error: CSV_FILE_PATH is not properly configured: '{safe_print_str(csv_file_path)}'")
         return
 
     try:
@@ -196,11 +271,11 @@ def process_csv_and_insert_data(conn, csv_file_path):
 
             required_csv_cols = [csv_title_col, csv_year_col, csv_uri_col]
             if not reader.fieldnames:
-                print(f"Error: No headers in CSV: {safe_print_str(csv_file_path)}.")
+                LOG.error(f"Error: No headers in CSV: {safe_print_str(csv_file_path)}.")
                 return
             for col in required_csv_cols:
                 if col not in reader.fieldnames:
-                    print(f"Error: Required CSV column '{safe_print_str(col)}' not found in headers: {reader.fieldnames}")
+                    LOG.error(f"Error: Required CSV column '{safe_print_str(col)}' not found in headers: {reader.fieldnames}")
                     return
 
             for row_num, row in enumerate(reader, 1):
@@ -211,7 +286,7 @@ def process_csv_and_insert_data(conn, csv_file_path):
                     year_str = row.get(csv_year_col)
 
                     if not letterboxd_uri:
-                        print(f"Skipping row {row_num} due to missing Letterboxd URI.")
+                        LOG.warning(f"Skipping row {row_num} due to missing Letterboxd URI.")
                         skipped_count += 1
                         continue
                     
@@ -220,7 +295,7 @@ def process_csv_and_insert_data(conn, csv_file_path):
                         try:
                             year = int(year_str)
                         except ValueError:
-                            print(f"Warning: Row {row_num}: Could not parse year '{safe_print_str(year_str)}' for '{safe_print_str(title)}'. Skipping year.")
+                            LOG.warning(f"Warning: Row {row_num}: Could not parse year '{safe_print_str(year_str)}' for '{safe_print_str(title)}'. Skipping year.")
                     
                     insert_query = sql.SQL("""
                         INSERT INTO {table} (letterboxd_uri, title, year)
@@ -233,22 +308,113 @@ def process_csv_and_insert_data(conn, csv_file_path):
                     cursor.execute(insert_query, (letterboxd_uri, title, year))
                     inserted_count += 1
                 except psycopg2.Error as e:
-                    print(f"DB Error inserting row {row_num} for URI '{safe_print_str(letterboxd_uri)}': {e}")
+                    LOG.error(f"DB Error inserting row {row_num} for URI '{safe_print_str(letterboxd_uri)}': {e}")
                     conn.rollback()
                     skipped_count += 1
                 except Exception as e:
-                    print(f"Unexpected error with row {row_num} for URI '{safe_print_str(letterboxd_uri)}': {e}")
+                    LOG.error(f"Unexpected error with row {row_num} for URI '{safe_print_str(letterboxd_uri)}': {e}")
                     skipped_count += 1
             conn.commit()
-            print(f"CSV Data processing complete. Inserted/Updated: {inserted_count}, Skipped: {skipped_count}")
+            LOG.info(f"CSV Data processing complete. Inserted/Updated: {inserted_count}, Skipped: {skipped_count}")
     except FileNotFoundError:
-        print(f"Error: CSV file not found at '{safe_print_str(csv_file_path)}'.")
+        LOG.error(f"Error: CSV file not found at '{safe_print_str(csv_file_path)}'.")
     except Exception as e:
-        print(f"An error occurred during CSV processing: {e}")
+        LOG.error(f"An error occurred during CSV processing: {e}")
         if conn and not conn.closed: conn.rollback()
     finally:
         if cursor and not cursor.closed: cursor.close()
 
+def read_watched_rows(csvfile, source_name="watched.csv"):
+    """
+    Validation pre-pass over an open watched.csv file object, read column-wise with the Year column converted in one pass.
+    Returns (rows, skipped_count) where rows is a list of (letterboxd_uri, title, year) tuples
+    deduplicated by URI (last occurrence wins, matching upsert semantics), or None if the headers are unusable.
+    Bad rows are reported here, in one batch, so the database load itself never has to isolate per-row failures.
+    """
+    fieldnames, columns = read_csv_columns(csvfile)
+    csv_title_col, csv_year_col, csv_uri_col = 'Name', 'Year', 'Letterboxd URI'
+
+    if not fieldnames:
+        LOG.error("Error: No headers in watched CSV.")
+        return None
+    for col in (csv_title_col, csv_year_col, csv_uri_col):
+        if col not in fieldnames:
+            LOG.error(f"Error: Required CSV column '{safe_print_str(col)}' not found in headers: {fieldnames}")
+            return None
+
+    titles, year_strs, letterboxd_uris = columns[csv_title_col], columns[csv_year_col], columns[csv_uri_col]
+    years = convert_column(year_strs, int)
+    problems = RowProblems(source_name)
+    rows_by_uri = {}
+    skipped_count = 0
+    for row_num, (letterboxd_uri, title, year) in enumerate(zip(letterboxd_uris, titles, years), 1):
+        if not letterboxd_uri:
+            problems.add("missing_uri", f"Skipping row {row_num} due to missing Letterboxd URI.")
+            skipped_count += 1
+            continue
+        if year is INVALID:
+            problems.add("invalid_year", f"Warning: Row {row_num}: Could not parse year '{safe_print_str(year_strs[row_num - 1])}' for '{safe_print_str(title)}'. Skipping year.")
+            year = None
+        rows_by_uri[letterboxd_uri] = (letterboxd_uri, title, year)
+    problems.report()
+    return list(rows_by_uri.values()), skipped_count
+
+
+def upsert_watched_rows(conn, rows):
+    """
+    Loads (letterboxd_uri, title, year) rows into the films table with one COPY into a staging table
+    followed by a single set-based INSERT ... ON CONFLICT. Rows whose title and year are unchanged are not rewritten.
+    Does not commit. Returns (inserted_count, updated_count, unchanged_count).
+    """
+    with RUN_METRICS.time_stage(STAGE_DB_WRITE), conn.cursor() as cursor:
+        copy_rows_to_staging(cursor, "watched_staging", [("letterboxd_uri", "TEXT"), ("title", "TEXT"), ("year", "INTEGER")], rows)
+        RUN_METRICS.increment("db_statements_total", operation="upsert")
+        cursor.execute(sql.SQL("""
+            WITH upserted AS (
+                INSERT INTO {table} (letterboxd_uri, title, year)
+                SELECT letterboxd_uri, title, year FROM watched_staging
+                ON CONFLICT (letterboxd_uri) DO UPDATE SET
+                    title = EXCLUDED.title,
+                    year = EXCLUDED.year,
+                    updated_at = NOW()
+                WHERE {table}.title IS DISTINCT FROM EXCLUDED.title
+                   OR {table}.year IS DISTINCT FROM EXCLUDED.year
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM upserted;
+        """).format(table=sql.Identifier(TABLE_NAME)))
+        inserted_count, updated_count = cursor.fetchone()
+    return inserted_count, updated_count, len(rows) - inserted_count - updated_count
+
+
+def bulk_load_watched_csv(conn, csv_file_path):
+    """
+    Bulk alternative to process_csv_and_insert_data: validates watched.csv in one pass, then
+    COPYs it into a staging table and upserts into films in a single statement and transaction.
+    """
+    try:
+        with open(csv_file_path, mode='r', encoding='utf-8-sig', newline='') as csvfile:
+            parsed = read_watched_rows(csvfile, csv_file_path)
+    except FileNotFoundError:
+        LOG.error(f"Error: CSV file not found at '{safe_print_str(csv_file_path)}'.")
+        return
+    if parsed is None:
+        return
+    rows, skipped_count = parsed
+    if not rows:
+        LOG.info(f"No valid rows found in '{safe_print_str(csv_file_path)}'. Skipped: {skipped_count}")
+        return
+
+    try:
+        inserted_count, updated_count, unchanged_count = upsert_watched_rows(conn, rows)
+        conn.commit()
+        RUN_METRICS.increment("db_commits_total")
+        LOG.info(f"Bulk CSV load complete. Inserted: {inserted_count}, Updated: {updated_count}, "
+                 f"Unchanged: {unchanged_count}, Skipped: {skipped_count}")
+    except psycopg2.Error as e:
+        LOG.error(f"DB Error during bulk CSV load: {e}")
+        conn.rollback()
+
 def calculate_normalized_similarity(s1, s2):
     if not isinstance(s1, str) or not isinstance(s2, str): return 0.0
     s1_lower, s2_lower = s1.lower(), s2.lower()
@@ -297,20 +463,547 @@ def get_closest_year_match(tmdb_results, target_year, original_lb_title):
     return None
 
 
-def enrich_films_with_tmdb_data(conn):
+class TmdbIdIndex:
+    """
+    In-memory tmdb_id -> letterboxd_uri index used for collision detection during enrichment.
+    Loaded once from the films table, then updated as workers claim IDs, so collisions between
+    films matched earlier in the same run (even before their batch is written) are caught too.
+    All methods are thread-safe.
+    """
+
+    def __init__(self, uri_by_tmdb_id=None):
+        self._uri_by_tmdb_id = dict(uri_by_tmdb_id or {})
+        self._tmdb_id_by_uri = {uri: tmdb_id for tmdb_id, uri in self._uri_by_tmdb_id.items()}
+        self._unconfirmed = {} # uri -> TMDb ID it held before its not-yet-written claim (or None)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, conn):
+        """Builds the index from every film that already has a tmdb_id."""
+        RUN_METRICS.increment("db_statements_total", operation="select")
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("SELECT tmdb_id, letterboxd_uri FROM {table} WHERE tmdb_id IS NOT NULL;").format(
+                table=sql.Identifier(TABLE_NAME)))
+            return cls(dict(cursor.fetchall()))
+
+    def _unassign(self, letterboxd_uri):
+        tmdb_id = self._tmdb_id_by_uri.pop(letterboxd_uri, None)
+        if tmdb_id is not None and self._uri_by_tmdb_id.get(tmdb_id) == letterboxd_uri:
+            del self._uri_by_tmdb_id[tmdb_id]
+
+    def claim(self, tmdb_id, letterboxd_uri):
+        """
+        Assigns tmdb_id to letterboxd_uri unless another film already holds it.
+        Returns None on success, or the letterboxd_uri of the film that holds tmdb_id (a collision).
+        """
+        with self._lock:
+            owner_uri = self._uri_by_tmdb_id.get(tmdb_id)
+            if owner_uri is not None and owner_uri != letterboxd_uri:
+                return owner_uri
+            if letterboxd_uri not in self._unconfirmed:
+                self._unconfirmed[letterboxd_uri] = self._tmdb_id_by_uri.get(letterboxd_uri)
+            self._unassign(letterboxd_uri)
+            self._uri_by_tmdb_id[tmdb_id] = letterboxd_uri
+            self._tmdb_id_by_uri[letterboxd_uri] = tmdb_id
+            return None
+
+    def confirm(self, letterboxd_uri):
+        """Marks the film's claim as written to the database."""
+        with self._lock:
+            self._unconfirmed.pop(letterboxd_uri, None)
+
+    def release(self, letterboxd_uri):
+        """Undoes an unconfirmed claim (e.g. its write failed), restoring the TMDb ID the film held before, if still free."""
+        with self._lock:
+            if letterboxd_uri not in self._unconfirmed:
+                return
+            previous_tmdb_id = self._unconfirmed.pop(letterboxd_uri)
+            self._unassign(letterboxd_uri)
+            if previous_tmdb_id is not None and previous_tmdb_id not in self._uri_by_tmdb_id:
+                self._uri_by_tmdb_id[previous_tmdb_id] = letterboxd_uri
+                self._tmdb_id_by_uri[letterboxd_uri] = previous_tmdb_id
+
+    def forget(self, letterboxd_uri):
+        """Drops the film from the index after it has been deleted from the database."""
+        with self._lock:
+            self._unassign(letterboxd_uri)
+            self._unconfirmed.pop(letterboxd_uri, None)
+
+
+def build_profile_url(profile_path):
+    """Turns a TMDb profile_path into a full image URL at TMDB_PROFILE_SIZE, or None if there is no image."""
+    return f"{TMDB_IMAGE_BASE_URL}{TMDB_PROFILE_SIZE}{profile_path}" if profile_path else None
+
+
+# Memoized person id -> profile image URL, shared by all workers for the lifetime of the run.
+_person_profile_urls = {}
+_person_profile_urls_lock = threading.Lock()
+
+def fetch_person_profile_url(person_id):
+    """
+    Fallback lookup of a person's profile image via /person/{id}, used only when a credits
+    entry lacks a profile_path. Results are memoized so each person is fetched at most once per run.
+    """
+    with _person_profile_urls_lock:
+        if person_id in _person_profile_urls:
+            return _person_profile_urls[person_id]
+    with RUN_METRICS.time_stage(STAGE_PERSON):
+        person_details = TMDB_CLIENT.get_json(f"/person/{person_id}", {'api_key': TMDB_API_KEY})
+    profile_url = build_profile_url(person_details.get('profile_path'))
+    with _person_profile_urls_lock:
+        _person_profile_urls[person_id] = profile_url
+    return profile_url
+
+
+class FilmWorkItem:
+    """
+    One film in flight through the enrichment pipeline. Slotted so that a full set of bounded
+    queues holds only a few hundred small objects, however large the backlog is.
+    outcome/write follow the conventions of the write stage: write is a row tuple for FILM_UPDATE_QUERY
+    followed by the film's credits when outcome is 'updated', the letterboxd_uri when 'deleted', the failure kind
+    (FAILURE_TRANSIENT or FAILURE_PERMANENT) when 'failed', and None for 'collision'.
+    Log lines are buffered so the output of concurrently processed films does not interleave.
+    """
+    __slots__ = ("letterboxd_uri", "title", "year", "position", "tmdb_id", "outcome", "write", "log_lines")
+
+    def __init__(self, letterboxd_uri, title, year, position):
+        self.letterboxd_uri = letterboxd_uri
+        self.title = title
+        self.year = year
+        self.position = position
+        self.tmdb_id = None
+        self.outcome = None
+        self.write = None
+        self.log_lines = []
+
+
+def fail_work_item(tmdb_index, item, error):
+    """Logs a TMDb/unexpected error for item, classifies it as transient or permanent and releases its TMDb ID claim."""
+    log = item.log_lines.append
+    title_for_print = safe_print_str(item.title)
+    if isinstance(error, requests.exceptions.HTTPError):
+        error_msg = safe_print_str(error.response.text if error.response is not None and hasattr(error.response, 'text') else 'No response text')
+        log(f"  -> TMDb API HTTP Error for '{title_for_print}': {error.response.status_code if error.response is not None else 'N/A'} - {error_msg}")
+        if error.response is not None and error.response.status_code == 404: log(f"  -> TMDb: Movie ID {item.tmdb_id if item.tmdb_id else '(unknown)'} not found (404).")
+        # Client errors other than rate limiting will fail the same way again; don't retry them on --resume.
+        status_code = error.response.status_code if error.response is not None else None
+        failure_kind = FAILURE_PERMANENT if status_code and 400 <= status_code < 500 and status_code != 429 else FAILURE_TRANSIENT
+    elif isinstance(error, requests.exceptions.RequestException):
+        log(f"  -> TMDb API Request Error for '{title_for_print}': {error}"); failure_kind = FAILURE_TRANSIENT
+    else:
+        log(f"  -> Unexpected error for '{title_for_print}': {type(error).__name__} - {error}\n"
+            f"{''.join(traceback.format_exception(type(error), error, error.__traceback__))}")
+        failure_kind = FAILURE_TRANSIENT
+    # Give back any TMDb ID claimed before the failure so other films may use it.
+    tmdb_index.release(item.letterboxd_uri)
+    item.outcome, item.write = 'failed', failure_kind
+
+
+def search_and_match_film(tmdb_index, item, total_films_to_process):
+    """
+    Search stage: catalog/TMDb search -> get_closest_year_match -> collision check.
+    Never touches the database; collisions are decided against the shared in-memory tmdb_index,
+    which claims the matched TMDb ID for this film.
+    Returns True if the film matched and moves on to the details stage. Otherwise item.outcome is
+    set ('deleted', 'collision' or 'failed') and the item goes straight to the write stage.
+    """
+    log = item.log_lines.append
+    original_film_title = item.title
+    current_film_title_safe_for_print = safe_print_str(original_film_title)
+
+    log(f"\nProcessing ({item.position}/{total_films_to_process}): '{current_film_title_safe_for_print}' (LB Year: {item.year}) - URI: {safe_print_str(item.letterboxd_uri)}")
+    selected_tmdb_movie_obj = None
+
+    try:
+        if TMDB_CATALOG is not None:
+            with RUN_METRICS.time_stage(STAGE_SEARCH):
+                catalog_results = TMDB_CATALOG.search(original_film_title)
+            with RUN_METRICS.time_stage(STAGE_MATCH):
+                selected_tmdb_movie_obj = get_closest_year_match(catalog_results, item.year, original_film_title)
+            if selected_tmdb_movie_obj:
+                item.tmdb_id = selected_tmdb_movie_obj.get('id')
+                log(f"  -> Catalog: Matched offline: '{safe_print_str(selected_tmdb_movie_obj.get('title'))}' ({selected_tmdb_movie_obj.get('release_date')}), ID: {item.tmdb_id}")
+            elif TMDB_CATALOG_SEARCH_FALLBACK:
+                log(f"  -> Catalog: No local match for '{current_film_title_safe_for_print}'. Falling back to TMDb search.")
+
+        if not selected_tmdb_movie_obj and (TMDB_CATALOG is None or TMDB_CATALOG_SEARCH_FALLBACK):
+            search_params_year = {'api_key': TMDB_API_KEY, 'query': original_film_title}
+            if item.year: search_params_year['year'] = item.year
+
+            with RUN_METRICS.time_stage(STAGE_SEARCH):
+                search_results_with_year = TMDB_CLIENT.get_json("/search/movie", search_params_year).get('results', [])
+            with RUN_METRICS.time_stage(STAGE_MATCH):
+                selected_tmdb_movie_obj = get_closest_year_match(search_results_with_year, item.year, original_film_title)
+
+            if selected_tmdb_movie_obj:
+                item.tmdb_id = selected_tmdb_movie_obj.get('id')
+                log(f"  -> TMDb: Tentative match (year pref): '{safe_print_str(selected_tmdb_movie_obj.get('title'))}' ({selected_tmdb_movie_obj.get('release_date')}), ID: {item.tmdb_id}")
+
+        if not selected_tmdb_movie_obj and (TMDB_CATALOG is None or TMDB_CATALOG_SEARCH_FALLBACK):
+            if item.year: log(f"  -> TMDb: No strong match with year. Trying title-only for '{current_film_title_safe_for_print}'.")
+            title_only_params = {'api_key': TMDB_API_KEY, 'query': original_film_title}
+            with RUN_METRICS.time_stage(STAGE_SEARCH):
+                search_results_title_only = TMDB_CLIENT.get_json("/search/movie", title_only_params).get('results', [])
+            with RUN_METRICS.time_stage(STAGE_MATCH):
+                selected_tmdb_movie_obj = get_closest_year_match(search_results_title_only, item.year, original_film_title)
+            if selected_tmdb_movie_obj:
+                item.tmdb_id = selected_tmdb_movie_obj.get('id')
+                log(f"  -> TMDb: Matched (title-only, new logic): '{safe_print_str(selected_tmdb_movie_obj.get('title'))}' ({selected_tmdb_movie_obj.get('release_date')}), ID: {item.tmdb_id}")
+
+        if not selected_tmdb_movie_obj:
+            log(f"  -> TMDb: No suitable match for '{current_film_title_safe_for_print}'. Queued for deletion from DB.")
+            item.outcome, item.write = 'deleted', item.letterboxd_uri
+            return False
+
+        if item.tmdb_id: # Collision Check
+            existing_uri = tmdb_index.claim(item.tmdb_id, item.letterboxd_uri)
+            if existing_uri is not None:
+                log(f"  -> COLLISION: TMDb ID {item.tmdb_id} for '{current_film_title_safe_for_print}' "
+                    f"already used by URI '{safe_print_str(existing_uri)}'. Skipping update for current film.")
+                item.outcome = 'collision'
+                return False
+        return True
+
+    except Exception as e:
+        fail_work_item(tmdb_index, item, e)
+        return False
+
+
+def extract_credits(movie_details, log):
+    """
+    Pulls the directors (with profile image URLs) and the top TOP_N_ACTORS actors out of a
+    /movie/{id}?append_to_response=credits payload. Returns
+    (directors, director_profile_urls, actors, actor_profile_urls, credits), where credits holds the same people
+    as (role, billing_order, tmdb_person_id, name, profile_url) tuples for film_credits (people without a TMDb id
+    are left out); log receives per-person lookup messages.
+    """
+    directors_list, director_profiles_list = [], []
+    actors_list, actor_profiles_list = [], []
+    credits = []
+
+    if 'credits' in movie_details:
+        # Process Directors
+        if 'crew' in movie_details['credits']:
+            for crew_member in movie_details['credits']['crew']:
+                if crew_member.get('job') == 'Director' and crew_member.get('name'):
+                    directors_list.append(crew_member['name'])
+                    director_person_id = crew_member.get('id')
+                    director_profile_url = None
+                    if 'profile_path' in crew_member:
+                        # The credits payload already carries the profile image; no /person call needed.
+                        director_profile_url = build_profile_url(crew_member['profile_path'])
+                    elif director_person_id:
+                        try:
+                            director_profile_url = fetch_person_profile_url(director_person_id)
+                            log(f"    Looked up profile for director: {safe_print_str(crew_member['name'])} (ID: {director_person_id}) -> {'found' if director_profile_url else 'none'}")
+                        except requests.exceptions.HTTPError as he:
+                            log(f"      -> TMDb API HTTP Error fetching director {safe_print_str(crew_member['name'])} (ID: {director_person_id}): {he.response.status_code if he.response is not None else 'Unknown'}")
+                        except requests.exceptions.RequestException as re:
+                            log(f"      -> TMDb API Request Error fetching director {safe_print_str(crew_member['name'])} (ID: {director_person_id}): {re}")
+                        except Exception as e_person:
+                            log(f"      -> Unexpected error fetching director profile {safe_print_str(crew_member['name'])}: {e_person}")
+                    director_profiles_list.append(director_profile_url)
+                    if director_person_id:
+                        credits.append((ROLE_DIRECTOR, len(directors_list) - 1, director_person_id, crew_member['name'], director_profile_url))
+
+        # Process Actors
+        if 'cast' in movie_details['credits']:
+            for billing_order, actor_data in enumerate(movie_details['credits']['cast'][:TOP_N_ACTORS]):
+                if actor_data.get('name'): 
+                    actors_list.append(actor_data['name'])
+                    actor_profiles_list.append(build_profile_url(actor_data.get('profile_path')))
+                    if actor_data.get('id'):
+                        credits.append((ROLE_ACTOR, billing_order, actor_data['id'], actor_data['name'], actor_profiles_list[-1]))
+                else:
+                    actor_profiles_list.append(None) # Maintain parallelism
+
+    return directors_list, director_profiles_list, actors_list, actor_profiles_list, credits
+
+
+def fetch_film_details(tmdb_index, item):
+    """
+    Details stage: fetches /movie/{id} with credits for a matched film and prepares its update row.
+    Sets item.outcome to 'updated' (item.write is the FILM_UPDATE_QUERY row plus its credits) or 'failed'.
+    """
+    log = item.log_lines.append
+    current_film_title_safe_for_print = safe_print_str(item.title)
+    tmdb_movie_id = item.tmdb_id
+
+    try:
+        details_params = {'api_key': TMDB_API_KEY, 'append_to_response': 'credits'}
+        with RUN_METRICS.time_stage(STAGE_DETAILS):
+            details_result = TMDB_CLIENT.request(f"/movie/{tmdb_movie_id}", details_params)
+        movie_details = details_result.data
+        log(f"  -> TMDb: Details for ID {tmdb_movie_id} {'served from cache' if details_result.from_cache else 'fetched'} in {details_result.latency * 1000:.0f} ms ({details_result.attempts} HTTP attempt(s)).")
+
+        directors_list, director_profiles_list, actors_list, actor_profiles_list, credits = extract_credits(movie_details, log)
+
+        poster_path = movie_details.get('poster_path')
+        backdrop_path = movie_details.get('backdrop_path')
+        runtime = movie_details.get('runtime')
+        genres_list = [genre['name'] for genre in movie_details.get('genres', []) if genre.get('name')]
+        release_date_str = movie_details.get('release_date')
+        release_date = None
+        if release_date_str:
+            try:
+                datetime.strptime(release_date_str, '%Y-%m-%d'); release_date = release_date_str
+            except ValueError: log(f"  -> TMDb: Invalid release date format '{safe_print_str(release_date_str)}'. Skipping.")
+
+        update_row = (
+            item.letterboxd_uri,
+            tmdb_movie_id, 
+            directors_list if directors_list else None, 
+            director_profiles_list if director_profiles_list else None,
+            actors_list if actors_list else None, 
+            actor_profiles_list if actor_profiles_list else None,
+            poster_path, backdrop_path, runtime, genres_list if genres_list else None,
+            release_date,
+            credits # Written to film_credits alongside the film row; not part of FILM_UPDATE_QUERY
+        )
+        log(f"  -> Prepared update for '{current_film_title_safe_for_print}' (TMDb ID {tmdb_movie_id}) with {len(directors_list)} Director(s) (profiles: {sum(1 for p in director_profiles_list if p)}) and {len(actors_list)} Actor(s).")
+        item.outcome, item.write = 'updated', update_row
+
+    except Exception as e:
+        fail_work_item(tmdb_index, item, e)
+
+
+# Multi-row UPDATE used by flush_film_updates; rows come from fetch_film_details.
+# Explicit casts keep VALUES typed even when the first row holds NULLs.
+FILM_UPDATE_QUERY = sql.SQL("""
+    UPDATE {table} AS f SET
+        tmdb_id = v.tmdb_id, directors = v.directors, directors_profile_paths = v.directors_profile_paths,
+        actors = v.actors, actor_profile_paths = v.actor_profile_paths,
+        poster_path = v.poster_path, backdrop_path = v.backdrop_path, runtime = v.runtime,
+        genres = v.genres, release_date = v.release_date, updated_at = NOW(),
+        enrichment_status = 'done', enrichment_attempts = f.enrichment_attempts + 1, enrichment_attempted_at = NOW()
+    FROM (VALUES %s) AS v (letterboxd_uri, tmdb_id, directors, directors_profile_paths, actors, actor_profile_paths,
+                           poster_path, backdrop_path, runtime, genres, release_date)
+    WHERE f.letterboxd_uri = v.letterboxd_uri;
+""")
+FILM_UPDATE_TEMPLATE = "(%s, %s::integer, %s::text[], %s::text[], %s::text[], %s::text[], %s, %s, %s::integer, %s::text[], %s::date)"
+# Update rows carry the film's credits after the FILM_UPDATE_QUERY values (rows journaled before
+# film_credits existed have none).
+FILM_UPDATE_WIDTH = FILM_UPDATE_TEMPLATE.count("%s")
+
+
+def flush_film_updates(conn, tmdb_index, update_rows):
+    """
+    Writes a batch of enrichment results with one multi-row UPDATE ... FROM (VALUES ...), replaces their
+    film_credits (see filmCredits.write_film_credits) and commits once. A failing batch is rolled back on its own and does not affect earlier or later batches;
+    its TMDb ID claims are released from tmdb_index. Returns the number of films written (0 if the batch failed).
+    """
+    if not update_rows:
+        return 0
+    try:
+        with RUN_METRICS.time_stage(STAGE_DB_WRITE):
+            with conn.cursor() as update_cursor:
+                RUN_METRICS.increment("db_statements_total", operation="update")
+                execute_values(update_cursor, FILM_UPDATE_QUERY.format(table=sql.Identifier(TABLE_NAME)).as_string(update_cursor),
+                               [update_row[:FILM_UPDATE_WIDTH] for update_row in update_rows],
+                               template=FILM_UPDATE_TEMPLATE, page_size=len(update_rows))
+                write_film_credits(update_cursor, [(update_row[0], update_row[FILM_UPDATE_WIDTH]) for update_row in update_rows
+                                                   if len(update_row) > FILM_UPDATE_WIDTH])
+            conn.commit()
+        RUN_METRICS.increment("db_commits_total")
+    except psycopg2.Error as e:
+        conn.rollback()
+        for update_row in update_rows: tmdb_index.release(update_row[0])
+        LOG.warning(f"  -> DB: Update batch of {len(update_rows)} film(s) failed and was rolled back: {e}")
+        return 0
+    for update_row in update_rows: tmdb_index.confirm(update_row[0])
+    LOG.info(f"  -> DB: Updated {len(update_rows)} film(s) in one batch.")
+    return len(update_rows)
+
+
+def flush_film_deletes(conn, tmdb_index, letterboxd_uris):
+    """
+    Deletes a batch of unmatched films with one statement and one commit, isolated like flush_film_updates.
+    Returns the number of films deleted, or None if the batch failed.
+    """
+    if not letterboxd_uris:
+        return 0
+    try:
+        with RUN_METRICS.time_stage(STAGE_DB_WRITE):
+            with conn.cursor() as delete_cursor:
+                RUN_METRICS.increment("db_statements_total", operation="delete")
+                delete_cursor.execute(sql.SQL("DELETE FROM {table} WHERE letterboxd_uri = ANY(%s);").format(
+                    table=sql.Identifier(TABLE_NAME)), (list(letterboxd_uris),))
+                deleted_count = delete_cursor.rowcount
+            conn.commit()
+        RUN_METRICS.increment("db_commits_total")
+    except psycopg2.Error as e:
+        conn.rollback()
+        LOG.warning(f"  -> DB: Delete batch of {len(letterboxd_uris)} film(s) failed and was rolled back: {e}")
+        return None
+    for letterboxd_uri in letterboxd_uris: tmdb_index.forget(letterboxd_uri)
+    LOG.info(f"  -> DB: Deleted {deleted_count} unmatched film(s) in one batch.")
+    return deleted_count
+
+
+def flush_enrichment_attempts(conn, letterboxd_uris):
+    """
+    Records an unsuccessful enrichment attempt (collision or failure) for a batch of films with one statement
+    and one commit; they stay 'pending' for the next run. Bookkeeping only: a failure is logged and rolled back.
+    """
+    if not letterboxd_uris:
+        return
+    try:
+        with RUN_METRICS.time_stage(STAGE_DB_WRITE):
+            with conn.cursor() as attempt_cursor:
+                RUN_METRICS.increment("db_statements_total", operation="update")
+                attempt_cursor.execute(sql.SQL("""
+                    UPDATE {table} SET enrichment_attempts = enrichment_attempts + 1, enrichment_attempted_at = NOW()
+                    WHERE letterboxd_uri = ANY(%s);
+                """).format(table=sql.Identifier(TABLE_NAME)), (list(letterboxd_uris),))
+            conn.commit()
+        RUN_METRICS.increment("db_commits_total")
+    except psycopg2.Error as e:
+        conn.rollback()
+        LOG.warning(f"  -> DB: Recording {len(letterboxd_uris)} enrichment attempt(s) failed and was rolled back: {e}")
+
+
+# Marks the end of a stage's input on a pipeline queue.
+_END_OF_STAGE = object()
+# Seconds a blocked stage waits before re-checking whether the pipeline was stopped.
+_QUEUE_POLL_SECONDS = 0.5
+
+
+def _put_until_stopped(work_queue, item, stop_event):
+    """Puts item on a bounded queue, giving up (returns False) if the pipeline is stopped while it is full."""
+    while not stop_event.is_set():
+        try:
+            work_queue.put(item, timeout=_QUEUE_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get_until_stopped(work_queue, stop_event):
+    """Takes the next item from a queue; returns _END_OF_STAGE if the pipeline is stopped while it is empty."""
+    while not stop_event.is_set():
+        try:
+            return work_queue.get(timeout=_QUEUE_POLL_SECONDS)
+        except queue.Empty:
+            continue
+    return _END_OF_STAGE
+
+
+def select_stage(select_cursor, search_queue, stop_event, stage_errors):
+    """
+    Select stage: streams the backlog from a server-side cursor, ENRICH_SELECT_FETCH_SIZE rows per
+    round trip, into search_queue as FilmWorkItems. Blocks while the queue is full, so only the rows
+    in flight are ever held in memory. The cursor lives on its own connection (open_read_connection),
+    so fetches never wait on the write stage's commits.
+    """
+    try:
+        position = 0
+        while True:
+            RUN_METRICS.increment("db_statements_total", operation="fetch")
+            films = select_cursor.fetchmany(ENRICH_SELECT_FETCH_SIZE)
+            if not films:
+                return
+            for film in films:
+                position += 1
+                if not _put_until_stopped(search_queue, FilmWorkItem(film['letterboxd_uri'], film['title'], film['year'], position), stop_event):
+                    return
+    except Exception as e:
+        stage_errors.append(e)
+        stop_event.set()
+
+
+def search_stage(tmdb_index, total_films_to_process, search_queue, details_queue, write_queue, stop_event):
+    """Search worker: matched films go on to details_queue, everything else straight to write_queue."""
+    while True:
+        item = _get_until_stopped(search_queue, stop_event)
+        if item is _END_OF_STAGE:
+            return
+        next_queue = details_queue if search_and_match_film(tmdb_index, item, total_films_to_process) else write_queue
+        if not _put_until_stopped(next_queue, item, stop_event):
+            return
+
+
+def details_stage(tmdb_index, details_queue, write_queue, stop_event):
+    """Details worker: fetches details for matched films and hands the prepared updates to write_queue."""
+    while True:
+        item = _get_until_stopped(details_queue, stop_event)
+        if item is _END_OF_STAGE:
+            return
+        fetch_film_details(tmdb_index, item)
+        if not _put_until_stopped(write_queue, item, stop_event):
+            return
+
+
+def start_enrichment_pipeline(select_cursor, tmdb_index, total_films_to_process, workers, queue_size):
+    """
+    Starts the select -> search -> details stages as daemon threads connected by bounded queues
+    (queue_size items each) and returns (write_queue, stop_event, stage_errors).
+    The caller is the write stage: it drains write_queue until _END_OF_STAGE arrives, which a
+    coordinator thread sends once every upstream stage has finished. Setting stop_event makes
+    all stages exit promptly; errors raised by the select stage are appended to stage_errors.
+    """
+    search_queue, details_queue, write_queue = (queue.Queue(maxsize=queue_size) for _ in range(3))
+    stop_event = threading.Event()
+    stage_errors = []
+
+    def start(target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+
+    def coordinate():
+        # Each stage's end is signalled downstream only after all of its threads have drained their input.
+        select_thread.join()
+        for _ in search_threads: _put_until_stopped(search_queue, _END_OF_STAGE, stop_event)
+        for thread in search_threads: thread.join()
+        for _ in details_threads: _put_until_stopped(details_queue, _END_OF_STAGE, stop_event)
+        for thread in details_threads: thread.join()
+        _put_until_stopped(write_queue, _END_OF_STAGE, stop_event)
+
+    select_thread = start(select_stage, select_cursor, search_queue, stop_event, stage_errors)
+    search_threads = [start(search_stage, tmdb_index, total_films_to_process, search_queue, details_queue, write_queue, stop_event)
+                      for _ in range(workers)]
+    details_threads = [start(details_stage, tmdb_index, details_queue, write_queue, stop_event) for _ in range(workers)]
+    start(coordinate)
+    return write_queue, stop_event, stage_errors
+
+
+def enrich_films_with_tmdb_data(conn, max_workers=None, batch_size=None, journal=None, resume=False,
+                                queue_size=None, flush_interval=None):
     """
     Fetches films from DB that need TMDb enrichment, searches TMDb,
     extracts details including multiple directors with profile paths, top actors with profile paths,
     and updates the DB.
+    Films stream through a pipeline of stages connected by bounded queues of queue_size items
+    (default ENRICH_QUEUE_SIZE): a server-side cursor selects the backlog, max_workers threads
+    (default ENRICH_WORKERS) search and match, as many fetch details, and this thread writes.
+    Memory use therefore stays flat however large the backlog is. All TMDb calls share TMDB_RATE_LIMITER,
+    so throughput is bounded by TMDB_REQUESTS_PER_SECOND rather than by fixed per-call sleeps.
+    Updates and deletes are written back in batches of batch_size (default ENRICH_WRITE_BATCH_SIZE)
+    with one statement and one commit per batch, or after flush_interval seconds
+    (default ENRICH_FLUSH_INTERVAL) if a batch fills slowly.
+    With a journal (EnrichmentJournal), per-film progress is recorded under a run id. resume=True continues
+    the latest unfinished run: finished films are skipped and prepared-but-uncommitted writes are replayed
+    without repeating their TMDb calls.
     """
+    if max_workers is None: max_workers = ENRICH_WORKERS
+    max_workers = max(1, max_workers)
+    if batch_size is None: batch_size = ENRICH_WRITE_BATCH_SIZE
+    batch_size = max(1, batch_size)
+    if queue_size is None: queue_size = ENRICH_QUEUE_SIZE
+    queue_size = max(1, queue_size)
+    if flush_interval is None: flush_interval = ENRICH_FLUSH_INTERVAL
+
     # --- BEGIN SCHEMA VALIDATION ---
     columns_to_check_for_null_filter = [
         "tmdb_id", "poster_path", "actors", "directors", 
-        "actor_profile_paths", "directors_profile_paths" # Added directors_profile_paths
+        "actor_profile_paths", "directors_profile_paths", # Added directors_profile_paths
+        "enrichment_status", "enrichment_attempts" # Added by create_table_if_not_exists (schema migration 5)
     ]
     expected_column_types = {
         "tmdb_id": "INTEGER", "poster_path": "TEXT", "actors": "TEXT[]", "directors": "TEXT[]",
-        "actor_profile_paths": "TEXT[]", "directors_profile_paths": "TEXT[]" # Added directors_profile_paths
+        "actor_profile_paths": "TEXT[]", "directors_profile_paths": "TEXT[]", # Added directors_profile_paths
+        "enrichment_status": "TEXT NOT NULL DEFAULT 'pending'", "enrichment_attempts": "INTEGER NOT NULL DEFAULT 0"
     }
     column_check_cursor = None
     try:
@@ -321,232 +1014,280 @@ def enrich_films_with_tmdb_data(conn):
                     column=sql.Identifier(col_name), table=sql.Identifier(TABLE_NAME)))
             except psycopg2.ProgrammingError as pe:
                 if "column" in str(pe).lower() and "does not exist" in str(pe).lower():
-                    print(f"\n--- SCHEMA MISMATCH DETECTED ---")
-                    print(f"Critical Error: Column '{safe_print_str(col_name)}' (expected type: {expected_column_types.get(col_name, 'UNKNOWN')}) "
-                          f"does not exist in '{safe_print_str(TABLE_NAME)}'.")
-                    print(f"PostgreSQL Hint: {pe.diag.message_primary if hasattr(pe, 'diag') and pe.diag.message_primary else 'No hint.'}")
-                    print(f"Please ensure your DB schema matches the script's `create_table_if_not_exists` definition.")
-                    print(f"You may need to: `ALTER TABLE {safe_print_str(TABLE_NAME)} ADD COLUMN {safe_print_str(col_name)} {expected_column_types.get(col_name, 'APPROPRIATE_TYPE')};`")
-                    print(f"--- SCRIPT EXECUTION HALTED ---")
+                    LOG.error(f"\n--- SCHEMA MISMATCH DETECTED ---")
+                    LOG.error(f"Critical Error: Column '{safe_print_str(col_name)}' (expected type: {expected_column_types.get(col_name, 'UNKNOWN')}) "
+                              f"does not exist in '{safe_print_str(TABLE_NAME)}'.")
+                    LOG.error(f"PostgreSQL Hint: {pe.diag.message_primary if hasattr(pe, 'diag') and pe.diag.message_primary else 'No hint.'}")
+                    LOG.error(f"Please ensure your DB schema matches the script's `create_table_if_not_exists` definition.")
+                    LOG.error(f"You may need to: `ALTER TABLE {safe_print_str(TABLE_NAME)} ADD COLUMN {safe_print_str(col_name)} {expected_column_types.get(col_name, 'APPROPRIATE_TYPE')};`")
+                    LOG.error(f"--- SCRIPT EXECUTION HALTED ---")
                     conn.rollback(); return
                 else: raise
-    except psycopg2.Error as e: print(f"PostgreSQL error during schema validation: {e}"); conn.rollback(); return
-    except Exception as e: print(f"Unexpected error during schema validation: {e}"); conn.rollback(); return
+    except psycopg2.Error as e: LOG.error(f"PostgreSQL error during schema validation: {e}"); conn.rollback(); return
+    except Exception as e: LOG.error(f"Unexpected error during schema validation: {e}"); conn.rollback(); return
     finally:
         if column_check_cursor and not column_check_cursor.closed: column_check_cursor.close()
     # --- END SCHEMA VALIDATION ---
 
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    # Served by the partial index films_enrichment_pending_idx (id) WHERE enrichment_status = 'pending',
+    # so selecting the backlog costs time proportional to the backlog rather than to the library.
+    backlog_filter = sql.SQL("""
+        WHERE enrichment_status = 'pending' AND title IS NOT NULL AND letterboxd_uri <> ALL(%s)
+    """)
+    count_query = sql.SQL("SELECT COUNT(*) AS backlog_size FROM {table} {backlog_filter};").format(
+        table=sql.Identifier(TABLE_NAME), backlog_filter=backlog_filter)
     select_query = sql.SQL("""
-        SELECT id, letterboxd_uri, title, year 
-        FROM {table} 
-        WHERE (
-            tmdb_id IS NULL OR poster_path IS NULL OR 
-            actors IS NULL OR directors IS NULL OR 
-            actor_profile_paths IS NULL OR directors_profile_paths IS NULL 
-        ) AND title IS NOT NULL
+        SELECT letterboxd_uri, title, year 
+        FROM {table} {backlog_filter}
         ORDER BY id; 
-    """).format(table=sql.Identifier(TABLE_NAME))
+    """).format(table=sql.Identifier(TABLE_NAME), backlog_filter=backlog_filter)
 
+    cursor = None
+    read_conn = None
+    stop_event = None
     try:
-        cursor.execute(select_query)
-        films_to_enrich = cursor.fetchall()
-        total_films_to_process = len(films_to_enrich)
-        print(f"Found {total_films_to_process} films to enrich/update with TMDb data (including director profiles).")
+        outcome_counts = {'updated': 0, 'deleted': 0, 'collision': 0, 'failed': 0}
+        tmdb_index = TmdbIdIndex.load(conn) # One query; collision checks are local from here on
+        conn.commit()
+        pending_updates, pending_deletes, pending_attempts = [], [], []
 
-        if not films_to_enrich:
-            print("No films found requiring TMDb data enrichment.")
-            return
-        
-        updated_count, deleted_count, skipped_due_to_collision = 0, 0, 0
-
-        for idx, film in enumerate(films_to_enrich):
-            original_film_title = film['title'] 
-            current_film_title_safe_for_print = safe_print_str(original_film_title)
-            
-            print(f"\nProcessing ({idx + 1}/{total_films_to_process}): '{current_film_title_safe_for_print}' (LB Year: {film['year']}) - URI: {safe_print_str(film['letterboxd_uri'])}")
-            tmdb_movie_id, selected_tmdb_movie_obj = None, None
-            
-            try:
-                search_params_year = {'api_key': TMDB_API_KEY, 'query': original_film_title}
-                if film['year']: search_params_year['year'] = film['year']
-                
-                response_year_search = requests.get(f"{TMDB_API_URL}/search/movie", params=search_params_year)
-                response_year_search.raise_for_status()
-                search_results_with_year = response_year_search.json().get('results', [])
-                time.sleep(API_CALL_DELAY)
-                selected_tmdb_movie_obj = get_closest_year_match(search_results_with_year, film['year'], original_film_title)
-                
-                if selected_tmdb_movie_obj:
-                    tmdb_movie_id = selected_tmdb_movie_obj.get('id')
-                    print(f"  -> TMDb: Tentative match (year pref): '{safe_print_str(selected_tmdb_movie_obj.get('title'))}' ({selected_tmdb_movie_obj.get('release_date')}), ID: {tmdb_movie_id}")
-                
-                if not selected_tmdb_movie_obj: 
-                    if film['year']: print(f"  -> TMDb: No strong match with year. Trying title-only for '{current_film_title_safe_for_print}'.")
-                    title_only_params = {'api_key': TMDB_API_KEY, 'query': original_film_title}
-                    response_title_only_search = requests.get(f"{TMDB_API_URL}/search/movie", params=title_only_params)
-                    response_title_only_search.raise_for_status()
-                    search_results_title_only = response_title_only_search.json().get('results', [])
-                    time.sleep(API_CALL_DELAY)
-                    selected_tmdb_movie_obj = get_closest_year_match(search_results_title_only, film['year'], original_film_title)
-                    if selected_tmdb_movie_obj:
-                        tmdb_movie_id = selected_tmdb_movie_obj.get('id')
-                        print(f"  -> TMDb: Matched (title-only, new logic): '{safe_print_str(selected_tmdb_movie_obj.get('title'))}' ({selected_tmdb_movie_obj.get('release_date')}), ID: {tmdb_movie_id}")
-                
-                if not selected_tmdb_movie_obj:
-                    print(f"  -> TMDb: No suitable match for '{current_film_title_safe_for_print}'. Deleting from DB.")
-                    delete_cursor = conn.cursor(); delete_query = sql.SQL("DELETE FROM {table} WHERE letterboxd_uri = %s;").format(table=sql.Identifier(TABLE_NAME))
-                    delete_cursor.execute(delete_query, (film['letterboxd_uri'],)); conn.commit(); deleted_count += 1
-                    print(f"  -> DB: Deleted '{current_film_title_safe_for_print}' (URI: {safe_print_str(film['letterboxd_uri'])}).")
-                    if delete_cursor and not delete_cursor.closed: delete_cursor.close()
-                    continue 
-
-                tmdb_id_to_insert = selected_tmdb_movie_obj.get('id')
-                
-                if tmdb_id_to_insert: # Collision Check
-                    collision_check_cursor = conn.cursor(cursor_factory=RealDictCursor)
-                    collision_query = sql.SQL("SELECT letterboxd_uri FROM {table} WHERE tmdb_id = %s").format(table=sql.Identifier(TABLE_NAME))
-                    collision_check_cursor.execute(collision_query, (tmdb_id_to_insert,))
-                    existing_film = collision_check_cursor.fetchone()
-                    if collision_check_cursor and not collision_check_cursor.closed: collision_check_cursor.close()
-                    if existing_film and existing_film['letterboxd_uri'] != film['letterboxd_uri']:
-                        print(f"  -> COLLISION: TMDb ID {tmdb_id_to_insert} for '{current_film_title_safe_for_print}' "
-                              f"already used by URI '{safe_print_str(existing_film['letterboxd_uri'])}'. Skipping update for current film.")
-                        skipped_due_to_collision += 1; continue
-                
-                details_url = f"{TMDB_API_URL}/movie/{tmdb_movie_id}"
-                details_params = {'api_key': TMDB_API_KEY, 'append_to_response': 'credits'}
-                response = requests.get(details_url, params=details_params)
-                response.raise_for_status()
-                movie_details = response.json()
-                time.sleep(API_CALL_DELAY)
-
-                directors_list, director_profiles_list = [], []
-                actors_list, actor_profiles_list = [], []
-
-                if 'credits' in movie_details:
-                    # Process Directors
-                    if 'crew' in movie_details['credits']:
-                        for crew_member in movie_details['credits']['crew']:
-                            if crew_member.get('job') == 'Director' and crew_member.get('name'):
-                                directors_list.append(crew_member['name'])
-                                director_person_id = crew_member.get('id')
-                                director_profile_url = None
-                                if director_person_id:
-                                    try:
-                                        print(f"    Fetching profile for director: {safe_print_str(crew_member['name'])} (ID: {director_person_id})")
-                                        person_url = f"{TMDB_API_URL}/person/{director_person_id}"
-                                        person_params = {'api_key': TMDB_API_KEY}
-                                        person_response = requests.get(person_url, params=person_params)
-                                        person_response.raise_for_status() # Raise HTTPError for bad responses (4XX or 5XX)
-                                        person_details = person_response.json()
-                                        time.sleep(API_CALL_DELAY) # Delay after each person API call
-                                        
-                                        if person_details.get('profile_path'):
-                                            director_profile_url = f"{TMDB_IMAGE_BASE_URL}{TMDB_PROFILE_SIZE}{person_details['profile_path']}"
-                                            print(f"      -> Found profile path for {safe_print_str(crew_member['name'])}")
-                                        else:
-                                            print(f"      -> No profile path for {safe_print_str(crew_member['name'])}")
-                                    except requests.exceptions.HTTPError as he:
-                                        print(f"      -> TMDb API HTTP Error fetching director {safe_print_str(crew_member['name'])} (ID: {director_person_id}): {he.response.status_code if he.response else 'Unknown'}")
-                                        time.sleep(API_CALL_DELAY) # Delay even on error
-                                    except requests.exceptions.RequestException as re:
-                                        print(f"      -> TMDb API Request Error fetching director {safe_print_str(crew_member['name'])} (ID: {director_person_id}): {re}")
-                                        time.sleep(API_CALL_DELAY) # Delay even on error
-                                    except Exception as e_person:
-                                        print(f"      -> Unexpected error fetching director profile {safe_print_str(crew_member['name'])}: {e_person}")
-                                        time.sleep(API_CALL_DELAY) # Delay even on error
-                                director_profiles_list.append(director_profile_url)
-                            # Check if we have more directors than can be stored (unlikely with TEXT[] but good to be aware)
-
-                    # Process Actors
-                    if 'cast' in movie_details['credits']:
-                        for actor_data in movie_details['credits']['cast'][:TOP_N_ACTORS]: 
-                            if actor_data.get('name'): 
-                                actors_list.append(actor_data['name'])
-                                actor_profile_path = actor_data.get('profile_path')
-                                actor_profiles_list.append(f"{TMDB_IMAGE_BASE_URL}{TMDB_PROFILE_SIZE}{actor_profile_path}" if actor_profile_path else None)
-                            else:
-                                actor_profiles_list.append(None) # Maintain parallelism
-
-                poster_path = movie_details.get('poster_path')
-                backdrop_path = movie_details.get('backdrop_path')
-                runtime = movie_details.get('runtime')
-                genres_list = [genre['name'] for genre in movie_details.get('genres', []) if genre.get('name')]
-                release_date_str = movie_details.get('release_date')
-                release_date = None
-                if release_date_str:
-                    try:
-                        datetime.strptime(release_date_str, '%Y-%m-%d'); release_date = release_date_str
-                    except ValueError: print(f"  -> TMDb: Invalid release date format '{safe_print_str(release_date_str)}'. Skipping.")
-
-                update_cursor = conn.cursor()
-                update_query = sql.SQL("""
-                    UPDATE {table} SET
-                        tmdb_id = %s, directors = %s, directors_profile_paths = %s, 
-                        actors = %s, actor_profile_paths = %s,
-                        poster_path = %s, backdrop_path = %s, runtime = %s,
-                        genres = %s, release_date = %s, updated_at = NOW()
-                    WHERE letterboxd_uri = %s;
-                """).format(table=sql.Identifier(TABLE_NAME))
-                
-                update_cursor.execute(update_query, (
-                    tmdb_movie_id, 
-                    directors_list if directors_list else None, 
-                    director_profiles_list if director_profiles_list else None,
-                    actors_list if actors_list else None, 
-                    actor_profiles_list if actor_profiles_list else None,
-                    poster_path, backdrop_path, runtime, genres_list if genres_list else None,
-                    release_date, film['letterboxd_uri']
-                ))
-                conn.commit(); updated_count +=1
-                print(f"  -> DB: Updated '{current_film_title_safe_for_print}' (TMDb ID {tmdb_movie_id}) with {len(directors_list)} Director(s) (profiles: {sum(1 for p in director_profiles_list if p)}) and {len(actors_list)} Actor(s).")
-                if update_cursor and not update_cursor.closed: update_cursor.close()
-
-            except requests.exceptions.HTTPError as e:
-                error_msg = safe_print_str(e.response.text if e.response and hasattr(e.response, 'text') else 'No response text')
-                print(f"  -> TMDb API HTTP Error for '{current_film_title_safe_for_print}': {e.response.status_code if e.response else 'N/A'} - {error_msg}")
-                if e.response and e.response.status_code == 404: print(f"  -> TMDb: Movie ID {tmdb_movie_id if tmdb_movie_id else '(unknown)'} not found (404).")
-                time.sleep(API_CALL_DELAY) 
-            except requests.exceptions.RequestException as e: print(f"  -> TMDb API Request Error for '{current_film_title_safe_for_print}': {e}"); time.sleep(API_CALL_DELAY) 
-            except psycopg2.Error as e: print(f"  -> DB Update/Delete Error for '{current_film_title_safe_for_print}': {e}"); conn.rollback() 
-            except Exception as e: print(f"  -> Unexpected error for '{current_film_title_safe_for_print}': {type(e).__name__} - {e}"); import traceback; traceback.print_exc()
-
-        print(f"\nFinished TMDb enrichment. Updated: {updated_count}, Deleted: {deleted_count}, Skipped (Collision): {skipped_due_to_collision}, Total Processed: {total_films_to_process}.")
+        def flush_pending_writes():
+            # Prepared writes must be journaled before their database commit, for resume to replay them.
+            if journal is not None: journal.commit()
+            if pending_updates:
+                update_uris = [update_row[0] for update_row in pending_updates]
+                written = flush_film_updates(conn, tmdb_index, pending_updates)
+                outcome_counts['updated'] += written
+                outcome_counts['failed'] += len(pending_updates) - written
+                if journal is not None:
+                    if written: journal.mark_written(update_uris)
+                    else: journal.mark_failed(update_uris, FAILURE_TRANSIENT, "update batch rolled back")
+            if pending_deletes:
+                deleted = flush_film_deletes(conn, tmdb_index, pending_deletes)
+                if deleted is None:
+                    outcome_counts['failed'] += len(pending_deletes)
+                    if journal is not None: journal.mark_failed(pending_deletes, FAILURE_TRANSIENT, "delete batch rolled back")
+                else:
+                    outcome_counts['deleted'] += len(pending_deletes)
+                    if journal is not None: journal.mark_written(pending_deletes)
+            flush_enrichment_attempts(conn, pending_attempts)
+            pending_updates.clear(); pending_deletes.clear(); pending_attempts.clear()
+
+        finished_uris = []
+        resumed_run_id = journal.latest_unfinished_run() if journal is not None and resume else None
+        if resumed_run_id:
+            journal.resume_run(resumed_run_id)
+            replayed = journal.pending_writes()
+            LOG.info(f"Resuming enrichment run {resumed_run_id}: replaying {len(replayed)} prepared write(s) without TMDb calls.")
+            for letterboxd_uri, outcome, write_payload in replayed:
+                if outcome == OUTCOME_DELETED:
+                    pending_deletes.append(letterboxd_uri)
+                elif tmdb_index.claim(write_payload[1], letterboxd_uri) is None:
+                    pending_updates.append(tuple(write_payload))
+                else:
+                    journal.record(letterboxd_uri, OUTCOME_COLLISION)
+                    outcome_counts['collision'] += 1
+            flush_pending_writes()
+            finished_uris = list(journal.finished_uris()) # Excluded by the backlog query itself
+
+        with conn.cursor(cursor_factory=RealDictCursor) as count_cursor:
+            RUN_METRICS.increment("db_statements_total", operation="select")
+            count_cursor.execute(count_query, (finished_uris,))
+            total_films_to_process = count_cursor.fetchone()['backlog_size']
+        if journal is not None and not resumed_run_id:
+            if resume: LOG.info("No unfinished enrichment run to resume; starting a new run.")
+            LOG.info(f"Started enrichment run {journal.start_run(total_films_to_process)}.")
+        LOG.info(f"Found {total_films_to_process} films to enrich/update with TMDb data (including director profiles).")
+
+        if total_films_to_process:
+            # Named (server-side) cursor on a connection of its own: rows are fetched ENRICH_SELECT_FETCH_SIZE at a
+            # time as the pipeline consumes them, within that connection's one open transaction. The write stage's
+            # per-batch commits on conn do not touch it, so it needs no WITH HOLD, which would make PostgreSQL
+            # materialize the whole backlog at the first commit before anything reached the pipeline.
+            read_conn = open_read_connection(conn)
+            cursor = read_conn.cursor(name="enrichment_backlog", cursor_factory=RealDictCursor)
+            RUN_METRICS.increment("db_statements_total", operation="declare_cursor")
+            cursor.execute(select_query, (finished_uris,))
+
+            LOG.info(f"Enriching with {max_workers} search and {max_workers} details worker(s), queues of {queue_size}, "
+                     f"rate limited to {TMDB_REQUESTS_PER_SECOND} TMDb requests/second.")
+            write_queue, stop_event, stage_errors = start_enrichment_pipeline(
+                cursor, tmdb_index, total_films_to_process, max_workers, queue_size)
+            processed_count = 0
+            last_flush = time.monotonic()
+            while True:
+                try:
+                    item = write_queue.get(timeout=flush_interval)
+                except queue.Empty:
+                    item = None
+                # A failed stage stops the pipeline, and the coordinator then gives up on sending _END_OF_STAGE.
+                if item is _END_OF_STAGE or (item is None and stop_event.is_set()):
+                    break
+                if item is not None:
+                    processed_count += 1
+                    if LOG.enabled_for(INFO):
+                        LOG.log(INFO, item.log_lines[0], detail=item.log_lines[1:], letterboxd_uri=item.letterboxd_uri,
+                                outcome=item.outcome, tmdb_id=item.tmdb_id)
+                    LOG.progress(processed_count, total_films_to_process, updated=outcome_counts['updated'] + len(pending_updates),
+                                 deleted=outcome_counts['deleted'] + len(pending_deletes),
+                                 collision=outcome_counts['collision'], failed=outcome_counts['failed'])
+                    if item.outcome == 'updated':
+                        pending_updates.append(item.write)
+                        if journal is not None: journal.record(item.letterboxd_uri, OUTCOME_MATCHED, write_payload=item.write)
+                    elif item.outcome == 'deleted':
+                        pending_deletes.append(item.write)
+                        if journal is not None: journal.record(item.letterboxd_uri, OUTCOME_DELETED)
+                    else:
+                        outcome_counts[item.outcome] += 1
+                        pending_attempts.append(item.letterboxd_uri)
+                        if journal is not None:
+                            if item.outcome == 'collision': journal.record(item.letterboxd_uri, OUTCOME_COLLISION)
+                            else: journal.record(item.letterboxd_uri, OUTCOME_FAILED, failure_kind=item.write)
+                # Flush on a full batch, or on a time budget so results land in the DB while a slow backlog streams.
+                pending_count = len(pending_updates) + len(pending_deletes) + len(pending_attempts)
+                if pending_count >= batch_size or (pending_count and time.monotonic() - last_flush >= flush_interval):
+                    flush_pending_writes()
+                    last_flush = time.monotonic()
+            flush_pending_writes()
+            LOG.progress(processed_count, total_films_to_process, force=True, updated=outcome_counts['updated'],
+                         deleted=outcome_counts['deleted'], collision=outcome_counts['collision'], failed=outcome_counts['failed'])
+            LOG.end_progress()
+            if stage_errors:
+                raise stage_errors[0]
+        else:
+            LOG.info("No films found requiring TMDb data enrichment.")
+
+        if journal is not None: journal.finish_run()
+        LOG.info(f"\nFinished TMDb enrichment. Updated: {outcome_counts['updated']}, Deleted: {outcome_counts['deleted']}, "
+                 f"Skipped (Collision): {outcome_counts['collision']}, Failed: {outcome_counts['failed']}, Total Processed: {total_films_to_process}.")
 
     except psycopg2.Error as e:
-        print(f"DB error during film selection: {e}")
-        if hasattr(e, 'diag') and e.diag.message_primary: print(f"PostgreSQL Primary Error: {e.diag.message_primary}")
+        LOG.error(f"DB error during film selection: {e}")
+        if hasattr(e, 'diag') and e.diag.message_primary: LOG.error(f"PostgreSQL Primary Error: {e.diag.message_primary}")
         conn.rollback() 
     finally:
-        if cursor and not cursor.closed : cursor.close()
+        if stop_event is not None: stop_event.set() # Unblocks the stage threads if the write stage bailed out early
+        if read_conn is not None and not read_conn.closed:
+            read_conn.close() # Ends its read-only transaction, and the backlog cursor with it
+
+
+def backfill_film_credits(conn, max_workers=None, batch_size=None):
+    """
+    One-time migration filling people/film_credits for films enriched before those tables existed.
+    The directors/actors arrays hold names and image URLs but no TMDb person ids, so each film's credits are
+    re-read from its /movie/{id} details; for films enriched earlier the response cache serves these without
+    network calls. Films that already have credits are skipped, so an interrupted backfill just runs again.
+    Credits are written in batches of batch_size films (default ENRICH_WRITE_BATCH_SIZE), one commit each.
+    Returns the number of films backfilled.
+    """
+    if max_workers is None: max_workers = ENRICH_WORKERS
+    if batch_size is None: batch_size = ENRICH_WRITE_BATCH_SIZE
+
+    with conn.cursor() as cursor:
+        RUN_METRICS.increment("db_statements_total", operation="select")
+        cursor.execute(sql.SQL("""
+            SELECT letterboxd_uri, tmdb_id FROM {table} AS f
+            WHERE tmdb_id IS NOT NULL AND (directors IS NOT NULL OR actors IS NOT NULL)
+                AND NOT EXISTS (SELECT 1 FROM film_credits AS c WHERE c.film_id = f.id)
+            ORDER BY id;
+        """).format(table=sql.Identifier(TABLE_NAME)))
+        films = cursor.fetchall()
+    conn.commit()
+    if not films:
+        LOG.info("No films need a credits backfill.")
+        return 0
+    LOG.info(f"Backfilling credits for {len(films)} film(s) with {max_workers} worker(s).")
+
+    def fetch_credits(film):
+        letterboxd_uri, tmdb_id = film
+        try:
+            with RUN_METRICS.time_stage(STAGE_DETAILS):
+                movie_details = TMDB_CLIENT.get_json(f"/movie/{tmdb_id}", {'api_key': TMDB_API_KEY, 'append_to_response': 'credits'})
+            lookup_messages = []
+            return letterboxd_uri, extract_credits(movie_details, lookup_messages.append)[4], None
+        except requests.exceptions.RequestException as e:
+            return letterboxd_uri, None, f"TMDb ID {tmdb_id}: {e}"
+
+    backfilled, failed, pending = 0, 0, []
+
+    def flush_pending_credits():
+        nonlocal backfilled, failed
+        if not pending:
+            return
+        try:
+            with RUN_METRICS.time_stage(STAGE_DB_WRITE):
+                with conn.cursor() as cursor:
+                    write_film_credits(cursor, pending)
+                conn.commit()
+            RUN_METRICS.increment("db_commits_total")
+            backfilled += len(pending)
+        except psycopg2.Error as e:
+            conn.rollback()
+            failed += len(pending)
+            LOG.warning(f"  -> DB: Credits batch of {len(pending)} film(s) failed and was rolled back: {e}")
+        pending.clear()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for processed_count, (letterboxd_uri, credits, error) in enumerate(executor.map(fetch_credits, films), 1):
+            if error:
+                failed += 1
+                LOG.warning(f"  -> Could not fetch credits for '{letterboxd_uri}': {error}")
+            else:
+                pending.append((letterboxd_uri, credits))
+                if len(pending) >= batch_size: flush_pending_credits()
+            LOG.progress(processed_count, len(films), backfilled=backfilled, failed=failed)
+    flush_pending_credits()
+    LOG.progress(len(films), len(films), force=True, backfilled=backfilled, failed=failed)
+    LOG.end_progress()
+    LOG.info(f"Finished credits backfill. Films backfilled: {backfilled}, Failed: {failed}.")
+    return backfilled
 
 
 # --- Main Execution ---
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Load watched.csv and enrich films with TMDb data.")
+    arg_parser.add_argument("--resume", action="store_true",
+                            help="Continue the last unfinished enrichment run, skipping films it already finished.")
+    arg_parser.add_argument("--metrics-json", metavar="PATH", help="Write run counters and per-stage latency histograms to this JSON file.")
+    arg_parser.add_argument("--metrics-prometheus", metavar="PATH", help="Also write the run metrics in Prometheus text format.")
+    add_logging_arguments(arg_parser)
+    cli_args = arg_parser.parse_args()
+    configure_from_args(cli_args)
     db_connection = None
+    enrichment_journal = None
     if sys.platform == "win32":
         try:
             sys.stdout.reconfigure(encoding='utf-8', errors='replace')
             sys.stderr.reconfigure(encoding='utf-8', errors='replace')
-            print("Attempted to reconfigure stdout/stderr to UTF-8.")
-        except Exception as e: print(f"Note: Could not reconfigure stdout/stderr: {e}")
+            LOG.info("Attempted to reconfigure stdout/stderr to UTF-8.")
+        except Exception as e: LOG.warning(f"Note: Could not reconfigure stdout/stderr: {e}")
         try:
-            os.system("chcp 65001 > nul"); print("Attempted chcp 65001.")
-        except Exception as e: print(f"Note: chcp 65001 failed: {e}")
+            os.system("chcp 65001 > nul"); LOG.info("Attempted chcp 65001.")
+        except Exception as e: LOG.warning(f"Note: chcp 65001 failed: {e}")
     try:
         db_connection = connect_db()
         if db_connection:
-            print("\n--- Ensuring Table Schema ---")
+            LOG.info("\n--- Ensuring Table Schema ---")
             create_table_if_not_exists(db_connection)
-            print("--- Table Schema Checked ---\n")
-            print("\n--- Starting CSV Processing (Optional) ---")
-            # process_csv_and_insert_data(db_connection, CSV_FILE_PATH) # Uncomment if needed for initial load or update from CSV
-            print("--- Finished CSV Processing (or skipped) ---\n")
-            print("--- Starting TMDb Enrichment ---")
-            enrich_films_with_tmdb_data(db_connection)
-            print("--- Finished TMDb Enrichment ---")
+            LOG.info("--- Table Schema Checked ---\n")
+            LOG.info("\n--- Starting CSV Processing (Optional) ---")
+            # bulk_load_watched_csv(db_connection, CSV_FILE_PATH) # Uncomment if needed for initial load or update from CSV
+            # (process_csv_and_insert_data is the slower row-by-row equivalent)
+            LOG.info("--- Finished CSV Processing (or skipped) ---\n")
+            LOG.info("--- Starting TMDb Enrichment ---")
+            enrichment_journal = EnrichmentJournal(os.getenv("ENRICHMENT_JOURNAL_PATH") or DEFAULT_JOURNAL_PATH)
+            enrich_films_with_tmdb_data(db_connection, journal=enrichment_journal, resume=cli_args.resume)
+            LOG.info("--- Finished TMDb Enrichment ---")
+            refresh_dashboard_views(db_connection, ("films", "film_credits"))
     finally:
         if db_connection and not db_connection.closed:
             db_connection.close()
-            print("\nPostgreSQL connection closed.")
\ No newline at end of file
+            LOG.info("\nPostgreSQL connection closed.")
+        LOG.info(TMDB_CLIENT.summary())
+        if TMDB_CACHE is not None: LOG.info(TMDB_CACHE.summary())
+        LOG.info(RUN_METRICS.summary())
+        RUN_METRICS.write_reports(cli_args.metrics_json, cli_args.metrics_prometheus)
+        TMDB_CLIENT.close()
+        if TMDB_CATALOG is not None: TMDB_CATALOG.close()
+        if enrichment_journal is not None: enrichment_journal.close()
+        LOG.close()
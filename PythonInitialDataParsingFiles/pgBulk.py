@@ -0,0 +1,86 @@
+import io
+
+from psycopg2 import sql
+
+from runLogger import LOG, WARNING
+from runMetrics import RUN_METRICS
+
+# Characters handed to the server per read while rows stream in with COPY.
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+def copy_text_value(value):
+    """Encodes one value for PostgreSQL's COPY text format (None becomes \\N; backslash, tab and newlines are escaped)."""
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class _CopyRowsReader(io.TextIOBase):
+    """
+    Read-only text file over rows in COPY text format, formatted only as copy_expert reads it, so at most
+    about one chunk of the payload is in memory at a time rather than all of it.
+    """
+
+    def __init__(self, rows):
+        self._lines = ("\t".join(copy_text_value(value) for value in row) + "\n" for row in rows)
+        self._pending = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data, self._pending = self._pending + "".join(self._lines), ""
+            return data
+        parts, length = [self._pending], len(self._pending)
+        while length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        data = "".join(parts)
+        self._pending = data[size:]
+        return data[:size]
+
+
+def copy_rows_to_staging(cursor, staging_table, columns, rows):
+    """
+    (Re)creates a temporary staging table, dropped on commit, and streams rows into it with COPY FROM STDIN.
+    `columns` is a list of (name, sql_type) pairs; None values are loaded as NULL. Rows are formatted as
+    the server reads them, COPY_CHUNK_SIZE characters at a time, so `rows` may also be a generator.
+    """
+    RUN_METRICS.increment("db_statements_total", operation="create_staging")
+    cursor.execute(sql.SQL("DROP TABLE IF EXISTS {staging}; CREATE TEMP TABLE {staging} ({columns}) ON COMMIT DROP;").format(
+        staging=sql.Identifier(staging_table),
+        columns=sql.SQL(", ").join(sql.SQL("{} {}").format(sql.Identifier(name), sql.SQL(sql_type)) for name, sql_type in columns)))
+    RUN_METRICS.increment("db_statements_total", operation="copy")
+    cursor.copy_expert(sql.SQL("COPY {staging} FROM STDIN").format(
+        staging=sql.Identifier(staging_table)).as_string(cursor), _CopyRowsReader(rows), size=COPY_CHUNK_SIZE)
+
+
+def load_film_id_map(conn):
+    """
+    Loads the whole (title, year) -> films.id mapping in a single query.
+    Mirrors the old per-row `WHERE title = %s AND year = %s` lookup: films without a year
+    are never matched, and for duplicate (title, year) pairs the lowest id wins.
+    """
+    film_id_map = {}
+    RUN_METRICS.increment("db_statements_total", operation="select")
+    with conn.cursor() as cur:
+        cur.execute("SELECT title, year, id FROM films WHERE title IS NOT NULL AND year IS NOT NULL ORDER BY id;")
+        for title, year, film_id in cur:
+            film_id_map.setdefault((title, year), film_id)
+    return film_id_map
+
+
+def report_unresolved_films(unresolved, entry_label, max_listed=20):
+    """Logs one batched warning listing (title, year_str) pairs whose films were not found in the 'films' table."""
+    if not unresolved:
+        return
+    detail = [f"  - '{title}' (Year: {year_str if year_str else 'N/A'})" for title, year_str in unresolved[:max_listed]]
+    if len(unresolved) > max_listed:
+        detail.append(f"  ... and {len(unresolved) - max_listed} more.")
+    LOG.log(WARNING, f"{len(unresolved)} {entry_label} were skipped because their films were not found in the 'films' table:",
+            detail=detail, unresolved_count=len(unresolved))
@@ -0,0 +1,182 @@
+import json
+import os
+import sys
+import threading
+import time
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+# Console modes: "text" (human-readable lines), "json" (one JSON object per line),
+# "progress" (warnings and errors plus a live progress bar on stderr) and "quiet" (warnings and errors only).
+MODES = ("text", "json", "progress", "quiet")
+
+# Minimum seconds between progress bar redraws.
+PROGRESS_REDRAW_SECONDS = 0.2
+PROGRESS_BAR_WIDTH = 30
+
+
+def _replace_unencodable(stream):
+    """
+    Makes `stream` substitute characters its encoding cannot represent, once, instead of transcoding
+    every message. Returns a per-line encoder fallback for streams that cannot be reconfigured.
+    """
+    try:
+        stream.reconfigure(errors="replace")
+        return None
+    except (AttributeError, ValueError, OSError):
+        pass
+    encoding = getattr(stream, "encoding", None) or "utf-8"
+    return lambda text: text.encode(encoding, errors="replace").decode(encoding, errors="replace")
+
+
+class RunLogger:
+    """
+    Leveled logger for the ingestion scripts. The console encoding is resolved once per stream, not per
+    message; output can be plain text, JSON lines, a progress bar, or quiet, and every event can also
+    be appended to a JSON-lines file (json_path) for machine parsing. Safe to share between threads.
+    """
+
+    def __init__(self, level=INFO, mode="text", json_path=None, stream=None, progress_stream=None):
+        self._lock = threading.Lock()
+        self._json_file = None
+        self._progress_drawn = False
+        self._last_progress_draw = 0.0
+        self.configure(level=level, mode=mode, json_path=json_path, stream=stream, progress_stream=progress_stream)
+
+    @classmethod
+    def from_env(cls):
+        """Reads LOG_LEVEL (debug/info/warning/error), LOG_MODE (text/json/progress/quiet) and LOG_JSON_PATH."""
+        return cls(level=os.getenv("LOG_LEVEL", "info"), mode=os.getenv("LOG_MODE", "text"), json_path=os.getenv("LOG_JSON_PATH"))
+
+    def configure(self, level=None, mode=None, json_path=None, stream=None, progress_stream=None):
+        """Changes any of the logger's settings; arguments left as None keep their current value."""
+        with self._lock:
+            if level is not None:
+                self.level = LEVELS[level.lower()] if isinstance(level, str) else level
+            if mode is not None:
+                if mode not in MODES:
+                    raise ValueError(f"Unknown log mode '{mode}'; expected one of {', '.join(MODES)}.")
+                self.mode = mode
+            if stream is not None or not hasattr(self, "stream"):
+                self.stream = stream or sys.stdout
+                self._encode = _replace_unencodable(self.stream)
+            if progress_stream is not None or not hasattr(self, "progress_stream"):
+                self.progress_stream = progress_stream or sys.stderr
+            if json_path is not None:
+                if self._json_file is not None:
+                    self._json_file.close()
+                self._json_file = open(json_path, "a", encoding="utf-8") if json_path else None
+            # Levels below these thresholds are dropped without formatting or taking the lock.
+            self._console_threshold = max(self.level, WARNING) if self.mode in ("progress", "quiet") else self.level
+            self._file_threshold = self.level if self._json_file is not None else ERROR + 1
+
+    def enabled_for(self, level):
+        """True if an event at `level` would be written anywhere; lets callers skip building expensive messages."""
+        return level >= self._console_threshold or level >= self._file_threshold
+
+    def _json_line(self, level, message, detail, fields):
+        record = {"ts": round(time.time(), 3), "level": LEVEL_NAMES.get(level, str(level)), "msg": message.strip()}
+        if detail:
+            record["detail"] = detail
+        record.update(fields)
+        return json.dumps(record, ensure_ascii=False, default=str)
+
+    def log(self, level, message, detail=None, **fields):
+        """
+        Writes one event. `detail` is an optional list of extra lines (shown below the message in text mode,
+        kept as a list in JSON); keyword fields become JSON keys and are not shown in text mode.
+        """
+        to_console = level >= self._console_threshold
+        to_file = level >= self._file_threshold
+        if not (to_console or to_file):
+            return
+        json_line = self._json_line(level, message, detail, fields) if (to_file or self.mode == "json") else None
+        with self._lock:
+            if to_console:
+                if self.mode == "json":
+                    text = json_line
+                else:
+                    text = message if not detail else "\n".join([message, *detail])
+                    if self._encode is not None:
+                        text = self._encode(text)
+                if self._progress_drawn:
+                    self._clear_progress()
+                self.stream.write(text + "\n")
+            if to_file:
+                self._json_file.write(json_line + "\n")
+
+    def debug(self, message, **fields):
+        self.log(DEBUG, message, **fields)
+
+    def info(self, message, **fields):
+        self.log(INFO, message, **fields)
+
+    def warning(self, message, **fields):
+        self.log(WARNING, message, **fields)
+
+    def error(self, message, **fields):
+        self.log(ERROR, message, **fields)
+
+    def _clear_progress(self):
+        if self._progress_drawn:
+            self.progress_stream.write("\r\033[K")
+            self._progress_drawn = False
+
+    def progress(self, done, total, force=False, **counts):
+        """Redraws the progress bar (progress mode only), at most every PROGRESS_REDRAW_SECONDS unless forced."""
+        if self.mode != "progress":
+            return
+        now = time.monotonic()
+        if not force and now - self._last_progress_draw < PROGRESS_REDRAW_SECONDS:
+            return
+        fraction = done / total if total else 1.0
+        filled = int(PROGRESS_BAR_WIDTH * fraction)
+        suffix = "  ".join(f"{name} {value}" for name, value in counts.items())
+        with self._lock:
+            self._last_progress_draw = now
+            self.progress_stream.write(f"\r[{'#' * filled}{'.' * (PROGRESS_BAR_WIDTH - filled)}] {done}/{total} {fraction:6.1%}  {suffix}\033[K")
+            self.progress_stream.flush()
+            self._progress_drawn = True
+
+    def end_progress(self):
+        """Leaves the last progress bar on screen and moves to a new line."""
+        with self._lock:
+            if self._progress_drawn:
+                self.progress_stream.write("\n")
+                self._progress_drawn = False
+
+    def flush(self):
+        with self._lock:
+            self.stream.flush()
+            if self._json_file is not None:
+                self._json_file.flush()
+
+    def close(self):
+        self.end_progress()
+        self.flush()
+        with self._lock:
+            if self._json_file is not None:
+                self._json_file.close()
+                self._json_file = None
+
+
+def add_logging_arguments(arg_parser):
+    """Adds the shared --log-level/--quiet/--progress/--log-format/--log-json options to a script's parser."""
+    arg_parser.add_argument("--log-level", choices=sorted(LEVELS, key=LEVELS.get), help="Minimum level logged (default: LOG_LEVEL or info).")
+    console = arg_parser.add_mutually_exclusive_group()
+    console.add_argument("--quiet", action="store_const", const="quiet", dest="log_mode", help="Only print warnings and errors.")
+    console.add_argument("--progress", action="store_const", const="progress", dest="log_mode",
+                         help="Show a progress bar instead of per-item output (warnings and errors are still printed).")
+    console.add_argument("--log-format", choices=("text", "json"), dest="log_mode", help="Console output format (default: LOG_MODE or text).")
+    arg_parser.add_argument("--log-json", metavar="PATH", help="Also append every log event to this JSON-lines file.")
+
+
+def configure_from_args(args):
+    """Applies the options added by add_logging_arguments to the shared LOG."""
+    LOG.configure(level=args.log_level, mode=args.log_mode, json_path=args.log_json)
+
+
+# Process-wide logger shared by the ingestion scripts, configured from the environment and their CLI options.
+LOG = RunLogger.from_env()
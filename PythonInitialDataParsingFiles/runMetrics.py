@@ -0,0 +1,192 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from runLogger import LOG
+
+# Stage names used for the latency histograms.
+STAGE_SEARCH = "search"      # TMDb /search/movie calls (or the offline catalog lookup)
+STAGE_DETAILS = "details"    # TMDb /movie/{id} calls
+STAGE_PERSON = "person"      # TMDb /person/{id} fallback lookups
+STAGE_MATCH = "match"        # get_closest_year_match over a page of search results
+STAGE_DB_WRITE = "db_write"  # one batched write statement (or COPY + upsert) and its commit
+STAGE_DASHBOARD_REFRESH = "dashboard_refresh"  # creating or refreshing one dashboard materialized view
+
+# Histogram bucket upper bounds in seconds, Prometheus-style (each bucket counts observations <= bound).
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Prefix of every metric name in the Prometheus output.
+PROMETHEUS_NAMESPACE = "letterboxd_ingest"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with exact count, sum, min and max. Not thread-safe on its own."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.bounds) + 1) # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds):
+        index = 0
+        while index < len(self.bounds) and seconds > self.bounds[index]:
+            index += 1
+        self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimates the q-quantile by linear interpolation inside the bucket that holds it."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * ((rank - seen) / bucket_count)
+                return min(max(estimate, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+    def to_dict(self):
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(self.bounds + ("+Inf",), self.bucket_counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum_seconds": self.sum, "min_seconds": self.min, "max_seconds": self.max,
+                "mean_seconds": self.sum / self.count if self.count else None,
+                "p50_seconds": self.quantile(0.5), "p90_seconds": self.quantile(0.9), "p99_seconds": self.quantile(0.99),
+                "buckets": buckets}
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class RunMetrics:
+    """
+    Counters and per-stage latency histograms for one ingestion/enrichment run.
+    Counters are keyed by name plus optional labels, e.g. increment("tmdb_api_calls_total", endpoint="search").
+    Reports are written as JSON (write_json) or Prometheus text exposition format (write_prometheus).
+    Safe to share between threads.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time_stage(self, stage):
+        """Context manager observing the duration of its block under `stage` (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def to_dict(self):
+        """Returns the report as plain JSON-serializable data."""
+        with self._lock:
+            counters = {}
+            for (name, label_key), value in sorted(self._counters.items()):
+                counters.setdefault(name, {})[",".join(f"{k}={v}" for k, v in label_key)] = value
+            histograms = {stage: histogram.to_dict() for stage, histogram in sorted(self._histograms.items())}
+        return {"started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "wall_seconds": time.perf_counter() - self._started,
+                "counters": counters, "stage_latency": histograms}
+
+    def to_prometheus(self):
+        """Renders the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counter_names = sorted({name for name, _ in self._counters})
+            for name in counter_names:
+                metric = f"{PROMETHEUS_NAMESPACE}_{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for (counter_name, label_key), value in sorted(self._counters.items()):
+                    if counter_name == name:
+                        lines.append(f"{metric}{_format_labels(label_key)} {value}")
+            if self._histograms:
+                metric = f"{PROMETHEUS_NAMESPACE}_stage_duration_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for stage, histogram in sorted(self._histograms.items()):
+                    stage_label = (("stage", stage),)
+                    cumulative = 0
+                    for bound, bucket_count in zip(histogram.bounds + ("+Inf",), histogram.bucket_counts):
+                        cumulative += bucket_count
+                        lines.append(f"{metric}_bucket{_format_labels(stage_label, (('le', bound),))} {cumulative}")
+                    lines.append(f"{metric}_sum{_format_labels(stage_label)} {histogram.sum}")
+                    lines.append(f"{metric}_count{_format_labels(stage_label)} {histogram.count}")
+            lines.append(f"# TYPE {PROMETHEUS_NAMESPACE}_run_wall_seconds gauge")
+            lines.append(f"{PROMETHEUS_NAMESPACE}_run_wall_seconds {time.perf_counter() - self._started}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as report_file:
+            json.dump(self.to_dict(), report_file, indent=2)
+
+    def write_prometheus(self, path):
+        with open(path, "w", encoding="utf-8") as report_file:
+            report_file.write(self.to_prometheus())
+
+    def summary(self):
+        """Returns a short human-readable breakdown of where the run spent its time."""
+        report = self.to_dict()
+        lines = [f"Run metrics ({report['wall_seconds']:.1f}s wall):"]
+        for stage, histogram in report["stage_latency"].items():
+            lines.append(f"  {stage:<9} n={histogram['count']:<7} total {histogram['sum_seconds']:8.2f}s  "
+                         f"p50 {histogram['p50_seconds'] * 1000:8.1f} ms  p90 {histogram['p90_seconds'] * 1000:8.1f} ms  "
+                         f"p99 {histogram['p99_seconds'] * 1000:8.1f} ms  max {histogram['max_seconds'] * 1000:8.1f} ms")
+        for name, values in report["counters"].items():
+            lines.append(f"  {name}: " + ", ".join(f"{labels or 'total'}={value}" for labels, value in values.items()))
+        return "\n".join(lines)
+
+    def write_reports(self, json_path=None, prometheus_path=None):
+        """Writes whichever reports were requested and says where they went."""
+        if json_path:
+            self.write_json(json_path)
+            LOG.info(f"Run metrics written to '{json_path}'.")
+        if prometheus_path:
+            self.write_prometheus(prometheus_path)
+            LOG.info(f"Prometheus metrics written to '{prometheus_path}'.")
+
+
+# Process-wide registry shared by the ingestion scripts and the TMDb client they configure,
+# so a single report covers a whole run (e.g. ingestLetterboxdExport.py loading all three CSVs).
+RUN_METRICS = RunMetrics()
@@ -0,0 +1,252 @@
+import psycopg2
+from psycopg2 import sql
+
+from runLogger import LOG
+from runMetrics import RUN_METRICS
+
+# Session-level advisory lock key held while migrations run, so two ingestion scripts starting
+# together do not race on the same version (any constant unique to this application works).
+MIGRATION_LOCK_KEY = 0x4C42584D
+
+
+class Migration:
+    """
+    One versioned schema change. `statements` run first, in a single transaction; `index` is
+    (name, table, column names, optional WHERE predicate) and is built afterwards with CREATE INDEX CONCURRENTLY,
+    which cannot run inside a transaction but does not block writers on large tables. The version is recorded
+    only once both succeeded, so statements must be safe to repeat (IF NOT EXISTS) after a failed index build.
+    `requires` lists tables (or "table.column"s) that must exist first: the loaders create their own tables, so a
+    migration for a table that is not there yet stays pending until a run that has it, while later versions whose
+    tables do exist are applied meanwhile (a films-only database still gets the films migrations).
+    """
+    __slots__ = ("version", "description", "requires", "statements", "index")
+
+    def __init__(self, version, description, requires=(), statements=(), index=None):
+        self.version = version
+        self.description = description
+        self.requires = tuple(requires)
+        self.statements = tuple(statements)
+        self.index = index
+
+
+# Migration 5, also run by ensure_enrichment_status when the films loader creates its table.
+_ENRICHMENT_STATUS_STATEMENTS = ("""
+    ALTER TABLE films
+        ADD COLUMN IF NOT EXISTS enrichment_status TEXT NOT NULL DEFAULT 'pending'
+            CHECK (enrichment_status IN ('pending', 'done')),
+        ADD COLUMN IF NOT EXISTS enrichment_attempts INTEGER NOT NULL DEFAULT 0,
+        ADD COLUMN IF NOT EXISTS enrichment_attempted_at TIMESTAMP WITH TIME ZONE;
+""", """
+    UPDATE films SET enrichment_status = 'done'
+    WHERE enrichment_status = 'pending'
+        AND tmdb_id IS NOT NULL AND poster_path IS NOT NULL AND actors IS NOT NULL AND directors IS NOT NULL
+        AND actor_profile_paths IS NOT NULL AND directors_profile_paths IS NOT NULL;
+""")
+
+
+# Applied in version order; append new versions, never edit or renumber applied ones.
+MIGRATIONS = (
+    # pgBulk.load_film_id_map and every (title, year) film lookup
+    Migration(1, "index films (title, year)", requires=("films",),
+              index=("films_title_year_idx", "films", ("title", "year"), None)),
+    # Enrichment collision checks and the ManualDB tools' TMDb id lookups. Tables created by
+    # create_table_if_not_exists already have this through tmdb_id UNIQUE, in which case it is skipped.
+    Migration(2, "index films (tmdb_id)", requires=("films",),
+              index=("films_tmdb_id_idx", "films", ("tmdb_id",), None)),
+    # Joins from films to their diary entries, rewatch counts, and ON DELETE CASCADE from films
+    Migration(3, "index diary_entries (film_id)", requires=("diary_entries",),
+              index=("diary_entries_film_id_idx", "diary_entries", ("film_id",), None)),
+    Migration(4, "index ratings_entries (film_id)", requires=("ratings_entries",),
+              index=("ratings_entries_film_id_idx", "ratings_entries", ("film_id",), None)),
+    # Explicit enrichment state replacing the six-way IS NULL backlog predicate; films that already have all
+    # of those columns start out 'done'. The partial index holds only the backlog, in the order it is read.
+    Migration(5, "films enrichment status with a partial index on pending films",
+              requires=("films.directors_profile_paths", "films.actor_profile_paths"),
+              statements=_ENRICHMENT_STATUS_STATEMENTS,
+              index=("films_enrichment_pending_idx", "films", ("id",), "enrichment_status = 'pending'")),
+    # The director/actor dashboard views now aggregate film_credits/people instead of unnesting the films
+    # arrays; dropping the old definitions makes the next refresh_dashboard_views recreate them.
+    Migration(6, "rebuild the director/actor dashboard views from film_credits",
+              statements=("DROP MATERIALIZED VIEW IF EXISTS dashboard_top_directors, dashboard_top_actors;",)),
+    # Those views now also count films without credits through their arrays, keyed by person_key.
+    Migration(7, "rebuild the director/actor dashboard views with the films array fallback",
+              statements=("DROP MATERIALIZED VIEW IF EXISTS dashboard_top_directors, dashboard_top_actors;",)),
+)
+
+
+def _has_enrichment_status(cursor):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'films' AND column_name = 'enrichment_status';
+    """)
+    return cursor.fetchone() is not None
+
+
+def ensure_enrichment_status(cursor):
+    """
+    Adds the enrichment status columns of migration 5, and the partial index on pending films, if films lacks
+    them. The films loader calls this when it creates its table, so the enrichment backlog never waits on
+    migrations for other tables; migration 5 then only finds everything in place. Does not commit.
+    Returns True if the columns were added.
+    """
+    if _has_enrichment_status(cursor):
+        return False
+    for statement in _ENRICHMENT_STATUS_STATEMENTS:
+        cursor.execute(statement)
+        RUN_METRICS.increment("db_statements_total", operation="migration")
+    cursor.execute("CREATE INDEX IF NOT EXISTS films_enrichment_pending_idx ON films (id) WHERE enrichment_status = 'pending'")
+    return True
+
+
+def mark_enrichment_done(cursor, film_ids):
+    """
+    Marks films written from TMDb outside the enrichment script (the ManualDB tools) as enriched, so the
+    pending backlog of migration 5 does not pick them up and re-match them. A no-op (returns 0) while
+    migration 5 has not added the column yet. Does not commit. Returns the number of films marked.
+    """
+    if not film_ids or not _has_enrichment_status(cursor):
+        return 0
+    RUN_METRICS.increment("db_statements_total", operation="update")
+    cursor.execute("""
+        UPDATE films SET enrichment_status = 'done', enrichment_attempted_at = NOW()
+        WHERE id = ANY(%s);
+    """, (list(film_ids),))
+    return cursor.rowcount
+
+
+def mark_enrichment_pending(cursor, film_ids):
+    """
+    Puts films back in the enrichment backlog, with a fresh attempt count, so the next enrichment run matches
+    them again. Like mark_enrichment_done, a no-op (returns 0) without the column. Does not commit.
+    """
+    if not film_ids or not _has_enrichment_status(cursor):
+        return 0
+    RUN_METRICS.increment("db_statements_total", operation="update")
+    cursor.execute("""
+        UPDATE films SET enrichment_status = 'pending', enrichment_attempts = 0
+        WHERE id = ANY(%s);
+    """, (list(film_ids),))
+    return cursor.rowcount
+
+
+def _index_columns(cursor, table):
+    """Returns {index name: [key column names]} for the valid, non-partial indexes of table."""
+    cursor.execute("""
+        SELECT c.relname, array_agg(a.attname ORDER BY k.position)
+        FROM pg_index AS i
+        JOIN pg_class AS c ON c.oid = i.indexrelid
+        CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, position)
+        JOIN pg_attribute AS a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+        WHERE i.indrelid = to_regclass(%s) AND i.indisvalid AND i.indpred IS NULL
+        GROUP BY c.relname;
+    """, (table,))
+    return dict(cursor.fetchall())
+
+
+def _create_index_concurrently(conn, name, table, columns, predicate):
+    """
+    Builds one index outside a transaction. An existing non-partial index that already leads with the same
+    columns makes it redundant, and an invalid leftover from an interrupted build is dropped first.
+    Returns the name of the index serving the lookup.
+    """
+    with conn.cursor() as cursor:
+        if predicate is None:
+            for existing_name, existing_columns in _index_columns(cursor, table).items():
+                if existing_columns[:len(columns)] == list(columns):
+                    return existing_name
+        cursor.execute("SELECT i.indisvalid FROM pg_index AS i WHERE i.indexrelid = to_regclass(%s)", (name,))
+        existing = cursor.fetchone()
+    conn.commit()
+
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            if existing is not None and not existing[0]:
+                LOG.warning(f"Dropping invalid index '{name}' left by an interrupted build.")
+                cursor.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {index}").format(index=sql.Identifier(name)))
+            cursor.execute(sql.SQL("CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} ON {table} ({columns}){where}").format(
+                index=sql.Identifier(name), table=sql.Identifier(table),
+                columns=sql.SQL(", ").join(map(sql.Identifier, columns)),
+                where=sql.SQL(f" WHERE {predicate}") if predicate else sql.SQL("")))
+            RUN_METRICS.increment("db_statements_total", operation="create_index")
+    finally:
+        conn.autocommit = False
+    return name
+
+
+def run_migrations(conn):
+    """
+    Applies the pending MIGRATIONS in version order and records each in schema_migrations.
+    Every ingestion entry point calls this once its tables exist; with nothing pending it costs two queries.
+    A migration whose tables are missing is skipped without being recorded, so a later run applies it; one that
+    fails is logged and rolled back, and stops the run so no later version is applied past a broken one.
+    Returns the number of migrations applied.
+    """
+    applied_count = 0
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+            cursor.execute("SELECT version FROM schema_migrations")
+            applied = {version for (version,) in cursor.fetchall()}
+        conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        LOG.warning(f"Schema migrations skipped: could not read schema_migrations: {e}")
+        return 0
+    pending = [migration for migration in sorted(MIGRATIONS, key=lambda m: m.version) if migration.version not in applied]
+    if not pending:
+        return 0
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        cursor.execute("SELECT version FROM schema_migrations") # Another process may have applied some meanwhile
+        applied = {version for (version,) in cursor.fetchall()}
+    conn.commit()
+    try:
+        for migration in pending:
+            if migration.version in applied:
+                continue
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT array_agg(r) FROM unnest(%s::text[]) AS r
+                    WHERE CASE WHEN strpos(r, '.') = 0 THEN to_regclass(r) IS NULL
+                               ELSE NOT EXISTS (SELECT 1 FROM information_schema.columns AS c
+                                                WHERE c.table_schema = current_schema() AND c.table_name = split_part(r, '.', 1)
+                                                    AND c.column_name = split_part(r, '.', 2)) END;
+                """, (list(migration.requires),))
+                missing_tables = cursor.fetchone()[0]
+            conn.commit()
+            if missing_tables:
+                LOG.debug(f"Migration {migration.version} ({migration.description}) waits for: {', '.join(missing_tables)}.")
+                continue
+            try:
+                with conn.cursor() as cursor:
+                    for statement in migration.statements:
+                        cursor.execute(statement)
+                        RUN_METRICS.increment("db_statements_total", operation="migration")
+                conn.commit()
+                index_used = _create_index_concurrently(conn, *migration.index) if migration.index else None
+                with conn.cursor() as cursor:
+                    cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                                   (migration.version, migration.description))
+                conn.commit()
+            except psycopg2.Error as e:
+                conn.rollback()
+                LOG.error(f"Migration {migration.version} ({migration.description}) failed and was rolled back: {e}")
+                break
+            applied_count += 1
+            if migration.index and index_used != migration.index[0]:
+                LOG.info(f"Applied migration {migration.version}: {migration.description} (already covered by index '{index_used}').")
+            else:
+                LOG.info(f"Applied migration {migration.version}: {migration.description}.")
+    finally:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+        conn.commit()
+    return applied_count
@@ -0,0 +1,222 @@
+import argparse
+import csv
+import io
+import math
+import os
+import random
+import zipfile
+from datetime import date, timedelta
+
+# Synthetic TMDb catalog: movie ids 1..catalog_size, each with a title, year, details and credits derived
+# from the id alone, so mockTmdbServer.py and the export generator agree without sharing any state.
+ADJECTIVES = ("Silent", "Crimson", "Hidden", "Last", "Broken", "Golden", "Midnight", "Electric", "Frozen", "Wild",
+              "Distant", "Burning", "Secret", "Lonely", "Hollow", "Velvet", "Restless", "Paper", "Iron", "Glass",
+              "Quiet", "Savage", "Fading", "Bright", "Endless", "Little", "Northern", "Forgotten", "Stolen", "Sleeping",
+              "Falling", "Bitter")
+NOUNS = ("Harbor", "Summer", "Garden", "River", "Kingdom", "Witness", "Highway", "Orchard", "Signal", "Empire",
+         "Frontier", "Lantern", "Circus", "Station", "Island", "Letter", "Mirror", "Horizon", "Stranger", "Season",
+         "Machine", "Shadow", "Country", "Voyage", "Promise", "Daughter", "Engine", "Tide", "Canyon", "Requiem",
+         "Parade", "Echo")
+SUFFIXES = ("", "", "", "", " II", " III", " Returns", " of the North", " in Winter", ": Part One", ": The Reckoning",
+            " at Dawn", " Redux", " and the Sea", " of Tomorrow", " Forever")
+GENRES = ("Drama", "Comedy", "Thriller", "Horror", "Romance", "Action", "Science Fiction", "Animation",
+          "Documentary", "Crime", "Fantasy", "Mystery")
+FIRST_NAMES = ("Ada", "Bruno", "Chiara", "Dmitri", "Elena", "Farid", "Greta", "Hiro", "Ines", "Jonas", "Kemi", "Luca",
+               "Maya", "Nils", "Olga", "Pablo", "Quinn", "Rosa", "Sven", "Tamsin", "Umar", "Vera", "Wen", "Yara")
+LAST_NAMES = ("Abbott", "Bergman", "Castillo", "Dumont", "Eriksen", "Fontaine", "Gallo", "Hayashi", "Ivanova",
+              "Jensen", "Kowalski", "Lindqvist", "Moreau", "Nakamura", "Okafor", "Petrov", "Quint", "Rossi",
+              "Sato", "Tanaka", "Ueda", "Varga", "Weiss", "Zhou")
+
+FIRST_YEAR, YEAR_SPAN = 1930, 96
+CAST_SIZE = 15
+CREW_SIZE = 10
+PERSON_ID_OFFSET = 10_000_000
+
+# Default export sizes (rows) and the share of watched films whose titles TMDb does not know.
+DEFAULT_FILMS = 10_000
+DEFAULT_DIARY_ROWS = 10_000
+DEFAULT_RATINGS_ROWS = 5_000
+DEFAULT_UNMATCHED_RATE = 0.02
+# Letterboxd diary/rating dates are spread over this window.
+HISTORY_START, HISTORY_DAYS = date(2015, 1, 1), 3650
+
+
+def _mix(value, salt=0):
+    """Cheap deterministic 32-bit hash of an integer (Knuth multiplicative plus xorshift)."""
+    value = ((value + salt * 0x9E3779B9) * 2654435761) & 0xFFFFFFFF
+    value ^= value >> 16
+    return (value * 0x45D9F3B) & 0xFFFFFFFF
+
+
+def synthetic_title_year(tmdb_id):
+    """Returns the (title, year) of a synthetic catalog movie."""
+    h = _mix(tmdb_id)
+    title = f"{ADJECTIVES[h % len(ADJECTIVES)]} {NOUNS[(h >> 5) % len(NOUNS)]}{SUFFIXES[(h >> 10) % len(SUFFIXES)]}"
+    framing = _mix(tmdb_id, 1) % (len(NOUNS) + 1)
+    if framing: # ~97% of titles, widening the title space well beyond any catalog size we generate
+        title = f"The {NOUNS[framing - 1]} of the {title}"
+    return title, FIRST_YEAR + (h >> 14) % YEAR_SPAN
+
+
+def synthetic_person_name(person_id):
+    h = _mix(person_id, 7)
+    return f"{FIRST_NAMES[h % len(FIRST_NAMES)]} {LAST_NAMES[(h >> 8) % len(LAST_NAMES)]}"
+
+
+def synthetic_profile_path(person_id):
+    """Every third person has no profile image, like many TMDb crew members."""
+    h = _mix(person_id, 11)
+    return None if h % 3 == 0 else f"/p{h:08x}.jpg"
+
+
+def synthetic_search_result(tmdb_id):
+    """A catalog movie shaped like one /search/movie result."""
+    title, year = synthetic_title_year(tmdb_id)
+    h = _mix(tmdb_id, 3)
+    return {"id": tmdb_id, "title": title, "original_title": title,
+            "release_date": f"{year}-{1 + h % 12:02d}-{1 + (h >> 4) % 28:02d}",
+            "popularity": round((h % 100000) / 1000, 3), "adult": False}
+
+
+def synthetic_movie_details(tmdb_id, missing_profile_rate=0.0):
+    """
+    A catalog movie shaped like /movie/{id}?append_to_response=credits. A `missing_profile_rate` share
+    of directors lack the profile_path key entirely, which makes the enrichment fall back to /person/{id}.
+    """
+    details = synthetic_search_result(tmdb_id)
+    h = _mix(tmdb_id, 5)
+    first_person = PERSON_ID_OFFSET + tmdb_id * (CAST_SIZE + CREW_SIZE)
+    cast = [{"id": person_id, "name": synthetic_person_name(person_id), "character": f"Role {order + 1}", "order": order,
+             "profile_path": synthetic_profile_path(person_id)}
+            for order, person_id in enumerate(range(first_person, first_person + CAST_SIZE))]
+    crew = []
+    for index, person_id in enumerate(range(first_person + CAST_SIZE, first_person + CAST_SIZE + CREW_SIZE)):
+        job = "Director" if index < 1 + (h % 5 == 0) else ("Producer", "Screenplay", "Editor", "Original Music Composer")[index % 4]
+        member = {"id": person_id, "name": synthetic_person_name(person_id), "job": job,
+                  "department": "Directing" if job == "Director" else "Crew"}
+        if job != "Director" or _mix(person_id, 13) % 1000 >= missing_profile_rate * 1000:
+            member["profile_path"] = synthetic_profile_path(person_id)
+        crew.append(member)
+    details.update({
+        "poster_path": f"/m{h:08x}.jpg", "backdrop_path": f"/b{h:08x}.jpg" if h % 4 else None,
+        "overview": f"A synthetic film about a {details['title'].lower()}.",
+        "runtime": 70 + h % 110,
+        "genres": [{"id": 1 + (h >> shift) % len(GENRES), "name": GENRES[(h >> shift) % len(GENRES)]} for shift in sorted({0, 4 + h % 3 * 4})],
+        "credits": {"cast": cast, "crew": crew},
+    })
+    return details
+
+
+def synthetic_person(person_id):
+    """A person shaped like /person/{id}."""
+    return {"id": person_id, "name": synthetic_person_name(person_id), "profile_path": synthetic_profile_path(person_id)}
+
+
+def default_catalog_size(films):
+    """Catalog large enough that watched films are a sample of it, like a real account against TMDb."""
+    return max(int(films * 1.25), 1000)
+
+
+def _watched_stride(catalog_size):
+    """A step coprime with catalog_size, so stepping through ids visits each one once without storing a sample."""
+    stride = 7919
+    while math.gcd(stride, catalog_size) != 1:
+        stride += 2
+    return stride
+
+
+class SyntheticExport:
+    """
+    Describes a synthetic Letterboxd export of `films` watched films drawn from a catalog of `catalog_size`
+    movies. Film i maps to a distinct catalog id; an `unmatched_rate` share of films get titles that are
+    not in the catalog (these are deleted by enrichment). Nothing is held in memory per row.
+    """
+
+    def __init__(self, films=DEFAULT_FILMS, diary_rows=DEFAULT_DIARY_ROWS, ratings_rows=DEFAULT_RATINGS_ROWS,
+                 catalog_size=None, unmatched_rate=DEFAULT_UNMATCHED_RATE, seed=0):
+        self.films = films
+        self.diary_rows = diary_rows
+        self.ratings_rows = min(ratings_rows, films) # One rating per film at most
+        self.catalog_size = catalog_size or default_catalog_size(films)
+        if self.films > self.catalog_size:
+            raise ValueError(f"Cannot draw {self.films} distinct films from a catalog of {self.catalog_size}.")
+        self.unmatched_rate = unmatched_rate
+        self.seed = seed
+        self._stride = _watched_stride(self.catalog_size)
+
+    def film(self, index):
+        """Returns (letterboxd_uri, title, year) of watched film `index`."""
+        uri = f"https://boxd.it/syn{index:x}"
+        if _mix(index, self.seed + 17) % 10000 < self.unmatched_rate * 10000:
+            return uri, f"Unreleased Home Movie No. {index}", FIRST_YEAR + index % YEAR_SPAN
+        title, year = synthetic_title_year((self.seed + index * self._stride) % self.catalog_size + 1)
+        return uri, title, year
+
+    def write_watched(self, csv_file):
+        writer = csv.writer(csv_file)
+        writer.writerow(["Date", "Name", "Year", "Letterboxd URI"])
+        for index in range(self.films):
+            uri, title, year = self.film(index)
+            writer.writerow([(HISTORY_START + timedelta(days=_mix(index, 19) % HISTORY_DAYS)).isoformat(), title, year, uri])
+
+    def write_diary(self, csv_file):
+        rng = random.Random(self.seed + 1)
+        writer = csv.writer(csv_file)
+        writer.writerow(["Date", "Name", "Year", "Letterboxd URI", "Rating", "Rewatch", "Tags", "Watched Date"])
+        for row in range(self.diary_rows):
+            _, title, year = self.film(rng.randrange(self.films))
+            watched = (HISTORY_START + timedelta(days=rng.randrange(HISTORY_DAYS))).isoformat()
+            rating = "" if rng.random() < 0.2 else rng.randint(1, 10) / 2
+            writer.writerow([watched, title, year, f"https://boxd.it/synd{row:x}", rating,
+                             "Yes" if rng.random() < 0.1 else "", "", watched])
+
+    def write_ratings(self, csv_file):
+        rng = random.Random(self.seed + 2)
+        writer = csv.writer(csv_file)
+        writer.writerow(["Date", "Name", "Year", "Letterboxd URI", "Rating"])
+        for index in range(self.ratings_rows):
+            uri, title, year = self.film(index)
+            writer.writerow([(HISTORY_START + timedelta(days=rng.randrange(HISTORY_DAYS))).isoformat(), title, year, uri,
+                             rng.randint(1, 10) / 2])
+
+    def write_directory(self, output_dir):
+        """Writes watched.csv, diary.csv and ratings.csv into output_dir."""
+        os.makedirs(output_dir, exist_ok=True)
+        for file_name, writer in self._writers():
+            with open(os.path.join(output_dir, file_name), "w", encoding="utf-8", newline="") as csv_file:
+                writer(csv_file)
+
+    def write_zip(self, zip_path):
+        """Writes the three CSVs into a ZIP laid out like a Letterboxd export, streaming each member."""
+        with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for file_name, writer in self._writers():
+                with archive.open(file_name, "w", force_zip64=True) as member, \
+                        io.TextIOWrapper(member, encoding="utf-8", newline="") as csv_file:
+                    writer(csv_file)
+
+    def _writers(self):
+        return (("watched.csv", self.write_watched), ("diary.csv", self.write_diary), ("ratings.csv", self.write_ratings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Letterboxd export matching mockTmdbServer.py's catalog.")
+    parser.add_argument("output", help="Output directory, or a .zip path to write an export archive.")
+    parser.add_argument("--films", type=int, default=DEFAULT_FILMS, help="Rows in watched.csv (default %(default)s).")
+    parser.add_argument("--diary", type=int, default=DEFAULT_DIARY_ROWS, help="Rows in diary.csv (default %(default)s).")
+    parser.add_argument("--ratings", type=int, default=DEFAULT_RATINGS_ROWS, help="Rows in ratings.csv, at most --films (default %(default)s).")
+    parser.add_argument("--catalog-size", type=int, help="Synthetic TMDb catalog size; must match the mock server (default 1.25 x --films).")
+    parser.add_argument("--unmatched-rate", type=float, default=DEFAULT_UNMATCHED_RATE, help="Share of films TMDb cannot match (default %(default)s).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    export = SyntheticExport(args.films, args.diary, args.ratings, args.catalog_size, args.unmatched_rate, args.seed)
+    if args.output.endswith(".zip"):
+        export.write_zip(args.output)
+    else:
+        export.write_directory(args.output)
+    print(f"Wrote {export.films} watched, {export.diary_rows} diary and {export.ratings_rows} rating rows "
+          f"(catalog size {export.catalog_size}) to '{args.output}'.")
+
+
+if __name__ == "__main__":
+    main()
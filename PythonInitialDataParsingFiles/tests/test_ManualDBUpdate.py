@@ -0,0 +1,101 @@
+import psycopg2.extras
+import psycopg2.sql
+import pytest
+
+import ManualDBUpdate as tool
+import dashboardStats
+import filmCredits
+import schemaMigrations
+
+
+def movie_details(tmdb_id):
+    return {"title": f"Film {tmdb_id}", "release_date": "1999-03-31", "genres": [{"name": "Drama"}],
+            "credits": {"crew": [{"job": "Director", "id": tmdb_id * 10, "name": f"Director {tmdb_id}", "profile_path": "/d.jpg"}],
+                        "cast": [{"id": tmdb_id * 10 + 1, "name": f"Actor {tmdb_id}", "profile_path": None}]}}
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, query, params=None):
+        self.conn.statements.append((" ".join(str(query).split()), params))
+
+    def fetchall(self):
+        if "SET tmdb_id = NULL" in self.conn.statements[-1][0]:
+            return self.conn.released_rows # release_tmdb_ids: RETURNING f.id
+        return self.conn.check_rows # check_update_pairs: (db_id, found, colliding id, colliding title)
+
+
+class FakeConnection:
+    def __init__(self, check_rows, released_rows=()):
+        self.check_rows = check_rows
+        self.released_rows = list(released_rows)
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Replaces the database writes with recorders; returns what each one was called with."""
+    calls = {"update_rows": [], "credits": [], "refreshed": [], "pending": []}
+
+    def execute_values(cursor, query, rows, **kwargs):
+        calls["update_rows"].extend(rows)
+        return [(row[-1], f"film/{row[-1]}") for row in rows] # RETURNING f.id, f.letterboxd_uri
+
+    monkeypatch.setattr(psycopg2.extras, "execute_values", execute_values)
+    monkeypatch.setattr(psycopg2.sql.Composed, "as_string", lambda self, context: "BATCH_UPDATE_QUERY")
+    monkeypatch.setattr(filmCredits, "write_film_credits", lambda cursor, credits_by_uri: calls["credits"].extend(credits_by_uri))
+    monkeypatch.setattr(schemaMigrations, "mark_enrichment_done", lambda cursor, film_ids: len(film_ids))
+    monkeypatch.setattr(schemaMigrations, "mark_enrichment_pending", lambda cursor, film_ids: calls["pending"].extend(film_ids))
+    monkeypatch.setattr(dashboardStats, "refresh_dashboard_views", lambda conn, source_tables=None: calls["refreshed"].append(source_tables))
+    monkeypatch.setattr(tool.TMDB_CLIENT, "get_json", lambda path, params: movie_details(int(path.rsplit("/", 1)[1])))
+    return calls
+
+
+def test_batch_update_replaces_credits_and_refreshes_the_dashboard(writes):
+    conn = FakeConnection([(1, True, None, None), (2, True, None, None)])
+    assert tool.update_films_in_batch(conn, {1: 603, 2: 550}, workers=2) == 2
+    assert dict(writes["credits"]) == {
+        "film/1": [("director", 0, 6030, "Director 603", "https://image.tmdb.org/t/p/w185/d.jpg"), ("actor", 0, 6031, "Actor 603", None)],
+        "film/2": [("director", 0, 5500, "Director 550", "https://image.tmdb.org/t/p/w185/d.jpg"), ("actor", 0, 5501, "Actor 550", None)],
+    }
+    assert writes["refreshed"] == [("films", "film_credits")]
+    assert conn.rollbacks == 0
+
+
+def test_allowed_collision_releases_the_other_films_tmdb_id_first(writes):
+    # Film 1 takes TMDb ID 603 from film 7; film 3 asks for 603 again later in the file and is skipped.
+    conn = FakeConnection([(1, True, 7, "Old match"), (2, True, None, None), (3, True, 7, "Old match")], released_rows=[(7,)])
+    assert tool.update_films_in_batch(conn, {1: 603, 2: 550, 3: 603}, on_collision="allow", workers=2) == 2
+
+    release_query, release_params = next(statement for statement in conn.statements if "SET tmdb_id = NULL" in statement[0])
+    assert sorted(zip(*release_params)) == [(1, 603), (2, 550)]
+    assert ("DELETE FROM film_credits WHERE film_id = ANY(%s);", ([7],)) in conn.statements
+    assert writes["pending"] == [7]
+    assert sorted((row[-1], row[0]) for row in writes["update_rows"]) == [(1, 603), (2, 550)]
+    assert conn.rollbacks == 0
+
+
+def test_skipped_collision_leaves_the_other_film_alone(writes):
+    conn = FakeConnection([(1, True, 7, "Old match"), (2, True, None, None)], released_rows=[(7,)])
+    assert tool.update_films_in_batch(conn, {1: 603, 2: 550}, on_collision="skip", workers=2) == 1
+    assert not any("SET tmdb_id = NULL" in query for query, _ in conn.statements)
+    assert writes["pending"] == []
@@ -0,0 +1,137 @@
+import csv
+import io
+
+import pytest
+
+import csvColumns
+import parsingInitialRatingData as ratings_loader
+from benchmarkHotPaths import Fixtures
+
+requires_pyarrow = pytest.mark.skipif(csvColumns.pyarrow is None, reason="pyarrow is not installed")
+BACKENDS = ["python", pytest.param("pyarrow", marks=requires_pyarrow)]
+
+HEADER = "Date,Name,Year,Letterboxd URI,Rating\n"
+# Inputs the pyarrow backend hands back to the csv module, or that the two tokenizers could read differently.
+EDGE_CASES = {
+    "ragged": HEADER + "2024-01-02,Alien,1979,https://boxd.it/a1,4.5\n"
+                       "2024-01-03,Aliens,1986,https://boxd.it/a2\n"
+                       "2024-01-04,Alien 3,1992,https://boxd.it/a3,2.0,extra\n",
+    "blank_lines": HEADER + "\n2024-01-02,Alien,1979,https://boxd.it/a1,4.5\n\n\n"
+                            "2024-01-03,\"Crouching Tiger, Hidden Dragon\",2000,https://boxd.it/c1,\n\n",
+    "duplicate_header": "Date,Name,Year,Letterboxd URI,Rating,Rating\n"
+                        "2024-01-02,Alien,1979,https://boxd.it/a1,4.5,3.0\n"
+                        "2024-01-03,Aliens,1986,https://boxd.it/a2,,5.0\n",
+    "quoted_newline": HEADER + "2024-01-02,\"Three Colours:\nBlue\",1993,https://boxd.it/b1,4.0\n",
+}
+
+
+@pytest.fixture(scope="module")
+def sample_export():
+    """ratings/diary/watched CSVs shaped like a Letterboxd export, built from the DatabaseDump backup."""
+    return Fixtures(rows=300)
+
+
+def dict_reader_columns(text):
+    """The columns csv.DictReader gives, which both backends must reproduce."""
+    reader = csv.DictReader(io.StringIO(text, newline=""))
+    rows = list(reader)
+    return reader.fieldnames, {name: [row[name] for row in rows] for name in reader.fieldnames}
+
+
+def sample_texts(sample_export):
+    return {"ratings": sample_export.ratings_csv, "diary": sample_export.diary_csv,
+            "watched": sample_export.watched_csv, **EDGE_CASES}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_read_the_columns_dict_reader_reads(sample_export, backend):
+    for name, text in sample_texts(sample_export).items():
+        fieldnames, columns = csvColumns.read_csv_columns(io.StringIO(text, newline=""), backend)
+        expected_fieldnames, expected_columns = dict_reader_columns(text)
+        assert fieldnames == expected_fieldnames, name
+        assert {column: list(values) for column, values in columns.items()} == expected_columns, name
+
+
+@requires_pyarrow
+def test_pyarrow_and_python_backends_agree(sample_export):
+    for name, text in sample_texts(sample_export).items():
+        assert (csvColumns.read_csv_columns(io.StringIO(text, newline=""), "pyarrow")
+                == csvColumns.read_csv_columns(io.StringIO(text, newline=""), "python")), name
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_missing_header_row(backend):
+    assert csvColumns.read_csv_columns(io.StringIO("", newline=""), backend) == (None, {})
+
+
+def test_convert_column_converts_each_distinct_value_once():
+    calls = []
+
+    def parse(value):
+        calls.append(value)
+        return csvColumns.parse_rating(value)
+
+    converted = csvColumns.convert_column(["4.5", "", "4.5", "five", None, "4.5", " "], parse)
+    assert converted == [4.5, None, 4.5, csvColumns.INVALID, None, 4.5, None]
+    assert sorted(calls) == [" ", "4.5", "five"]
+
+
+def read_ratings(monkeypatch, backend, text, film_id_map):
+    """Runs read_rating_entries on one backend; returns its result and the problem counts it reported."""
+    reported = []
+
+    class RecordedProblems(csvColumns.RowProblems):
+        def report(self, max_listed=20):
+            reported.append(dict(self.kinds))
+
+    monkeypatch.setattr(csvColumns, "CSV_BACKEND", backend)
+    monkeypatch.setattr(ratings_loader, "RowProblems", RecordedProblems)
+    result = ratings_loader.read_rating_entries(io.StringIO(text, newline=""), film_id_map, "ratings.csv")
+    return result, reported[0]
+
+
+PROBLEM_RATINGS = HEADER + (
+    ",Alien,1979,https://boxd.it/p1,4.0\n"                 # missing_date
+    "2024-01-02,,1979,https://boxd.it/p2,4.0\n"            # missing_name
+    "2024-01-03,Alien,1979,,4.0\n"                          # missing_uri
+    "2024-01-04,Alien,1979,https://boxd.it/p4,4.0\n"
+    "\n"
+    "2024-01-05,Alien,1979,https://boxd.it/p4,3.0\n"       # duplicate_uri
+    "2024-01-06,Alien,year,https://boxd.it/p6,4.0\n"       # invalid_year, then unresolved
+    "01/07/2024,Alien,1979,https://boxd.it/p7,4.0\n"       # invalid_date
+    "2024-01-08,Alien,1979,https://boxd.it/p8,great\n"     # invalid_rating
+    "2024-01-09,Alien,1979,https://boxd.it/p9,9.0\n"       # rating_out_of_range
+    "2024-01-10,Alien,1979,https://boxd.it/p10\n"          # ragged: no rating
+    "2024-01-11,Unknown Film,2001,https://boxd.it/p11,2.5\n"
+)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_read_rating_entries_reports_the_same_problems_per_backend(monkeypatch, backend):
+    (ratings, unresolved, skipped), problem_counts = read_ratings(monkeypatch, backend, PROBLEM_RATINGS, {("Alien", 1979): 7})
+    assert [(film_id, str(rating_date), rating, uri) for film_id, rating_date, rating, uri in ratings] == [
+        (7, "2024-01-04", 4.0, "https://boxd.it/p4"),
+        (7, "2024-01-08", None, "https://boxd.it/p8"),
+        (7, "2024-01-09", 9.0, "https://boxd.it/p9"),
+        (7, "2024-01-10", None, "https://boxd.it/p10"),
+    ]
+    assert unresolved == [("Alien", "year"), ("Unknown Film", "2001")]
+    assert skipped == 4
+    assert problem_counts == {"missing_date": 1, "missing_name": 1, "missing_uri": 1, "duplicate_uri": 1, "invalid_year": 1,
+                              "invalid_date": 1, "invalid_rating": 1, "rating_out_of_range": 1}
+
+
+@requires_pyarrow
+def test_read_rating_entries_matches_across_backends_on_the_sample_export(monkeypatch, sample_export):
+    for text in (sample_export.ratings_csv, PROBLEM_RATINGS):
+        assert (read_ratings(monkeypatch, "pyarrow", text, sample_export.film_id_map)
+                == read_ratings(monkeypatch, "python", text, sample_export.film_id_map))
+
+
+def test_read_rating_entries_resolves_the_sample_export(monkeypatch, sample_export):
+    (ratings, unresolved, skipped), problem_counts = read_ratings(monkeypatch, "python", sample_export.ratings_csv,
+                                                                  sample_export.film_id_map)
+    expected = list(csv.DictReader(io.StringIO(sample_export.ratings_csv, newline="")))
+    assert [uri for _, _, _, uri in ratings] == [row["Letterboxd URI"] for row in expected]
+    assert [rating for _, _, rating, _ in ratings] == [float(row["Rating"]) if row["Rating"] else None for row in expected]
+    assert (unresolved, skipped, problem_counts) == ([], 0, {})
@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+import dumpLoader
+
+DUMP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "DatabaseDump")
+DUMPS = ["LetterboxdDatabaseDump5-6-25.sql", "letterboxdDataBackup5-22-25"]
+TABLES = ["public.diary_entries", "public.films", "public.ratings_entries"]
+
+
+def copy_data(plan, dump_path):
+    with open(dump_path, "rb") as dump_file:
+        data = dump_file.read()
+    return b"".join(data[chunk.start:chunk.end] for chunk in plan.copy_chunks)
+
+
+@pytest.mark.parametrize("dump_name", DUMPS)
+def test_plan_splits_the_fixture_dumps_into_phases_and_chunks(dump_name):
+    plan = dumpLoader.plan_dump(os.path.join(DUMP_DIR, dump_name), chunk_bytes=64 * 1024)
+    assert (len(plan.session_statements), len(plan.schema_statements), len(plan.deferred_statements),
+            len(plan.sequence_statements), len(plan.owner_statements)) == (12, 13, 10, 3, 7)
+    assert plan.statement_count() == 45
+    assert plan.tables == TABLES
+    assert len(plan.copy_chunks) == 9
+    assert b"\n\\.\n" not in copy_data(plan, os.path.join(DUMP_DIR, dump_name)) # Chunks stop before each terminator
+
+    whole_tables = dumpLoader.plan_dump(os.path.join(DUMP_DIR, dump_name))
+    assert [chunk.table for chunk in whole_tables.copy_chunks] == TABLES
+
+
+def test_crlf_dump_plans_like_its_lf_original(tmp_path):
+    lf_path = os.path.join(DUMP_DIR, DUMPS[0])
+    crlf_path = str(tmp_path / "dump_crlf.sql")
+    with open(lf_path, "rb") as lf_file, open(crlf_path, "wb") as crlf_file:
+        crlf_file.write(lf_file.read().replace(b"\n", b"\r\n"))
+
+    lf_plan = dumpLoader.plan_dump(lf_path, chunk_bytes=64 * 1024)
+    crlf_plan = dumpLoader.plan_dump(crlf_path, chunk_bytes=64 * 1024)
+    assert crlf_plan.statement_count() == lf_plan.statement_count()
+    assert crlf_plan.tables == lf_plan.tables
+    assert copy_data(crlf_plan, crlf_path).replace(b"\r\n", b"\n") == copy_data(lf_plan, lf_path)
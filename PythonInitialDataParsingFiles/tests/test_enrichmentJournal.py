@@ -0,0 +1,25 @@
+from enrichmentJournal import OUTCOME_COLLISION, OUTCOME_MATCHED, EnrichmentJournal
+
+
+def test_records_become_durable_on_commit_and_replay_on_resume(tmp_path):
+    journal_path = str(tmp_path / "journal.sqlite3")
+    journal = EnrichmentJournal(journal_path)
+    run_id = journal.start_run(3)
+    journal.record("film/a", OUTCOME_MATCHED, write_payload=["film/a", 603])
+    journal.commit()
+    journal.record("film/b", OUTCOME_MATCHED, write_payload=["film/b", 550])
+    journal._db.rollback() # Simulates a crash before the next batch committed
+
+    journal.record("film/c", OUTCOME_COLLISION)
+    journal.commit()
+    journal.mark_written(["film/a"])
+    journal.record("film/d", OUTCOME_MATCHED, write_payload=["film/d", 13])
+    journal.commit()
+    journal.close()
+
+    resumed = EnrichmentJournal(journal_path)
+    assert resumed.latest_unfinished_run() == run_id
+    resumed.resume_run(run_id)
+    assert resumed.finished_uris() == {"film/a", "film/c"}
+    assert resumed.pending_writes() == [("film/d", OUTCOME_MATCHED, ["film/d", 13])]
+    resumed.close()
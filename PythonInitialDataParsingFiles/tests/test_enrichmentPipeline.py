@@ -0,0 +1,98 @@
+import threading
+
+import requests
+
+import parsingInitialFilmData as film_loader
+
+
+class FakeCursor:
+    """Accepts every statement; the backlog cursor's fetchmany fails like a dropped connection would."""
+
+    def __init__(self, fail_fetch):
+        self.fail_fetch = fail_fetch
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchone(self):
+        return {"backlog_size": 3}
+
+    def fetchall(self):
+        return []
+
+    def fetchmany(self, size):
+        if self.fail_fetch:
+            raise RuntimeError("backlog fetch failed")
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.named_cursors = []
+        self.commits = 0
+        self.closed = False
+
+    def cursor(self, name=None, **kwargs):
+        if name is not None:
+            self.named_cursors.append(kwargs)
+        return FakeCursor(fail_fetch=name is not None)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_select_stage_failure_stops_the_write_stage_and_is_raised(monkeypatch):
+    conn, read_conn = FakeConnection(), FakeConnection()
+    monkeypatch.setattr(film_loader, "open_read_connection", lambda conn: read_conn)
+    errors = []
+
+    def enrich():
+        try:
+            film_loader.enrich_films_with_tmdb_data(conn, max_workers=2, flush_interval=0.05)
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=enrich, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "the write stage kept waiting for _END_OF_STAGE"
+    assert [str(e) for e in errors] == ["backlog fetch failed"]
+    # The backlog streams from a plain named cursor on its own connection, away from the write stage's commits.
+    assert not conn.named_cursors
+    assert [kwargs.get("withhold", False) for kwargs in read_conn.named_cursors] == [False]
+    assert read_conn.closed and read_conn.commits == 0
+
+
+def test_empty_backlog_cursor_ends_the_pipeline():
+    write_queue, stop_event, stage_errors = film_loader.start_enrichment_pipeline(
+        FakeCursor(fail_fetch=False), None, 0, workers=2, queue_size=4)
+    assert write_queue.get(timeout=10) is film_loader._END_OF_STAGE
+    assert not stop_event.is_set() and not stage_errors
+
+
+def test_failed_lookup_logs_the_error_response():
+    # requests.Response is falsy for 4xx/5xx, so it must be tested with `is not None`.
+    response = requests.Response()
+    response.status_code, response._content = 404, b'{"status_message": "The resource you requested could not be found."}'
+    item = film_loader.FilmWorkItem("film/missing", "Missing Film", 1999, 1)
+    item.tmdb_id = 404404
+    film_loader.fail_work_item(film_loader.TmdbIdIndex(), item, requests.exceptions.HTTPError(response=response))
+    assert "404 - {\"status_message\": \"The resource you requested could not be found.\"}" in item.log_lines[0]
+    assert item.log_lines[1] == "  -> TMDb: Movie ID 404404 not found (404)."
+    assert (item.outcome, item.write) == ("failed", film_loader.FAILURE_PERMANENT)
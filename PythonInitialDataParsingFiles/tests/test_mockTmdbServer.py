@@ -0,0 +1,21 @@
+import time
+
+import requests
+
+from mockTmdbServer import MockTMDbServer
+
+
+def test_zero_latency_responses_are_not_delayed_by_nagle():
+    server = MockTMDbServer(100)
+    base_url = server.start()
+    try:
+        with requests.Session() as session:
+            assert session.get(f"{base_url}/movie/1", params={"api_key": "test"}).status_code == 200
+            started = time.perf_counter()
+            for _ in range(20):
+                session.get(f"{base_url}/movie/1", params={"api_key": "test"})
+            per_request = (time.perf_counter() - started) / 20
+    finally:
+        server.stop()
+    # Nagle plus delayed ACK costs ~40 ms per keep-alive response.
+    assert per_request < 0.02
@@ -0,0 +1,55 @@
+import io
+
+import pgBulk
+
+
+class FakeCopyCursor:
+    """Reads the COPY payload the way psycopg2's copy_expert does: size characters per read() until it is empty."""
+
+    def __init__(self, progress):
+        self.chunks = []
+        self.progress = progress
+        self.progress_at_first_chunk = None
+
+    def execute(self, query, params=None):
+        pass
+
+    def copy_expert(self, query, file, size=8192):
+        while True:
+            chunk = file.read(size)
+            if not chunk:
+                return
+            self.chunks.append(chunk)
+            if self.progress_at_first_chunk is None:
+                self.progress_at_first_chunk = self.progress()
+
+
+def test_rows_stream_in_chunks_and_match_the_copy_text_format(monkeypatch):
+    monkeypatch.setattr(pgBulk.sql.Composed, "as_string", lambda self, context: "COPY")
+    monkeypatch.setattr(pgBulk, "COPY_CHUNK_SIZE", 100)
+    rows = [(f"film/{i}", "Tab\there\\ and\nnewline" if i % 7 == 0 else f"Film {i}", None if i % 5 == 0 else 1900 + i)
+            for i in range(1000)]
+    consumed = []
+
+    def row_generator():
+        for row in rows:
+            consumed.append(row)
+            yield row
+
+    cursor = FakeCopyCursor(lambda: len(consumed))
+    pgBulk.copy_rows_to_staging(cursor, "staging", [("letterboxd_uri", "TEXT"), ("title", "TEXT"), ("year", "INTEGER")], row_generator())
+
+    expected = io.StringIO()
+    for row in rows:
+        expected.write("\t".join(pgBulk.copy_text_value(value) for value in row) + "\n")
+    assert "".join(cursor.chunks) == expected.getvalue()
+    assert all(len(chunk) == 100 for chunk in cursor.chunks[:-1])
+    assert cursor.progress_at_first_chunk < 10 # Rows are only consumed as the server reads
+
+
+def test_reader_holds_back_only_the_unread_part_of_a_line():
+    reader = pgBulk._CopyRowsReader([("a" * 10,), ("b",)])
+    assert reader.read(4) == "aaaa"
+    assert reader.read(4) == "aaaa"
+    assert reader.read() == "aa\nb\n"
+    assert reader.read(4) == ""
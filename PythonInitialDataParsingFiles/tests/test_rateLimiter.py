@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+from rateLimiter import TokenBucket
+
+
+class FakeClock:
+    """A monotonic clock that only moves when sleep() is called, like a worker waiting for its token."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_bucket(rate, capacity=None):
+    clock = FakeClock()
+    return TokenBucket(rate, capacity, clock=clock, sleep=clock.sleep), clock
+
+
+def test_full_bucket_allows_a_burst_of_capacity_then_refuses():
+    bucket, _ = make_bucket(rate=4, capacity=10)
+    assert all(bucket.try_acquire() for _ in range(10))
+    assert not bucket.try_acquire()
+
+
+def test_capacity_defaults_to_one_second_of_tokens():
+    assert make_bucket(rate=20)[0].capacity == 20
+    assert make_bucket(rate=0.5)[0].capacity == 1 # At least one token, or nothing could ever be acquired
+
+
+def test_tokens_refill_at_the_rate_up_to_capacity():
+    bucket, clock = make_bucket(rate=4, capacity=10)
+    while bucket.try_acquire():
+        pass
+    clock.now += 0.5
+    assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
+    clock.now += 60 # Long idle: the bucket holds capacity, not 240 tokens
+    assert sum(bucket.try_acquire() for _ in range(20)) == 10
+
+
+def test_acquire_blocks_for_the_shortfall_and_reports_the_wait():
+    bucket, clock = make_bucket(rate=4, capacity=2)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.25)
+    assert bucket.acquire(tokens=2) == pytest.approx(0.5)
+    assert clock.now == pytest.approx(100.75)
+    assert sum(clock.sleeps) == pytest.approx(0.75)
+
+
+def test_shared_bucket_holds_the_rate_across_threads():
+    bucket = TokenBucket(rate=200, capacity=1)
+    waits = []
+    threads = [threading.Thread(target=lambda: waits.extend(bucket.acquire() for _ in range(10))) for _ in range(4)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    # 40 tokens at 200/second from one token of burst: the workers wait about 39/200 seconds between them.
+    assert len(waits) == 40
+    assert sum(waits) >= 39 / 200 * 0.9
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
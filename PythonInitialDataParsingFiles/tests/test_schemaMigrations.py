@@ -0,0 +1,84 @@
+import schemaMigrations
+
+
+class FakeSchemaCursor:
+    """Answers run_migrations' catalog queries from the tables and columns of a FakeSchemaConnection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.result = []
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, query, params=None):
+        query = query if isinstance(query, str) else repr(query)
+        self.conn.statements.append(query)
+        if "SELECT version FROM schema_migrations" in query:
+            self.result = [(version,) for version in sorted(self.conn.applied)]
+        elif "unnest(%s::text[])" in query:
+            missing = [required for required in params[0] if required not in self.conn.schema]
+            self.result = [(missing or None,)]
+        elif "INSERT INTO schema_migrations" in query:
+            self.conn.applied.add(params[0])
+        elif "column_name = 'enrichment_status'" in query:
+            self.result = [(1,)] if "films.enrichment_status" in self.conn.schema else []
+        elif "ADD COLUMN IF NOT EXISTS enrichment_status" in query:
+            self.conn.schema.add("films.enrichment_status")
+        else:
+            self.result = []
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+class FakeSchemaConnection:
+    def __init__(self, schema):
+        self.schema = set(schema)
+        self.applied = set()
+        self.statements = []
+        self.autocommit = False
+
+    def cursor(self):
+        return FakeSchemaCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+FILMS_ONLY = ("films", "films.directors_profile_paths", "films.actor_profile_paths", "people", "film_credits")
+
+
+def test_films_only_database_skips_diary_and_ratings_migrations_but_applies_later_ones():
+    conn = FakeSchemaConnection(FILMS_ONLY)
+    assert schemaMigrations.run_migrations(conn) == 5
+    assert conn.applied == {1, 2, 5, 6, 7}
+    assert "films.enrichment_status" in conn.schema
+
+
+def test_skipped_migrations_are_applied_once_their_tables_exist():
+    conn = FakeSchemaConnection(FILMS_ONLY)
+    schemaMigrations.run_migrations(conn)
+    conn.schema.update(("diary_entries", "ratings_entries"))
+    assert schemaMigrations.run_migrations(conn) == 2
+    assert conn.applied == {migration.version for migration in schemaMigrations.MIGRATIONS}
+
+
+def test_films_loader_adds_the_enrichment_status_without_waiting_for_migrations():
+    conn = FakeSchemaConnection(FILMS_ONLY)
+    with conn.cursor() as cursor:
+        assert schemaMigrations.ensure_enrichment_status(cursor)
+        assert any("films_enrichment_pending_idx" in statement for statement in conn.statements)
+        conn.statements.clear()
+        assert not schemaMigrations.ensure_enrichment_status(cursor)
+    assert not any("ALTER TABLE" in statement for statement in conn.statements)
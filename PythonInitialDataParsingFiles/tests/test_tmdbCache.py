@@ -0,0 +1,109 @@
+import pytest
+
+from tmdbCache import DEFAULT_TTLS, TMDbCache, endpoint_for_path, make_cache_key
+
+DAY = 24 * 3600
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "tmdb_cache.sqlite3")
+
+
+def test_cache_key_ignores_credentials_order_case_and_whitespace():
+    key = make_cache_key("/search/movie/", {"query": "  The   Thing ", "year": 1982, "api_key": "secret", "page": None})
+    assert key == "/search/movie?query=the thing&year=1982"
+    assert make_cache_key("/search/movie", {"year": 1982, "query": "the thing"}) == key
+    assert make_cache_key("/search/movie", {"query": "the thing", "year": 2011}) != key
+    assert make_cache_key("/movie/1091", None) == "/movie/1091?"
+
+
+@pytest.mark.parametrize("path, endpoint", [
+    ("/search/movie", "search"), ("/movie/603", "movie"), ("/movie/603/credits", "movie"),
+    ("/person/287", "person"), ("/configuration", "other"), ("/", "other"),
+])
+def test_endpoint_for_path(path, endpoint):
+    assert endpoint_for_path(path) == endpoint
+
+
+def test_normalized_requests_share_an_entry(cache_path, clock):
+    cache = TMDbCache(cache_path, clock=clock)
+    cache.set("/search/movie", {"query": "The Thing", "api_key": "a"}, {"results": [{"id": 1091}]})
+    assert cache.get("/search/movie", {"query": "the thing ", "api_key": "b"}) == {"results": [{"id": 1091}]}
+    assert cache.get("/search/movie", {"query": "The Thing", "year": 1982}) is None
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+    assert len(cache) == 1
+
+
+def test_entries_expire_after_their_endpoint_ttl(cache_path, clock):
+    cache = TMDbCache(cache_path, ttls={"movie": 2 * DAY}, clock=clock)
+    cache.set("/search/movie", {"query": "alien"}, {"results": []})
+    cache.set("/movie/348", None, {"id": 348})
+
+    clock.now += 2 * DAY
+    assert cache.get("/movie/348", None) == {"id": 348} # Exactly at the TTL is still fresh
+    clock.now += 1
+    assert cache.get("/movie/348", None) is None
+    assert cache.get("/search/movie", {"query": "alien"}) == {"results": []} # Default search TTL is a week
+
+    clock.now += DEFAULT_TTLS["search"]
+    assert cache.get("/search/movie", {"query": "alien"}) is None
+    assert cache.stats["expired"] == 2
+    assert len(cache) == 0
+
+
+def test_eviction_drops_the_least_recently_accessed_entries(cache_path, clock):
+    cache = TMDbCache(cache_path, max_entries=3, clock=clock)
+    for movie_id in (1, 2, 3):
+        clock.now += 1
+        cache.set(f"/movie/{movie_id}", None, {"id": movie_id})
+    clock.now += 1
+    assert cache.get("/movie/1", None) == {"id": 1} # Now more recent than 2 and 3
+
+    clock.now += 1
+    cache.set("/movie/4", None, {"id": 4})
+    assert cache.get("/movie/2", None) is None
+    assert [cache.get(f"/movie/{movie_id}", None) for movie_id in (1, 3, 4)] == [{"id": 1}, {"id": 3}, {"id": 4}]
+    assert cache.stats["evictions"] == 1
+    assert len(cache) == 3
+
+    clock.now += 1
+    cache.set("/movie/4", None, {"id": 4, "title": "updated"}) # Replacing an entry does not evict
+    assert cache.stats["evictions"] == 1
+    assert len(cache) == 3
+
+
+def test_reopened_cache_keeps_entries_count_and_access_order(cache_path, clock):
+    cache = TMDbCache(cache_path, max_entries=2, clock=clock)
+    cache.set("/movie/1", None, {"id": 1})
+    clock.now += 1
+    cache.set("/movie/2", None, {"id": 2})
+    clock.now += 1
+    cache.get("/movie/1", None)
+    cache.close()
+
+    reopened = TMDbCache(cache_path, max_entries=2, clock=clock)
+    assert len(reopened) == 2
+    assert reopened.get("/movie/2", None) == {"id": 2}
+    clock.now += 1
+    reopened.get("/movie/1", None)
+    clock.now += 1
+    reopened.set("/movie/3", None, {"id": 3})
+    assert reopened.get("/movie/2", None) is None
+    assert reopened.get("/movie/1", None) == {"id": 1}
+    reopened.clear()
+    reopened.close()
+    assert len(TMDbCache(cache_path, clock=clock)) == 0
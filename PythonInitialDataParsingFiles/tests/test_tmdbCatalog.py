@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from tmdbCatalog import TMDbCatalog, build_catalog, iter_export_records
+
+SAMPLE_EXPORT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "tmdb_catalog_sample.jsonl")
+
+
+@pytest.fixture(scope="module")
+def catalog(tmp_path_factory):
+    catalog_path = str(tmp_path_factory.mktemp("catalog") / "tmdb_catalog.bin")
+    build_catalog(SAMPLE_EXPORT, catalog_path)
+    catalog = TMDbCatalog(catalog_path)
+    yield catalog
+    catalog.close()
+
+
+def test_catalog_layout_round_trips_every_record(catalog):
+    records = list(iter_export_records(SAMPLE_EXPORT))
+    assert len(catalog) == len(records)
+    for row, (tmdb_id, title, year, _) in enumerate(records):
+        record = catalog.record_at(row)
+        assert (record["id"], record["title"]) == (tmdb_id, title)
+        assert record["release_date"] == (f"{year:04d}" if year else None)
+
+
+def test_exact_title_ranks_first(catalog):
+    best = catalog.search("Forrest Gump", limit=5)[0]
+    assert (best["id"], best["title"], best["release_date"]) == (13, "Forrest Gump", "1994")
+
+
+def test_misspelled_title_still_matches(catalog):
+    assert catalog.search("forest gump", limit=5)[0]["id"] == 13
+    assert catalog.search("Finding Nemo!", limit=5)[0]["id"] == 12
+
+
+def test_unknown_trigrams_return_no_candidates(catalog):
+    assert catalog.search("ǂǂǂǂ") == []
+
+
+def test_rejects_files_that_are_not_catalogs(tmp_path):
+    not_a_catalog = tmp_path / "export.jsonl"
+    not_a_catalog.write_text('{"id": 1, "title": "Not a catalog"}\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        TMDbCatalog(str(not_a_catalog))
@@ -0,0 +1,120 @@
+import psycopg2
+import pytest
+
+import parsingInitialFilmData as film_loader
+from parsingInitialFilmData import TmdbIdIndex
+
+ALIEN = "https://letterboxd.com/film/alien/"
+ALIENS = "https://letterboxd.com/film/aliens/"
+THE_THING = "https://letterboxd.com/film/the-thing/"
+
+
+class FakeConnection:
+    """Records commits and rollbacks; the film UPDATE itself goes through the patched execute_values."""
+
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Patches the batch write; set written.error to make the next flush fail like a database error would."""
+    class Writes:
+        error = None
+        rows = []
+
+    def execute_values(cursor, query, rows, **kwargs):
+        if Writes.error is not None:
+            raise Writes.error
+        Writes.rows = rows
+
+    monkeypatch.setattr(film_loader, "execute_values", execute_values)
+    monkeypatch.setattr(psycopg2.sql.Composed, "as_string", lambda self, context: "FILM_UPDATE_QUERY")
+    monkeypatch.setattr(film_loader, "write_film_credits", lambda cursor, credits_by_uri: 0)
+    return Writes
+
+
+def update_row(letterboxd_uri, tmdb_id):
+    return (letterboxd_uri, tmdb_id) + (None,) * (film_loader.FILM_UPDATE_WIDTH - 2)
+
+
+def test_claim_reports_the_film_holding_the_tmdb_id():
+    index = TmdbIdIndex({348: ALIEN})
+    assert index.claim(348, ALIENS) == ALIEN
+    assert index.claim(348, ALIEN) is None # Re-claiming its own ID is not a collision
+    assert index.claim(1091, THE_THING) is None
+    assert index.claim(1091, ALIENS) == THE_THING # Claimed earlier in the run, before any write
+
+
+def test_reclaiming_frees_the_films_previous_tmdb_id():
+    index = TmdbIdIndex({348: ALIEN})
+    assert index.claim(679, ALIEN) is None
+    assert index.claim(348, ALIENS) is None
+    assert index.claim(679, THE_THING) == ALIEN
+
+
+def test_written_batch_confirms_its_claims(written):
+    conn, index = FakeConnection(), TmdbIdIndex({348: ALIEN})
+    index.claim(679, ALIEN)
+    index.claim(1091, THE_THING)
+    assert film_loader.flush_film_updates(conn, index, [update_row(ALIEN, 679), update_row(THE_THING, 1091)]) == 2
+    assert [row[:2] for row in written.rows] == [(ALIEN, 679), (THE_THING, 1091)]
+    assert conn.commits == 1
+
+    index.release(ALIEN) # Confirmed claims survive a later release
+    assert index.claim(679, ALIENS) == ALIEN
+    assert index.claim(348, ALIENS) is None # The ID ALIEN held before the batch stays free
+    assert index.claim(1091, ALIENS) == THE_THING
+
+
+def test_failed_batch_releases_its_claims_and_restores_previous_ids(written):
+    conn, index = FakeConnection(), TmdbIdIndex({348: ALIEN})
+    index.claim(679, ALIEN)
+    index.claim(1091, THE_THING)
+    written.error = psycopg2.Error("deadlock detected")
+    assert film_loader.flush_film_updates(conn, index, [update_row(ALIEN, 679), update_row(THE_THING, 1091)]) == 0
+    assert conn.rollbacks == 1 and conn.commits == 0
+
+    assert index.claim(679, ALIENS) is None
+    assert index.claim(1091, ALIENS) is None
+    assert index.claim(348, ALIENS) == ALIEN # Back to the TMDb ID stored in the database
+
+
+def test_release_does_not_restore_an_id_taken_meanwhile():
+    index = TmdbIdIndex({348: ALIEN})
+    index.claim(679, ALIEN)
+    index.claim(348, ALIENS)
+    index.release(ALIEN)
+    assert index.claim(348, THE_THING) == ALIENS
+    assert index.claim(679, THE_THING) is None
+
+
+def test_deleted_films_are_forgotten(monkeypatch):
+    conn, index = FakeConnection(), TmdbIdIndex({348: ALIEN, 1091: THE_THING})
+
+    class DeleteCursor(FakeConnection):
+        rowcount = 1
+
+        def execute(self, query, params=None):
+            pass
+
+    monkeypatch.setattr(conn, "cursor", DeleteCursor)
+    assert film_loader.flush_film_deletes(conn, index, [ALIEN]) == 1
+    assert index.claim(348, ALIENS) is None
+    assert index.claim(1091, ALIENS) == THE_THING
@@ -0,0 +1,165 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Default on-disk location of the cache, shared by every ingestion script.
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tmdb_cache.sqlite3")
+
+# Time-to-live per endpoint, in seconds. Search results drift as TMDb adds titles,
+# while movie details and person records change rarely.
+DEFAULT_TTLS = {
+    "search": 7 * 24 * 3600,
+    "movie": 30 * 24 * 3600,
+    "person": 30 * 24 * 3600,
+    "other": 24 * 3600,
+}
+
+# Maximum number of cached responses before least-recently-used entries are evicted.
+DEFAULT_MAX_ENTRIES = 50000
+
+# Request parameters that never affect the response body and must not be part of the key.
+IGNORED_PARAMS = {"api_key"}
+
+
+def endpoint_for_path(path):
+    """Maps a TMDb API path such as '/movie/603' to its cache endpoint class ('search', 'movie', 'person' or 'other')."""
+    parts = [p for p in path.split("/") if p]
+    if not parts:
+        return "other"
+    if parts[0] == "search":
+        return "search"
+    if parts[0] in ("movie", "person"):
+        return parts[0]
+    return "other"
+
+
+def make_cache_key(path, params):
+    """
+    Builds a stable cache key from the request path and its parameters.
+    Parameters are normalized: credentials are dropped, names are sorted and
+    string values are stripped and lower-cased so 'The Thing' and 'the thing ' share an entry.
+    """
+    normalized = []
+    for name in sorted(params or {}):
+        if name in IGNORED_PARAMS:
+            continue
+        value = params[name]
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = " ".join(value.split()).lower()
+        normalized.append(f"{name}={value}")
+    return f"{path.rstrip('/')}?{'&'.join(normalized)}"
+
+
+class TMDbCache:
+    """
+    SQLite-backed cache of decoded TMDb JSON responses.
+    Entries expire per endpoint (see DEFAULT_TTLS) and the table is bounded to
+    max_entries rows with least-recently-used eviction. Safe to share between threads.
+    `clock` defaults to time.time; tests pass a fake clock.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, max_entries=DEFAULT_MAX_ENTRIES, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                cache_key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access_idx ON responses (last_access)")
+        self._entry_count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, path, params):
+        """Returns the cached JSON body for this request, or None on a miss or expired entry."""
+        key = make_cache_key(path, params)
+        endpoint = endpoint_for_path(path)
+        now = self._clock()
+        with self._lock:
+            row = self._db.execute("SELECT payload, stored_at FROM responses WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            payload, stored_at = row
+            if now - stored_at > self.ttls.get(endpoint, self.ttls["other"]):
+                self._db.execute("DELETE FROM responses WHERE cache_key = ?", (key,))
+                self._entry_count -= 1
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE cache_key = ?", (now, key))
+            self.stats["hits"] += 1
+        return json.loads(payload)
+
+    def set(self, path, params, body):
+        """Stores a decoded JSON body for this request, evicting least-recently-used entries if over capacity."""
+        key = make_cache_key(path, params)
+        payload = json.dumps(body, separators=(",", ":"))
+        now = self._clock()
+        with self._lock:
+            existed = self._db.execute("SELECT 1 FROM responses WHERE cache_key = ?", (key,)).fetchone() is not None
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (cache_key, endpoint, payload, stored_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint_for_path(path), payload, now, now),
+            )
+            if not existed:
+                self._entry_count += 1
+            self.stats["writes"] += 1
+            overflow = self._entry_count - self.max_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM responses WHERE cache_key IN (SELECT cache_key FROM responses ORDER BY last_access LIMIT ?)",
+                    (overflow,),
+                )
+                self._entry_count -= overflow
+                self.stats["evictions"] += overflow
+
+    def clear(self):
+        """Removes every cached response."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._entry_count = 0
+
+    def __len__(self):
+        return self._entry_count
+
+    def summary(self):
+        """Returns a one-line human-readable summary of this run's cache statistics."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] / lookups * 100) if lookups else 0.0
+        return (f"TMDb cache: {self.stats['hits']} hits, {self.stats['misses']} misses ({hit_rate:.1f}% hit rate), "
+                f"{self.stats['expired']} expired, {self.stats['writes']} writes, {self.stats['evictions']} evictions, "
+                f"{self._entry_count} entries stored.")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def open_default_cache():
+    """
+    Opens the shared cache configured through the environment:
+    TMDB_CACHE_PATH (file location), TMDB_CACHE_MAX_ENTRIES, and TMDB_CACHE_DISABLED=1 to bypass caching.
+    Returns None when caching is disabled.
+    """
+    if os.getenv("TMDB_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    path = os.getenv("TMDB_CACHE_PATH") or DEFAULT_CACHE_PATH
+    max_entries = int(os.getenv("TMDB_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES)))
+    return TMDbCache(path=path, max_entries=max_entries)
@@ -0,0 +1,218 @@
+import argparse
+import bisect
+import gzip
+import json
+import mmap
+import re
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter, defaultdict
+
+# Compact on-disk catalog format (little-endian, every section 4-byte aligned):
+#   header:  MAGIC, then <IIII> title_count, trigram_key_count, posting_count, title_blob_bytes
+#   ids             uint32[title_count]        TMDb movie ids
+#   years           uint16[title_count]        release year, 0 if unknown (padded to 4 bytes)
+#   popularity      float32[title_count]
+#   title_offsets   uint32[title_count + 1]    offsets into title_blob
+#   title_blob      UTF-8 titles, concatenated (padded to 4 bytes)
+#   trigram_keys    uint32[key_count]          sorted CRC32 of each normalized trigram
+#   key_offsets     uint32[key_count + 1]      offsets into postings
+#   postings        uint32[posting_count]      row numbers containing the trigram
+MAGIC = b"LBXTMDB1"
+HEADER = struct.Struct("<IIII")
+
+# Query trigrams whose posting list is longer than this (e.g. ' th') are skipped when rarer ones exist.
+MAX_POSTINGS_PER_TRIGRAM = 50000
+# Number of best trigram-overlap candidates handed to get_closest_year_match.
+DEFAULT_CANDIDATE_LIMIT = 50
+
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize_title(title):
+    """Lower-cases a title and collapses punctuation and whitespace, so 'Alien³: Director's Cut' ~ 'alien³ director s cut'."""
+    return _NON_WORD.sub(" ", title.lower()).strip()
+
+
+def title_trigram_keys(title):
+    """Returns the set of CRC32 keys of the padded character trigrams of a normalized title."""
+    padded = f"  {normalize_title(title)} "
+    return {zlib.crc32(padded[i:i + 3].encode("utf-8")) for i in range(len(padded) - 2)}
+
+
+def _parse_year(record):
+    year = record.get("year")
+    if year is None:
+        release_date = record.get("release_date") or ""
+        year = release_date[:4] if len(release_date) >= 4 else None
+    try:
+        year = int(year)
+    except (TypeError, ValueError):
+        return 0
+    return year if 0 < year < 65536 else 0
+
+
+def iter_export_records(export_path):
+    """Yields (id, title, year, popularity) from a TMDb-style JSON-lines export (gzipped or plain)."""
+    opener = gzip.open if export_path.endswith(".gz") else open
+    with opener(export_path, "rt", encoding="utf-8") as export_file:
+        for line in export_file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            title = record.get("title") or record.get("original_title")
+            if record.get("id") is None or not title or record.get("adult"):
+                continue
+            yield int(record["id"]), title, _parse_year(record), float(record.get("popularity") or 0.0)
+
+
+def _write_section(output_file, data):
+    output_file.write(data)
+    padding = -len(data) % 4
+    if padding:
+        output_file.write(b"\0" * padding)
+
+
+def build_catalog(export_path, output_path):
+    """Builds the compact trigram-indexed catalog file from a TMDb-style export. Returns the number of titles indexed."""
+    ids, years, popularity, title_offsets = array("I"), array("H"), array("f"), array("I", [0])
+    title_blob = bytearray()
+    postings_by_key = defaultdict(lambda: array("I"))
+
+    for row, (tmdb_id, title, year, popularity_score) in enumerate(iter_export_records(export_path)):
+        ids.append(tmdb_id)
+        years.append(year)
+        popularity.append(popularity_score)
+        title_blob += title.encode("utf-8")
+        title_offsets.append(len(title_blob))
+        for key in title_trigram_keys(title):
+            postings_by_key[key].append(row)
+
+    trigram_keys = array("I", sorted(postings_by_key))
+    key_offsets, postings = array("I", [0]), array("I")
+    for key in trigram_keys:
+        postings.extend(postings_by_key[key])
+        key_offsets.append(len(postings))
+
+    if sys.byteorder != "little":
+        for section in (ids, years, popularity, title_offsets, trigram_keys, key_offsets, postings):
+            section.byteswap()
+    with open(output_path, "wb") as output_file:
+        output_file.write(MAGIC)
+        output_file.write(HEADER.pack(len(ids), len(trigram_keys), len(postings), len(title_blob)))
+        for section in (ids, years, popularity, title_offsets):
+            _write_section(output_file, section.tobytes())
+        _write_section(output_file, bytes(title_blob))
+        for section in (trigram_keys, key_offsets, postings):
+            _write_section(output_file, section.tobytes())
+    return len(ids)
+
+
+class TMDbCatalog:
+    """
+    Read-only, memory-mapped view of a catalog built by build_catalog.
+    search() returns candidates shaped like /search/movie results, so they can be passed
+    straight to get_closest_year_match without any network call. Safe to share between threads.
+    """
+
+    def __init__(self, catalog_path):
+        if sys.byteorder != "little":
+            raise RuntimeError("TMDbCatalog requires a little-endian platform.")
+        self.path = catalog_path
+        self._file = open(catalog_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"'{catalog_path}' is not a TMDb catalog file.")
+        title_count, key_count, posting_count, blob_bytes = HEADER.unpack_from(self._map, len(MAGIC))
+        view = self._view = memoryview(self._map)
+        position = len(MAGIC) + HEADER.size
+
+        def section(byte_length, fmt=None):
+            nonlocal position
+            data = view[position:position + byte_length]
+            position += byte_length + (-byte_length % 4)
+            return data.cast(fmt) if fmt else data
+
+        self._ids = section(4 * title_count, "I")
+        self._years = section(2 * title_count, "H")
+        self._popularity = section(4 * title_count, "f")
+        self._title_offsets = section(4 * (title_count + 1), "I")
+        self._title_blob = section(blob_bytes)
+        self._trigram_keys = section(4 * key_count, "I")
+        self._key_offsets = section(4 * (key_count + 1), "I")
+        self._postings = section(4 * posting_count, "I")
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _postings_for(self, key):
+        index = bisect.bisect_left(self._trigram_keys, key)
+        if index == len(self._trigram_keys) or self._trigram_keys[index] != key:
+            return None
+        return self._postings[self._key_offsets[index]:self._key_offsets[index + 1]]
+
+    def title_at(self, row):
+        return bytes(self._title_blob[self._title_offsets[row]:self._title_offsets[row + 1]]).decode("utf-8")
+
+    def record_at(self, row):
+        """Returns the catalog row as a dict shaped like a TMDb /search/movie result."""
+        year = self._years[row]
+        return {
+            "id": self._ids[row],
+            "title": self.title_at(row),
+            "release_date": f"{year:04d}" if year else None,
+            "popularity": self._popularity[row],
+        }
+
+    def search(self, title, limit=DEFAULT_CANDIDATE_LIMIT):
+        """Returns up to `limit` catalog records sharing the most trigrams with `title`, best first."""
+        posting_lists = [p for p in (self._postings_for(key) for key in title_trigram_keys(title)) if p is not None]
+        if not posting_lists:
+            return []
+        selective = [p for p in posting_lists if len(p) <= MAX_POSTINGS_PER_TRIGRAM]
+        if not selective:
+            selective = [min(posting_lists, key=len)]
+        overlap = Counter()
+        for posting_list in selective:
+            overlap.update(posting_list)
+        best_rows = sorted(overlap.items(), key=lambda item: (-item[1], -self._popularity[item[0]]))[:limit]
+        return [self.record_at(row) for row, _ in best_rows]
+
+    def close(self):
+        for section in (self._ids, self._years, self._popularity, self._title_offsets, self._title_blob,
+                        self._trigram_keys, self._key_offsets, self._postings):
+            section.release()
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the offline TMDb title catalog.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    build_parser = subcommands.add_parser("build", help="Build a catalog from a TMDb-style JSON-lines export (.json or .json.gz).")
+    build_parser.add_argument("export_path")
+    build_parser.add_argument("catalog_path")
+    query_parser = subcommands.add_parser("query", help="Look up a title in a built catalog.")
+    query_parser.add_argument("catalog_path")
+    query_parser.add_argument("title")
+    query_parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        title_count = build_catalog(args.export_path, args.catalog_path)
+        print(f"Indexed {title_count} titles into '{args.catalog_path}'.")
+    else:
+        catalog = TMDbCatalog(args.catalog_path)
+        try:
+            for record in catalog.search(args.title, limit=args.limit):
+                print(f"{record['id']:>8}  {record['release_date'] or '----'}  {record['popularity']:8.2f}  {record['title']}")
+        finally:
+            catalog.close()
+
+
+if __name__ == "__main__":
+    main()
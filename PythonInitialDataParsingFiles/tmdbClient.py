@@ -0,0 +1,179 @@
+import random
+import threading
+import time
+
+from tmdbCache import endpoint_for_path
+
+try:
+    import orjson # Optional: considerably faster JSON decoding for large credits payloads
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+DEFAULT_BASE_URL = "https://api.themoviedb.org/3"
+
+# (connect, read) timeouts in seconds. A stalled socket fails fast instead of hanging the run.
+DEFAULT_TIMEOUT = (3.05, 15)
+
+# Retry policy for 429, 5xx, timeouts and dropped connections.
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_BASE = 0.5  # seconds; doubled on every attempt
+DEFAULT_BACKOFF_MAX = 30.0  # seconds; also caps how long a Retry-After header is honored
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TMDbResult:
+    """Outcome of a single TMDb call: decoded body plus how long it took and how it was served."""
+    __slots__ = ("data", "status_code", "latency", "attempts", "from_cache")
+
+    def __init__(self, data, status_code, latency, attempts, from_cache):
+        self.data = data
+        self.status_code = status_code
+        self.latency = latency      # seconds, including retries and backoff sleeps
+        self.attempts = attempts    # number of HTTP requests made (0 for cache hits)
+        self.from_cache = from_cache
+
+
+class TMDbClient:
+    """
+    Shared HTTP transport for TMDb calls.
+    Uses one pooled keep-alive Session with connect/read timeouts, gzip responses and
+    exponential backoff with jitter that honors 429 Retry-After. An optional TokenBucket
+    limits the request rate and an optional TMDbCache serves repeated requests locally.
+    An optional RunMetrics receives per-endpoint call, cache-hit, retry and error counters.
+    Safe to share between threads.
+    """
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, rate_limiter=None, cache=None,
+                 timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX, pool_size=16, metrics=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = metrics
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "cache_hits": 0, "errors": 0, "network_seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        The pooled requests.Session, created on first use. requests is by far the slowest import in
+        the scripts, so it is only loaded once a call actually misses the cache.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, deflate"})
+                    self._network_errors = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+                    self._session = session
+        return self._session
+
+    def _record(self, **increments):
+        with self._stats_lock:
+            for name, amount in increments.items():
+                self.stats[name] += amount
+
+    def _count(self, name, **labels):
+        if self.metrics is not None:
+            self.metrics.increment(name, **labels)
+
+    def _backoff_delay(self, attempt, response=None):
+        """Seconds to wait before retry number `attempt` (1-based). Prefers the server's Retry-After."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(self.backoff_max, max(0.0, float(retry_after)))
+                except ValueError:
+                    pass
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return delay * (0.5 + random.random() / 2) # Jitter so concurrent workers do not retry in lockstep
+
+    def request(self, path, params=None):
+        """
+        Performs a GET for `path` (e.g. '/movie/603') and returns a TMDbResult.
+        Raises requests.exceptions.HTTPError for non-retryable or exhausted error responses
+        and requests.exceptions.RequestException for exhausted network failures.
+        """
+        params = dict(params or {})
+        params.setdefault("api_key", self.api_key)
+        endpoint = endpoint_for_path(path)
+        started = time.perf_counter()
+
+        if self.cache is not None:
+            cached_body = self.cache.get(path, params)
+            if cached_body is not None:
+                self._record(cache_hits=1)
+                self._count("tmdb_cache_hits_total", endpoint=endpoint)
+                return TMDbResult(cached_body, 200, time.perf_counter() - started, 0, True)
+
+        url = f"{self.base_url}{path}"
+        session = self.session
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            request_started = time.perf_counter()
+            self._count("tmdb_api_calls_total", endpoint=endpoint)
+            try:
+                response = session.get(url, params=params, timeout=self.timeout)
+            except self._network_errors:
+                self._record(requests=1, network_seconds=time.perf_counter() - request_started)
+                if attempt > self.max_retries:
+                    self._record(errors=1)
+                    self._count("tmdb_errors_total", endpoint=endpoint, reason="network")
+                    raise
+                self._record(retries=1)
+                self._count("tmdb_retries_total", endpoint=endpoint, reason="network")
+                time.sleep(self._backoff_delay(attempt))
+                continue
+            self._record(requests=1, network_seconds=time.perf_counter() - request_started)
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt <= self.max_retries:
+                self._record(retries=1)
+                self._count("tmdb_retries_total", endpoint=endpoint, reason=str(response.status_code))
+                time.sleep(self._backoff_delay(attempt, response))
+                continue
+            if response.status_code >= 400:
+                self._record(errors=1)
+                self._count("tmdb_errors_total", endpoint=endpoint, reason=str(response.status_code))
+                response.raise_for_status()
+
+            body = _json_loads(response.content)
+            if self.cache is not None:
+                self.cache.set(path, params, body)
+            return TMDbResult(body, response.status_code, time.perf_counter() - started, attempt, False)
+
+    def get_json(self, path, params=None):
+        """Convenience wrapper around request() returning only the decoded JSON body."""
+        return self.request(path, params).data
+
+    def summary(self):
+        """Returns a one-line human-readable summary of transport statistics for this run."""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        average = (stats["network_seconds"] / stats["requests"] * 1000) if stats["requests"] else 0.0
+        return (f"TMDb client: {stats['requests']} HTTP requests (avg {average:.0f} ms), {stats['retries']} retries, "
+                f"{stats['errors']} errors, {stats['cache_hits']} cache hits.")
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -2,12 +2,93 @@ package main
 
 import (
 	"database/sql"
+	"errors"
 	"fmt"
 	"log"
 	"strconv"
 	"strings"
+
+	"github.com/lib/pq"
 )
 
+// queryPrecomputed reads one of the dashboard materialized views that the Python ingestion scripts
+// refresh at the end of every load and enrichment run (see dashboardStats.py). Until the first run has
+// created the view (undefined_table), it falls back to the equivalent live aggregation so a fresh
+// database still renders. Further live queries are tried in turn while the tables an earlier one
+// reads do not exist either.
+func queryPrecomputed(precomputedQuery string, liveQueries ...string) (*sql.Rows, error) {
+	rows, err := db.Query(precomputedQuery)
+	for _, liveQuery := range liveQueries {
+		var pqErr *pq.Error
+		if !errors.As(err, &pqErr) || pqErr.Code != "42P01" {
+			break
+		}
+		rows, err = db.Query(liveQuery)
+	}
+	return rows, err
+}
+
+// topPeopleQuery is the director/actor aggregation of dashboardStats.py: normalized credits
+// (film_credits/people), one row per TMDb person, with films that have no credits for the role counted
+// through their films arrays.
+func topPeopleQuery(role, namesColumn, pathsColumn, nameColumn, pathColumn, countColumn string, limit int) string {
+	return fmt.Sprintf(`
+WITH credited AS (
+    SELECT c.film_id, p.tmdb_person_id::text AS person_key, p.name, p.profile_path AS path
+    FROM film_credits c
+    JOIN people p ON p.tmdb_person_id = c.person_id
+    WHERE c.role = '%[1]s'
+), uncredited AS (
+    SELECT f.id AS film_id, u.name, u.path
+    FROM films f, LATERAL UNNEST(f.%[2]s, f.%[3]s) AS u(name, path)
+    WHERE u.name IS NOT NULL AND u.name <> ''
+        AND NOT EXISTS (SELECT 1 FROM film_credits c WHERE c.film_id = f.id AND c.role = '%[1]s')
+), credited_names AS (
+    SELECT name, MIN(person_key) AS person_key
+    FROM credited
+    GROUP BY name
+    HAVING COUNT(DISTINCT person_key) = 1
+)
+SELECT
+    MIN(a.name) AS %[4]s,
+    (ARRAY_AGG(a.path) FILTER (WHERE a.path IS NOT NULL AND a.path <> ''))[1] AS %[5]s,
+    COUNT(DISTINCT a.film_id) AS %[6]s
+FROM (
+    SELECT film_id, person_key, name, path FROM credited
+    UNION ALL
+    SELECT u.film_id, COALESCE(n.person_key, 'name:' || u.name), u.name, u.path
+    FROM uncredited u
+    LEFT JOIN credited_names n ON n.name = u.name
+) AS a
+GROUP BY
+    a.person_key
+ORDER BY
+    %[6]s DESC
+LIMIT %[7]d;
+		`, role, namesColumn, pathsColumn, nameColumn, pathColumn, countColumn, limit)
+}
+
+// topPeopleArrayQuery is the same aggregation from the films arrays alone, for databases without the
+// credit tables (restored from a dump taken before they existed).
+func topPeopleArrayQuery(namesColumn, pathsColumn, nameColumn, pathColumn, countColumn string, limit int) string {
+	return fmt.Sprintf(`
+SELECT
+    u.name AS %[3]s,
+    (ARRAY_AGG(u.path) FILTER (WHERE u.path IS NOT NULL AND u.path <> ''))[1] AS %[4]s,
+    COUNT(*) AS %[5]s
+FROM
+    films f,
+    LATERAL UNNEST(f.%[1]s, f.%[2]s) AS u(name, path)
+WHERE
+    u.name IS NOT NULL AND u.name <> ''
+GROUP BY
+    u.name
+ORDER BY
+    %[5]s DESC
+LIMIT %[6]d;
+		`, namesColumn, pathsColumn, nameColumn, pathColumn, countColumn, limit)
+}
+
 // FetchFilmCountsByYear queries the database for film counts grouped by release year.
 // It uses the global 'db' connection from api_handlers.go (or wherever it's initialized in package main).
 func FetchFilmCountsByYear() (ChartData, error) {
@@ -68,7 +149,7 @@ func FetchFilmCountsByYear() (ChartData, error) {
 }
 
 // FetchFilmCountsByGenre queries the database for film counts grouped by genre.
-// It unnests the 'genres' array column.
+// It reads the precomputed dashboard_genre_counts view, or unnests the 'genres' array column if it is missing.
 // It uses the global 'db' connection.
 func FetchFilmCountsByGenre() (ChartData, error) {
 	if db == nil {
@@ -76,9 +157,14 @@ func FetchFilmCountsByGenre() (ChartData, error) {
 		return ChartData{}, sql.ErrConnDone // Or a more specific error
 	}
 
+	precomputedQuery := `
+		SELECT genre_name, movie_count
+		FROM dashboard_genre_counts
+		ORDER BY movie_count DESC;
+	`
 	// The genres column is text[]
 	// We need to unnest it and then group by the individual genre.
-	query := `
+	liveQuery := `
 		SELECT 
 			g.genre_name, 
 			COUNT(*) as movie_count 
@@ -92,7 +178,7 @@ func FetchFilmCountsByGenre() (ChartData, error) {
 		ORDER BY 
 			movie_count DESC;
 	`
-	rows, err := db.Query(query)
+	rows, err := queryPrecomputed(precomputedQuery, liveQuery)
 	if err != nil {
 		log.Println("Database query error in FetchFilmCountsByGenre:", err)
 		return ChartData{}, err
@@ -136,25 +222,20 @@ func FetchTopDirectors(limit int) ([]TopCreditData, error) {
 		return nil, sql.ErrConnDone
 	}
 
-	query := fmt.Sprintf(`
-SELECT
-    d.name AS director_name,
-    (ARRAY_AGG(d.path) FILTER (WHERE d.path IS NOT NULL AND d.path <> ''))[1] AS director_profile_path,
-    COUNT(*) AS film_count
-FROM
-    films f,
-    LATERAL UNNEST(f.directors, f.directors_profile_paths) AS d(name, path)
-WHERE
-    f.directors IS NOT NULL AND array_length(f.directors, 1) > 0
-    AND d.name IS NOT NULL AND d.name <> ''
-GROUP BY
-    d.name
-ORDER BY
-    film_count DESC
+	precomputedQuery := fmt.Sprintf(`
+SELECT director_name, director_profile_path, film_count
+FROM dashboard_top_directors
+ORDER BY film_count DESC
 LIMIT %d;
 		`, limit)
 
-	rows, err := db.Query(query)
+	// Same aggregation as the view, or the films arrays alone if film_credits does not exist.
+	liveQuery := topPeopleQuery("director", "directors", "directors_profile_paths",
+		"director_name", "director_profile_path", "film_count", limit)
+	arrayQuery := topPeopleArrayQuery("directors", "directors_profile_paths",
+		"director_name", "director_profile_path", "film_count", limit)
+
+	rows, err := queryPrecomputed(precomputedQuery, liveQuery, arrayQuery)
 	if err != nil {
 		log.Println("Database query error in FetchTopDirectors:", err)
 		return nil, err
@@ -198,24 +279,20 @@ func FetchTopActors(limit int) ([]TopCreditData, error) {
 		return nil, sql.ErrConnDone
 	}
 
-	query := fmt.Sprintf(`
-SELECT
-    g.name AS actors_name,
-    (ARRAY_AGG(g.path) FILTER (WHERE g.path IS NOT NULL AND g.path <> ''))[1] AS actor_profile_path,
-    COUNT(*) AS movie_count
-FROM
-    films f,
-    LATERAL UNNEST(f.actors, f.actor_profile_paths) AS g(name, path)
-WHERE
-    g.name IS NOT NULL AND g.name <> ''
-GROUP BY
-    g.name
-ORDER BY
-    movie_count DESC
+	precomputedQuery := fmt.Sprintf(`
+SELECT actor_name, actor_profile_path, movie_count
+FROM dashboard_top_actors
+ORDER BY movie_count DESC
 LIMIT %d;
 	`, limit)
 
-	rows, err := db.Query(query)
+	// Same aggregation as the view, or the films arrays alone if film_credits does not exist.
+	liveQuery := topPeopleQuery("actor", "actors", "actor_profile_paths",
+		"actor_name", "actor_profile_path", "movie_count", limit)
+	arrayQuery := topPeopleArrayQuery("actors", "actor_profile_paths",
+		"actor_name", "actor_profile_path", "movie_count", limit)
+
+	rows, err := queryPrecomputed(precomputedQuery, liveQuery, arrayQuery)
 	if err != nil {
 		log.Println("Database query error in FetchTopActors:", err)
 		return nil, err
@@ -410,9 +487,15 @@ func FetchFilmCountsByWatchDate() (MoviesWatchedOverTimeChartData, error) {
 		return MoviesWatchedOverTimeChartData{}, sql.ErrConnDone
 	}
 
+	// Precomputed per-month counts; watch_month gives the chronological order.
+	precomputedQuery := `
+SELECT watch_year, month_name, movies_watched_count
+FROM dashboard_watch_month_counts
+ORDER BY watch_year ASC, watch_month ASC;
+`
 	// The SQL query needs to provide year and month name, ordered correctly.
 	// EXTRACT(MONTH FROM watched_date) is crucial for correct chronological ordering.
-	query := `
+	liveQuery := `
 SELECT
     EXTRACT(YEAR FROM watched_date) AS watch_year,
     TRIM(TO_CHAR(watched_date, 'Month')) AS month_name, -- e.g., "January", "February"
@@ -429,7 +512,7 @@ ORDER BY
     watch_year ASC,
     EXTRACT(MONTH FROM watched_date) ASC; -- Order chronologically by year, then by numeric month
 `
-	rows, err := db.Query(query)
+	rows, err := queryPrecomputed(precomputedQuery, liveQuery)
 	if err != nil {
 		log.Println("Database query error in FetchFilmCountsByWatchDate:", err)
 		return MoviesWatchedOverTimeChartData{}, err